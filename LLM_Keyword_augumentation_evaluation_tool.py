@@ -1,13 +1,20 @@
-import os, csv, json, time, datetime
+import os, csv, json, time, heapq, itertools
 from pathlib import Path
-from typing import List
+from typing import Callable, List, Optional, Union
 import streamlit as st
 import streamlit.components.v1 as components  # 추가: 타이머/팝업을 위한 import
 import math
 import sys
-from openai import OpenAI
 import pandas as pd
 from dotenv import load_dotenv
+from kwtool.core import Core
+from kwtool.dataset import Dataset
+from kwtool.evidence import EvidenceStore, norm_id
+from kwtool.eventlog import EventLogger
+from kwtool.metrics import METRICS
+from kwtool.query import Query, QuerySyntaxError, is_boolean
+from kwtool.resultref import ResultRef, ResultStore
+from kwtool.results import ResultSet
 load_dotenv()
 
 # 기본 디렉토리
@@ -26,10 +33,48 @@ CSV_COL_MAP = {"filename": FILENAME_COL, "label": LABEL_COL}
 LOG_DIR = BASE_DIR / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 ITEMS_PER_PAGE = 30
+PAGE_SIZE_OPTIONS = [ITEMS_PER_PAGE, 100, 500, 1000]  # 결과 목록 페이지당 행 수 선택지
+RESULT_TABLE_MAX_HEIGHT = 700           # 결과 표 최대 높이(px), 넘으면 표 안에서 스크롤
+RESULT_CACHE_ITEMS = 256               # 검색 결과 캐시 최대 항목 수
+RESULT_CACHE_BYTES = 512 * 1024 * 1024  # 검색 결과 캐시 메모리 상한
+LLM_CACHE_PATH = BASE_DIR / "llm_cache.sqlite3"
+LLM_CACHE_TTL_SEC = 7 * 24 * 3600        # LLM 응답 캐시 유효 기간
+LLM_CACHE_MAX_ENTRIES = 5000
+LOG_FLUSH_INTERVAL_SEC = 1.0             # 이벤트 로그 배치 기록 주기
+LOG_FSYNC = "batch"                      # "never" | "batch" | "always" (kwtool.eventlog)
+LOG_RESULT_REFS = False                  # True 면 search_results 를 파일명 목록 대신 결과 집합 참조로 기록 (kwtool.resultref, 로그 형식 바뀜)
+RANK_RESULTS = True                      # 결과를 관련도(BM25) 순으로, False 면 기존 일치 1.0 점수
+FUZZY_MATCH = True                       # 근사 일치 토글 표시 (색인은 load_data() 에서 구축, kwtool.fuzzy)
+CONTENT_DIR = os.getenv("KWTOOL_CONTENT_DIR")  # 본문 색인 대상 문서 디렉토리 (kwtool.content), 없으면 본문 검색 토글 숨김
+METRICS_ENABLED = os.getenv("KWTOOL_METRICS") == "1"   # 구간 계측·실행 기록 (kwtool.metrics)
+METRICS_PORT = int(os.getenv("KWTOOL_METRICS_PORT", "0"))  # 0 이 아니면 /metrics 서버 포트
+METRICS_DIR = LOG_DIR / "metrics"        # reruns.jsonl / slow.jsonl
+SLOW_RERUN_MS = 1000                     # 이보다 오래 걸린 실행은 slow.jsonl 에도 기록
+SELECTION_FRAGMENT = "selection"         # 사이드바 선택 현황 (st.fragment key)
+RESULTS_FRAGMENT = "results"             # 검색 결과 목록
 TIME_LIMIT_MINUTES = 10
 SURVEY_URL = "https://docs.google.com/forms/d/e/1FAIpQLSc3JLpWSRCEhxl8DEo-gqzbWsyyAUajepJOFDv_GRL6-c9JEg/viewform?usp=header"
 st.set_page_config(page_title="Phase B Test Page")
 
+@st.cache_resource(show_spinner=False)
+def setup_metrics() -> None:
+    """프로세스당 한 번: 계측 켜기, 실행 기록 파일, /metrics 서버."""
+    METRICS.configure(enabled=METRICS_ENABLED, out_dir=METRICS_DIR, slow_rerun_ms=SLOW_RERUN_MS)
+    if METRICS_ENABLED and METRICS_PORT:
+        METRICS.serve(METRICS_PORT)
+
+def stop_script():
+    """st.stop() 전에 실행 기록을 닫는다 (Streamlit 에는 실행 종료 훅이 없어서)."""
+    METRICS.end_rerun("stop")
+    st.stop()
+
+def rerun_script():
+    METRICS.end_rerun("rerun")
+    st.rerun()
+
+setup_metrics()
+METRICS.begin_rerun()
+
 #st.set_page_config(page_title="Phase B", layout="wide")
 
 # Fade out 비활성화
@@ -42,130 +87,48 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-ENCODING_CANDIDATES = ["utf-8", "utf-8-sig", "cp949", "euc-kr", "latin1"]
-
-def _norm_id(name: str) -> str:
-    """중복 판단용 키(대소문자/앞뒤 공백 차이 무시). 필요시 경로 정규화 규칙을 여기서 확장."""
-    return (name or "").strip().lower()
-
-def load_saved_from_logs(pid: str) -> tuple[set[str], set[str]]:
+@st.cache_resource(show_spinner=False)
+def get_core() -> Core:
     """
-    기존 로그를 스캔해 이미 '증거로 저장'된 파일들을 복원(세션 재시작 대비).
-    evidence_mark / evidence_mark_on_timeout 이벤트의 payload를 합집합으로 반영.
+    프로세스 공용 앱 코어 (kwtool.core): 데이터셋, 검색 결과 LRU, LLM 클라이언트, 이벤트 로거, 저장소.
+    LLM 응답은 LLM_CACHE_PATH 에 캐시되고, LLM_OFFLINE=1 이면 네트워크 없이 캐시만 재생한다.
     """
-    saved, keys = set(), set()
-    log_path = LOG_DIR / "phase_b" / f"{pid}.csv"
-    if not log_path.exists():
-        return saved, keys
-
-    with log_path.open("r", encoding="utf-8-sig", newline="") as f:
-        rdr = csv.DictReader(f)
-        for row in rdr:
-            if row.get("event") not in ("evidence_mark", "evidence_mark_on_timeout"):
-                continue
-            try:
-                payload = json.loads(row.get("payload") or "[]")
-            except json.JSONDecodeError:
-                continue
-            if isinstance(payload, list):
-                for name in payload:
-                    k = _norm_id(name)
-                    if k not in keys:
-                        keys.add(k)
-                        saved.add(name)
-    return saved, keys
-
-@st.cache_data(show_spinner=False)
-def load_data() -> pd.DataFrame:
-    if not Path(DATA_PATH).exists():
-        st.error(f"{DATA_PATH} 파일을 찾을 수 없습니다."); st.stop()
-
-    last_err = None
-    for enc in ENCODING_CANDIDATES:
-        try:
-            df = pd.read_csv(
-                DATA_PATH,
-                delimiter=CSV_DELIMITER,
-                encoding=enc,
-                dtype=str
-            ).fillna("")
-            #st.info(f"CSV 인코딩: {enc}")
-            break
-        except UnicodeDecodeError as e:
-            last_err = e
-            continue
-    else:
-        st.error(f"Data file loading failed!! Please contact the administrator: {last_err}"); st.stop()
-
-    norm = (
-        df.columns
-        .str.replace("\ufeff", "", regex=False)
-        .str.strip()
-        .str.lower()
+    return Core(
+        DATA_PATH, LOG_DIR / "phase_b",
+        delimiter=CSV_DELIMITER, col_map=CSV_COL_MAP, fuzzy=FUZZY_MATCH, content_dir=CONTENT_DIR,
+        result_cache_items=RESULT_CACHE_ITEMS, result_cache_bytes=RESULT_CACHE_BYTES,
+        llm_cache_path=LLM_CACHE_PATH, llm_cache_ttl=LLM_CACHE_TTL_SEC, llm_cache_max_entries=LLM_CACHE_MAX_ENTRIES,
+        log_flush_interval=LOG_FLUSH_INTERVAL_SEC, log_fsync=LOG_FSYNC
     )
-    df.columns = norm
-
-    rename_map = {}
-    for std_name, real_name in CSV_COL_MAP.items():
-        real_norm = real_name.lower().strip()
-        match_cols = [c for c in df.columns if c == real_norm]
-        if match_cols:
-            rename_map[match_cols[0]] = std_name
-    df = df.rename(columns=rename_map)
-
-    if "filename" not in df.columns:
-        st.error("CSV에서 'filename' 열을 찾지 못했습니다.\n"
-                 f"→ 실제 헤더: {list(df.columns)}")
-        st.stop()
-
-    if "label" not in df.columns:
-        df["label"] = ""
 
-    return df
+def load_saved_from_logs(pid: str) -> tuple[set[str], set[str]]:
+    """이미 '증거로 저장'된 파일들을 복원(세션 재시작 대비). 증거 저장소만 읽는다 (Core.load_saved_evidence)."""
+    return get_core().load_saved_evidence(pid)
 
-@st.cache_data(show_spinner=False)
-def search(
-    df: pd.DataFrame,
-    keywords: List[str],
-    threshold: float,
-    *,                       # 키워드 필터 옵션은 키워드 인자로만 전달
-    min_len: int = 2,        # N글자 미만은 무시
-    ignore_single_digit: bool = True  # 한 자리 숫자 필터
-) -> pd.DataFrame:
+@st.cache_resource(show_spinner="Loading dataset...")
+def load_data() -> Dataset:
     """
-    - min_len:  이 길이보다 짧은 키워드는 검색에서 제외
-    - ignore_single_digit: True 이면 0~9 단독 키워드는 무시
+    데이터셋 + 정규화 파일명 컬럼 + 트라이그램 색인 (프로세스 내 공유).
+    DATA_PATH 옆 디스크 캐시가 유효하면 CSV 재파싱/인코딩 재탐지 없이 바로 연다 (kwtool.store).
+    FUZZY_MATCH 면 근사 일치 색인도 여기서 한 번 구축한다.
     """
+    try:
+        return get_core().load_data()
+    except FileNotFoundError as e:
+        st.error(str(e)); stop_script()
+    except UnicodeDecodeError as e:
+        st.error(f"Data file loading failed!! Please contact the administrator: {e}"); stop_script()
+    except ValueError as e:
+        st.error(str(e)); stop_script()
 
-    # ── 1 키워드 필터링 ──────────────────────
-    filtered_kw = []
-    for kw in keywords:
-        kw = kw.strip()
-        if len(kw) < min_len:
-            continue
-        if ignore_single_digit and kw.isdigit() and len(kw) == 1:
-            continue
-        filtered_kw.append(kw)
-
-    # 필터링 결과가 없으면 빈 DF 반환
-    if not filtered_kw:
-        return df.iloc[0:0]
-
-    # ── 2 검색용 헬퍼 ──────────────────────
-    def normalize(txt: str) -> str:
-        return txt.lower().replace(" ", "")
-
-    def score(name: str) -> float:
-        norm_name = normalize(name)
-        for kw in filtered_kw:
-            if normalize(kw) in norm_name:
-                return 1.0
-        return 0.0
-
-    # ── 3 스코어 계산 & 필터링 ──────────────
-    out = df.copy()
-    out["score"] = out["filename"].apply(score)
-    return out[out["score"] >= threshold].sort_values("score", ascending=False)
+def search(
+    dataset: Dataset,
+    keywords: Union[List[str], Query],  # Query 면 AND/NOT/구문/ext: 검색 (kwtool.query)
+    threshold: float,
+    **options                # min_len, ignore_single_digit, base_keywords, fuzzy, content (Core.search)
+) -> ResultSet:
+    """결과 LRU 를 거친 검색. 반환값은 공유 데이터셋 위의 행 번호 핸들."""
+    return get_core().search(keywords, threshold, dataset=dataset, **options)
 
 def open_new_tab(url: str):
     components.html(
@@ -178,95 +141,34 @@ def open_new_tab(url: str):
         height=0, width=0
     )
 
-SYSTEM_PROMPT = """
-# Objective
-You are an investigator with many years of practical experience in the field of digital forensics. Analyze the keywords entered by the user, derive semantically, thematically, and contextually related single-word keywords, and output exactly N according to the specified JSON schema. If you need a more formal or detailed version, here is a slightly longer and clarified option:
-
-## Input
-- Format: keyword1, keyword2, keyword3, number_of_keywords_to_output
-- Example 1: police agency, sexual harassment, statistics, 30
-- Example 2: drugs, smuggling, BTC, 30
-- Example 3: military, blueprint, operation, 30
-
-# Output
-```json
-{
-  "keywords": [
-    "keyword1",
-    "keyword2",
-    ...
-  ]
-}
-
-# Instructions
-1. Each keyword must be a single word and cannot contain spaces, hyphens, or underscores.
-2. Every keyword should appear only once, with no duplicates (including homonyms and alternate spellings).
-3. Ensure semantic diversity: include a balanced mix of synonyms, hypernyms (broader terms), hyponyms (narrower terms), and related words.
-4. Arrange keywords in a logical order considering relevance and usefulness; do not randomize the sequence.
-5. Hierarchy ratio (for N=30):
-   - Hypernyms: at least 12
-   - Mid-level terms: 10-12
-   - Hyponyms: no more than 8
-6. Include at least 5 specialized/professional terms, slang, or abbreviations (from any domain).
-7. Self-check before output:
-   - Remove banned words, duplicates, and typos to ensure exactly N keywords
-   - If ratio or rules are violated, regenerate automatically
-
-# Output-only
-Do not include any additional explanations, comments, or line breaks other than the JSON object.
-Output the result only once.
-"""
+def fetch_llm_keywords(
+    base_keywords: List[str],
+    n: int = 30,
+    retry: int = 3,
+    on_partial: Optional[Callable[[List[str]], None]] = None
+) -> List[str]:
+    """on_partial: 스트리밍 중 키워드가 도착할 때마다 지금까지의 목록으로 호출."""
+    return get_core().fetch_llm_keywords(base_keywords, n, retry, on_partial)
 
-def fetch_llm_keywords(base_keywords: List[str], n: int = 30, retry: int = 3) -> List[str]:
-    user_input = ", ".join(base_keywords + [f"{n}개"])
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY 환경변수가 없습니다.")
-    client = OpenAI(api_key=api_key, timeout=45)
+def get_event_logger() -> EventLogger:
+    return get_core().event_logger
 
-    for _ in range(retry):
-        try:
-            resp = client.chat.completions.create(
-                model="gpt-5-chat-latest",
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_input}
-                ],
-                temperature=0.3,
-                presence_penalty=0.8,
-                max_tokens=800,
-                response_format={"type": "json_object"}
-            )
-            data = json.loads(resp.choices[0].message.content)
-            kw = [k.strip() for k in data.get("keywords", []) if k.strip()]
-            return list(dict.fromkeys(kw))[:n]
-        except Exception:
-            time.sleep(2)
-    return []
+def get_result_store() -> ResultStore:
+    return get_core().result_store
+
+def get_evidence_store() -> EvidenceStore:
+    return get_core().evidence_store
 
 def log_event(pid: str, event: str, payload: any):
-    ts = datetime.datetime.now().isoformat(timespec="seconds")
-    phase_dir = LOG_DIR / "phase_b"
-    phase_dir.mkdir(exist_ok=True)
-    log_path = phase_dir / f"{pid}.csv"
-    
-    if isinstance(payload, (dict, list)):
-        payload_str = json.dumps(payload, ensure_ascii=False)
-    else:
-        payload_str = str(payload)
-    
-    if not log_path.exists():
-        with log_path.open("w", newline="", encoding="utf-8-sig") as f:
-            csv.writer(f).writerow(["timestamp", "event", "payload"])
-    
-    with log_path.open("a", newline="", encoding="utf-8-sig") as f:
-        csv.writer(f).writerow([ts, event, payload_str])
+    """큐에 넣고 바로 반환. 디스크 반영이 필요한 시점에는 get_event_logger().flush(pid)."""
+    get_core().log_event(pid, event, payload)
 
 st.sidebar.title("File Explorer with LLM Integration")
 
 pid = st.sidebar.text_input("Name", placeholder="e.g.) Smith").strip()
 if not pid:
-    st.sidebar.warning("Input your name"); st.stop()
+    st.sidebar.warning("Input your name"); stop_script()
+METRICS.tag(pid=pid)
 
 #st.sidebar.caption("※ 로그는 logs/phase_b/ 에 저장됩니다")
 
@@ -289,70 +191,111 @@ if "evidence_saved" not in st.session_state or "evidence_saved_keys" not in st.s
     st.session_state.evidence_saved = saved
     st.session_state.evidence_saved_keys = keys
 
-# 증거 관리
-saved_count = len(st.session_state.evidence_saved)
-st.sidebar.success(f"Selected Evidence: **{saved_count}**")
-with st.sidebar.expander("List of Stored Evidence (Most Recent 10)", expanded=False):
-    for i, name in enumerate(list(sorted(st.session_state.evidence_saved))[:10], 1):
-        ell = "..." if len(name) > 50 else ""
-        st.write(f"{i}. {name[:50]}{ell}")
-    if saved_count > 10:
-        st.caption(f"… more {saved_count - 10}")
-
-# 현재 선택 현황
-selected_count = len(st.session_state.manual_selected)
-if selected_count > 0:
-    st.sidebar.info(f"Receently selected: **{selected_count}**")
-    with st.sidebar.expander("List of Selected files"):
-        for idx, filename in enumerate(list(st.session_state.manual_selected)[:5], 1):
-            ell = "..." if len(filename) > 50 else ""
-            st.write(f"{idx}. {filename[:50]}{ell}")
-        if selected_count > 5:
-            st.write(f"... more {selected_count - 5}")
-else:
-    st.sidebar.info("no selected files")
-
-if st.sidebar.button("📋 selected items to evidence", type="primary",
-                     disabled=(selected_count == 0), use_container_width=True, key="evidence_save_btn"):
+def save_selection_as_evidence(pid: str):
+    """
+    on_click: 선택 항목 중 신규만 증거로 저장하고 결과 표·사이드바 선택 현황만 다시 그린다.
+    콜백 안에서는 요소를 그릴 수 없으므로 오류는 session_state 에 남겨 selection_panel 이 표시한다.
+    """
+    st.session_state.pop("evidence_save_error", None)
     try:
         selected_files = list(st.session_state.manual_selected)
         # 중복 제거: 이미 저장된 것은 제외
-        new_items = [fn for fn in selected_files if _norm_id(fn) not in st.session_state.evidence_saved_keys]
+        new_items = [fn for fn in selected_files if norm_id(fn) not in st.session_state.evidence_saved_keys]
 
         if new_items:
             log_event(pid, "evidence_mark", new_items)
+            get_evidence_store().append(pid, "evidence_mark", new_items)
+            get_event_logger().flush(pid)  # 증거 저장은 즉시 디스크에
             for fn in new_items:
                 st.session_state.evidence_saved.add(fn)
-                st.session_state.evidence_saved_keys.add(_norm_id(fn))
+                st.session_state.evidence_saved_keys.add(norm_id(fn))
             st.toast(f"✅ 신규 {len(new_items)}개 저장 완료 (누적 {len(st.session_state.evidence_saved)}개)", icon="✅")
         else:
             st.toast("⚠️ 이미 저장된 항목만 선택되었습니다. 신규 저장 없음.", icon="⚠️")
 
         # 다음 검색/선택을 편하게 하기 위해 선택 목록은 비움
         st.session_state.manual_selected = set()
+        reset_result_editor()
     except Exception as e:
-        st.sidebar.error(f"저장 중 오류: {str(e)}")
+        st.session_state.evidence_save_error = f"저장 중 오류: {str(e)}"
+    st.rerun([RESULTS_FRAGMENT, SELECTION_FRAGMENT])
 
-if selected_count > 0:
-    if st.sidebar.button("🗑️ Clear All Selections", use_container_width=True, key="clear_selection_btn"):
-        st.session_state.manual_selected = set()
+def clear_selection():
+    """on_click: 선택 전체 해제. 결과 표(체크 해제)와 사이드바 선택 현황만 다시 그린다."""
+    st.session_state.manual_selected = set()
+    reset_result_editor()
+    st.rerun([RESULTS_FRAGMENT, SELECTION_FRAGMENT])
+
+def reset_result_editor():
+    """
+    결과 표 편집기 key 를 바꿔 새 편집기로 그리게 한다. 선택 목록을 코드에서 바꾼 뒤(저장·해제·페이지 전체 선택)
+    부르지 않으면 옛 key 에 남은 edited_rows 가 다음 렌더에서 이전 체크를 다시 적용한다.
+    """
+    st.session_state.editor_version = st.session_state.get("editor_version", 0) + 1
+
+@st.fragment(key=SELECTION_FRAGMENT)
+def selection_panel(pid: str):
+    """
+    증거·선택 현황 + 저장/해제 버튼. 결과 표에서 체크를 바꾸거나 버튼을 누르면 이 부분만 다시 그린다
+    (스크립트 전체·결과 목록은 다시 실행하지 않음).
+    """
+    with METRICS.fragment(SELECTION_FRAGMENT, pid=pid):
+        # 증거 관리
+        saved_count = len(st.session_state.evidence_saved)
+        st.success(f"Selected Evidence: **{saved_count}**")
+        with st.expander("List of Stored Evidence (Most Recent 10)", expanded=False):
+            for i, name in enumerate(heapq.nsmallest(10, st.session_state.evidence_saved), 1):   # 전체 정렬 없이 앞 10개
+                ell = "..." if len(name) > 50 else ""
+                st.write(f"{i}. {name[:50]}{ell}")
+            if saved_count > 10:
+                st.caption(f"… more {saved_count - 10}")
+
+        # 현재 선택 현황
+        selected_count = len(st.session_state.manual_selected)
+        if selected_count > 0:
+            st.info(f"Receently selected: **{selected_count}**")
+            with st.expander("List of Selected files"):
+                for idx, filename in enumerate(itertools.islice(st.session_state.manual_selected, 5), 1):
+                    ell = "..." if len(filename) > 50 else ""
+                    st.write(f"{idx}. {filename[:50]}{ell}")
+                if selected_count > 5:
+                    st.write(f"... more {selected_count - 5}")
+        else:
+            st.info("no selected files")
+
+        if "evidence_save_error" in st.session_state:
+            st.error(st.session_state.evidence_save_error)
+
+        st.button("📋 selected items to evidence", type="primary",
+                  disabled=(selected_count == 0), use_container_width=True, key="evidence_save_btn",
+                  on_click=save_selection_as_evidence, args=(pid,))
+
+        if selected_count > 0:
+            st.button("🗑️ Clear All Selections", use_container_width=True, key="clear_selection_btn",
+                      on_click=clear_selection)
+
+with st.sidebar:
+    selection_panel(pid)
 
 st.title("LLM Augment Tool Test")
-df = load_data()
+dataset = load_data()
 #st.markdown(f"📝 [사후 설문지 열기]({SURVEY_URL})")
 
 # ── 타이머 초기화 ──────────────────────────
+def time_is_up() -> bool:
+    return time.time() - st.session_state["start_time"] >= TIME_LIMIT_MINUTES * 60
+
 if "start_time" not in st.session_state:
     st.session_state["start_time"] = time.time()
     st.session_state["time_up"] = False
     log_event(pid, "phase_B_start", f"Phase B started: {TIME_LIMIT_MINUTES} minutes")
 
-elapsed = time.time() - st.session_state["start_time"]
-remaining_sec = TIME_LIMIT_MINUTES * 60 - elapsed
-if remaining_sec <= 0:
+if time_is_up():
     st.session_state["time_up"] = True
 
-initial_remaining = max(int(remaining_sec), 0)
+# 남은 시간은 브라우저가 마감 시각으로 계산한다. 타이머 HTML 이 실행마다 같아서
+# 전체 실행 때도 iframe 을 다시 만들지 않는다 (카운트다운·알림 상태 유지).
+deadline_ms = int((st.session_state["start_time"] + TIME_LIMIT_MINUTES * 60) * 1000)
 
 timeout_message = 'Phase B가 종료되었습니다! 실험이 완료되었습니다.'
 post_timeout_action = f"""
@@ -370,24 +313,24 @@ with st.sidebar:
     js_code = f"""
     <div id="timer" style="font-size: 20px; color: blue;">Time Remain: 00:00</div>
     <script>
-        var remaining = {initial_remaining};
+        var deadline = {deadline_ms};
         var timerElement = document.getElementById('timer');
         var alerted10 = false;
         var interval = setInterval(function() {{
+            var remaining = Math.max(Math.ceil((deadline - Date.now()) / 1000), 0);
             if (remaining <= 0) {{
                 clearInterval(interval);
                 timerElement.innerHTML = 'Time Exceed! {timeout_message}';
                 timerElement.style.color = 'red';
                 {post_timeout_action}
             }} else {{
-                if (remaining === 10 && !alerted10) {{
+                if (remaining <= 10 && !alerted10) {{
                     alert('10 seconds remaining! Time is almost up.');
                     alerted10 = true;
                 }}
                 var mins = Math.floor(remaining / 60);
                 var secs = remaining % 60;
                 timerElement.innerHTML = 'Time Remain: ' + (mins < 10 ? '0' : '') + mins + ':' + (secs < 10 ? '0' : '') + secs;
-                remaining--;
             }}
         }}, 1000);
     </script>
@@ -397,12 +340,13 @@ with st.sidebar:
 js_code = f"""
 <div id='timer' style='font-size:20px;color:blue;'>Time Remain: 00:00</div>
 <script>
-  var remaining      = {initial_remaining};
+  var deadline       = {deadline_ms};
   var timerEl        = document.getElementById('timer');
   var toast60Shown   = false;   // 60초 알림 1-회용
   var toast30Shown   = false;   // 30초 알림 1-회용
 
   var interval = setInterval(function () {{
+    var remaining = Math.max(Math.ceil((deadline - Date.now()) / 1000), 0);
     if (remaining <= 0) {{
       clearInterval(interval);
       timerEl.innerHTML = '시간 초과! {timeout_message}';
@@ -420,16 +364,14 @@ js_code = f"""
       (s < 10 ? '0':'') + s;
 
     /* ---------- 토스트 경고 ---------- */
-    if (remaining === 60 && !toast60Shown) {{
+    if (remaining <= 60 && remaining > 30 && !toast60Shown) {{
       toast60Shown = true;
       showGlobalToast('1 minute remaining', 3000);
     }}
-    if (remaining === 30 && !toast30Shown) {{
+    if (remaining <= 30 && !toast30Shown) {{
       toast30Shown = true;
       showGlobalToast('30 seconds remaining! Please begin summarizing your results now!', 3000);
     }}
-
-    remaining--;
   }}, 1000);
 
   /* ---------- 토스트 함수 ---------- */
@@ -484,17 +426,19 @@ if st.session_state["time_up"]:
     
     # [CHANGED] 타이머 종료 시 '신규'만 자동 저장
     selected_files = list(st.session_state.manual_selected)
-    new_items = [fn for fn in selected_files if _norm_id(fn) not in st.session_state.evidence_saved_keys]
+    new_items = [fn for fn in selected_files if norm_id(fn) not in st.session_state.evidence_saved_keys]
     if new_items:
         log_event(pid, "evidence_mark_on_timeout", new_items)
+        get_evidence_store().append(pid, "evidence_mark_on_timeout", new_items)
         for fn in new_items:
             st.session_state.evidence_saved.add(fn)
-            st.session_state.evidence_saved_keys.add(_norm_id(fn))
+            st.session_state.evidence_saved_keys.add(norm_id(fn))
         st.toast(f"✅ Time exceed: Auto saved : {len(new_items)} (cumulative total {len(st.session_state.evidence_saved)}개)", icon="✅")
     else:
         st.toast("⏰ Timer ended: There are no new items to auto-save.", icon="⏰")
+    get_event_logger().flush(pid, close=True)  # 세션 종료: 남은 이벤트 기록 후 파일 핸들 반환
     st.error("Phase B has ended. The experiment has been completed.")
-    st.stop()
+    stop_script()
 
 # ── 1단계 팝업 (앱 로드 시 1회) ──────────────────────────
 phase_step1_key = "phase_B_step1_popup"
@@ -576,24 +520,40 @@ with st.form("base_kw_form", clear_on_submit=False):
     base_kw_raw = st.text_input(
         "Basic Keywords (separate with commas, all keywords use OR logic)",
         placeholder="Enter at least 3 keywords together, e.g., police, traffic, enforcement, investigation",
-        help="Use commas or spaces as separators. Example: police, traffic, enforcement"
+        help="Use commas or spaces as separators. Example: police, traffic, enforcement  \n"
+             'Advanced: AND, OR, NOT (uppercase), "exact phrase", -exclude, ext:hwp, ( ). '
+             'Example: 보고서 AND (토지 OR 주택) ext:hwp -초안'
     )
     submitted = st.form_submit_button("Input Initial Keywords")  # ← 새 버튼
 
 # Enter 키 ↔ 버튼 클릭: 어떤 방법이든 submitted == True
 if submitted or base_kw_raw:          # 입력·제출 둘 중 하나라도 있으면
-    base_kw = base_kw_raw.replace(",", " ").split()
+    base_query = None
+    if is_boolean(base_kw_raw):       # AND/NOT/"구문"/ext: 를 쓴 입력 (kwtool.query), 아니면 기존 OR 키워드
+        try:
+            base_query = Query.parse(base_kw_raw)
+        except QuerySyntaxError as e:
+            st.error(f"Query syntax error: {e}"); stop_script()
+        base_kw = base_query.terms()  # LLM 증강·순위 가중에는 제외(NOT) 아닌 키워드만
+    else:
+        base_kw = base_kw_raw.replace(",", " ").split()
 else:
     st.info("Please enter your keywords and press Enter or click the **Enter Default Keywords** button.")
-    st.stop()
+    stop_script()
 
 N_OUT = 30
 st.write("##### LLM Augmented Keywords")
 if st.button(f"Generate {N_OUT}Augmented Keywords", disabled=len(base_kw)==0):
     log_event(pid, "click_generate", ",".join(base_kw))
     with st.spinner("Calling the model..."):
+        preview = st.empty()  # 스트리밍으로 도착하는 키워드 미리보기
         try:
-            rec_kw = fetch_llm_keywords(base_kw, n=N_OUT)
+            with METRICS.span("llm.fetch"):
+                rec_kw = fetch_llm_keywords(
+                    base_kw, n=N_OUT,
+                    on_partial=lambda kws: preview.caption(f"({len(kws)}/{N_OUT}) " + ", ".join(kws))
+                )
+            preview.empty()
             st.session_state["rec_kw"] = rec_kw
             log_event(pid, "llm_keywords", "|".join(rec_kw))
         except Exception as e:
@@ -602,11 +562,24 @@ rec_kw = st.session_state.get("rec_kw", [])
 picked = st.multiselect("Select Additional Keywords", rec_kw, default=rec_kw) if rec_kw else []
 
 final_kw = list(dict.fromkeys(base_kw + picked))
+# 검색어 문법: 고른 LLM 키워드는 최상위 OR 에 더하고 ext:·제외 조건은 그대로 건다
+final_query = base_query.or_terms(picked) if base_query is not None else None
 
-if final_kw:
+if final_query is not None and not final_query.empty:
+    st.success("query: " + str(final_query))
+elif final_kw:
     st.success("keywords: " + ", ".join(final_kw))  # 복원: 입력 키워드 표시
 else:
-    st.info("Input keywords or select"); st.stop()
+    st.info("Input keywords or select"); stop_script()
+
+fuzzy = FUZZY_MATCH and st.checkbox(
+    "Fuzzy match (typos, Hangul jamo, romanization)", key="fuzzy_match",
+    help="e.g. 보고셔 → 보고서, bogoseo → 보고서, budjet → budget"
+)
+content = bool(CONTENT_DIR) and st.checkbox(
+    "Search file contents", key="content_match",
+    help="Also match keywords inside indexed documents (HWP, DOCX, PDF, TXT)"
+)
 
 if st.button("Search"):
     st.session_state.first_search_done = True  # 2단계 전환 (개선 4)
@@ -614,19 +587,31 @@ if st.button("Search"):
         "base_keywords": base_kw,
         "llm_keywords": picked
     }
+    if base_query is not None:
+        keyword_payload["query"] = str(base_query)   # 정식 표기 (kwtool.evaluate 가 그대로 재현)
+    if fuzzy:
+        keyword_payload["fuzzy"] = True
+    if content:
+        keyword_payload["content"] = True
     log_event(pid, "search", keyword_payload)
     
-    res_df = search(df, final_kw, 1.0)
-    st.session_state["result"] = res_df
+    with METRICS.span("search"):
+        res = search(dataset, final_query if final_query is not None else final_kw, 1.0,
+                     base_keywords=base_kw if RANK_RESULTS else None, fuzzy=fuzzy, content=content)
+    st.session_state["result"] = res
+    st.session_state.current_page = 1
+    reset_result_editor()
 
     # ---- 팝업 플래그: 아직 안 보여줬을 때만 ----
     if not st.session_state.get("step2_popup_shown", False):
         st.session_state["show_step2_popup"] = True   # ❶에서 읽음
         st.session_state["step2_popup_shown"] = True  # 영구 표시
     
-    if not res_df.empty:
-        hit_files = res_df["filename"].tolist()
-        log_event(pid, "search_results", hit_files)
+    if not res.empty:
+        if LOG_RESULT_REFS:
+            log_event(pid, "search_results", ResultRef(get_result_store(), dataset.fingerprint, res))
+        else:
+            log_event(pid, "search_results", res.filenames())
     else:
         log_event(pid, "search_results", [])
         safe_msg = json.dumps(msg, ensure_ascii=False)
@@ -642,94 +627,119 @@ if st.button("Search"):
         
     
     # rerun으로 헤더 즉시 변환 반영 (검색 결과 유지)
-    st.rerun()
+    rerun_script()
 
 ##검색결과 토글 리스트업하는 페이지 시작
 
-res_df = st.session_state.get("result")
-if res_df is not None:
-    if res_df.empty:
-        st.info("검색 결과가 없습니다.")
+def sync_page_selection(editor_key: str, filenames: List[str]):
+    """
+    data_editor on_change: 이번 상호작용까지 바뀐 체크 상태를 manual_selected 에 한 번에 반영.
+    체크 상태는 편집기가 브라우저에서 들고 있으므로 사이드바 선택 현황만 다시 그린다.
+    """
+    edited = st.session_state[editor_key].get("edited_rows", {})
+    for i, change in edited.items():
+        if "selected" not in change:
+            continue
+        if change["selected"]:
+            st.session_state.manual_selected.add(filenames[int(i)])
+        else:
+            st.session_state.manual_selected.discard(filenames[int(i)])
+    st.rerun(SELECTION_FRAGMENT)
+
+def select_page(filenames: List[str], on: bool):
+    """on_click: 현재 페이지 전체 선택/해제. 결과 표와 사이드바 선택 현황만 다시 그린다."""
+    if on:
+        st.session_state.manual_selected.update(filenames)
     else:
-        st.subheader(f"Search Result - {len(res_df)}")
+        st.session_state.manual_selected.difference_update(filenames)
+    reset_result_editor()
+    st.rerun([RESULTS_FRAGMENT, SELECTION_FRAGMENT])
+
+def move_page(step: int):
+    st.session_state.current_page += step
+
+@st.fragment(key=RESULTS_FRAGMENT)
+def result_list(pid: str):
+    """검색 결과 목록. 페이지 이동·페이지 크기 변경·전체 선택은 이 프래그먼트만 다시 실행한다."""
+    with METRICS.fragment(RESULTS_FRAGMENT, pid=pid):
+        if time_is_up():
+            rerun_script()   # 종료 처리(자동 저장)는 전체 실행에서
+        res = st.session_state.get("result")
+        if res is None:
+            st.info("검색 버튼을 눌러 결과를 확인하세요.")
+            return
+        if res.empty:
+            st.info("검색 결과가 없습니다.")
+            return
+        st.subheader(f"Search Result - {len(res)}")
 
         if "current_page" not in st.session_state:
             st.session_state.current_page = 1
+        if "editor_version" not in st.session_state:
+            st.session_state.editor_version = 0
 
-        total_pages = math.ceil(len(res_df) / ITEMS_PER_PAGE)
-        start_idx = (st.session_state.current_page - 1) * ITEMS_PER_PAGE
-        end_idx = start_idx + ITEMS_PER_PAGE
-        view = res_df.iloc[start_idx:end_idx].reset_index(drop=True)
+        page_size = st.selectbox(
+            "Rows per page", PAGE_SIZE_OPTIONS, key="page_size",
+            on_change=lambda: st.session_state.update(current_page=1)
+        )
+        total_pages = math.ceil(len(res) / page_size)
+        st.session_state.current_page = min(st.session_state.current_page, total_pages)
+        start_idx = (st.session_state.current_page - 1) * page_size
+        end_idx = start_idx + page_size
+        with METRICS.span("results.page"):
+            view = res.page(start_idx, end_idx)   # 현재 페이지만 구성
+        filenames = view["filename"].tolist()
 
         col_all_on, col_all_off = st.columns(2)
         with col_all_on:
-            if st.button("Select all in page"):
-                for fn in view["filename"]:
-                    st.session_state.manual_selected.add(fn)
-                st.rerun()
+            st.button("Select all in page", on_click=select_page, args=(filenames, True))
         with col_all_off:
-            if st.button("Deselect all in page"):
-                for fn in view["filename"]:
-                    st.session_state.manual_selected.discard(fn)
-                st.rerun()
-
-        for i, row in view.iterrows():
-            fn = row["filename"]
-            chk_key = f"chk_B_{fn}_{id(fn)}"
-            btn_key = f"btn_B_{fn}_{id(fn)}"
-            
-            col_flag, col_txt = st.columns([0.06, 0.94])
-            
-            is_selected = fn in st.session_state.manual_selected
-
-            def toggle_file(fn, key):
-                """체크박스 on_change 콜백"""
-                if st.session_state[key]:      # 체크 ON
-                    st.session_state.manual_selected.add(fn)
-                else:                          # 체크 OFF
-                    st.session_state.manual_selected.discard(fn)
-            
-            # 1 체크박스  (value 파라미터 X, on_change 로만 동기화)
-            with col_flag:
-                st.checkbox(
-                    label="",
-                    key=chk_key,
-                    value=fn in st.session_state.manual_selected,  # 최초 1회만 쓰임
-                    on_change=toggle_file,
-                    args=(fn, chk_key)
-                )
-            # 2 파일명 버튼 (기존 기능 그대로)
-            with col_txt:
-                if st.button(f"**{fn}** (score={row['score']:.2f})", key=btn_key, help="Click to toggle selection"):
-                    if fn in st.session_state.manual_selected:
-                        st.session_state.manual_selected.discard(fn)
-                    else:
-                        st.session_state.manual_selected.add(fn)
-                    st.rerun()
-                
-                st.caption(f"`{fn}`")
-
-    # ── 페이지 네비게이션 ─────────────────────
-    st.divider()
-    col_prev, col_page, col_next = st.columns([2, 7, 2])
-    with col_prev:
-        if st.session_state.current_page > 1 and st.button("<< Before"):
-            st.session_state.current_page -= 1
-            st.rerun()
-    with col_page:
-        st.markdown(
-            f"**Current {st.session_state.current_page} / {total_pages}**",
-            unsafe_allow_html=True
-        )
-    with col_next:
-        if st.session_state.current_page < total_pages and st.button("Next >>"):
-            st.session_state.current_page += 1
-            st.rerun()
+            st.button("Deselect all in page", on_click=select_page, args=(filenames, False))
+
+        # 행마다 체크박스+버튼 위젯을 만들지 않고 페이지 전체를 편집기 하나로 렌더링
+        # (스크롤·체크는 브라우저에서 처리, 서버는 변경분만 받는다)
+        selected = st.session_state.manual_selected
+        page_df = pd.DataFrame({
+            "selected": [fn in selected for fn in filenames],
+            "filename": filenames,
+            "score": view["score"].to_numpy(),
+        })
+        editor_key = f"result_editor_{st.session_state.current_page}_{page_size}_{st.session_state.editor_version}"
+        with METRICS.span("render.results"):
+            st.data_editor(
+                page_df,
+                key=editor_key,
+                hide_index=True,
+                disabled=["filename", "score"],
+                column_config={
+                    "selected": st.column_config.CheckboxColumn("✔", width="small"),
+                    "filename": st.column_config.TextColumn("File name", width="large"),
+                    "score": st.column_config.NumberColumn("Score", format="%.2f", width="small"),
+                },
+                height=min(38 + 35 * len(page_df), RESULT_TABLE_MAX_HEIGHT),
+                use_container_width=True,
+                on_change=sync_page_selection,
+                args=(editor_key, filenames),
+            )
 
-##검색결과 토글 리스트업하는 페이지 종료
+        # ── 페이지 네비게이션 ─────────────────────
+        st.divider()
+        col_prev, col_page, col_next = st.columns([2, 7, 2])
+        with col_prev:
+            if st.session_state.current_page > 1:
+                st.button("<< Before", on_click=move_page, args=(-1,))
+        with col_page:
+            st.markdown(
+                f"**Current {st.session_state.current_page} / {total_pages}**",
+                unsafe_allow_html=True
+            )
+        with col_next:
+            if st.session_state.current_page < total_pages:
+                st.button("Next >>", on_click=move_page, args=(1,))
 
-else:
-    st.info("검색 버튼을 눌러 결과를 확인하세요.")
+result_list(pid)
+
+##검색결과 토글 리스트업하는 페이지 종료
 
 st.markdown("""
         <style>
@@ -768,5 +778,17 @@ st.markdown("""
 #st.sidebar.markdown(f"📝 [사후 설문지 열기]({SURVEY_URL})")
 st.sidebar.markdown("---")
 log_file = LOG_DIR / "phase_b" / f"{pid}.csv"
+
+def log_download_data(pid: str, log_file: Path):
+    """내려받기 버튼을 눌렀을 때만 큐를 비우고(fsync 포함) 로그를 읽는다. 매 rerun 마다 기다리지 않도록."""
+    logger = get_event_logger()
+
+    def data() -> bytes:
+        logger.flush(pid)
+        return log_file.read_bytes()
+    return data
+
 if log_file.exists():
-    st.sidebar.download_button("Log download", log_file.read_bytes(), file_name=f"{pid}_phase_b.csv")
+    st.sidebar.download_button("Log download", log_download_data(pid, log_file), file_name=f"{pid}_phase_b.csv")
+
+METRICS.end_rerun()
@@ -0,0 +1,148 @@
+"""
+검색 API(kwtool.api) 처리량: 동시 접속 수별 queries/second.
+
+    python benchmarks/bench_api.py                               # 100k 행, 워커 1
+    python benchmarks/bench_api.py --rows 1000000 --workers 4 --concurrency 1 8 32
+
+서버를 별도 프로세스로 띄우고 keep-alive 연결 C 개로 /search 를 계속 보낸다.
+같은 질의 목록을 /search/batch 로 --batch 개씩 묶어 보낸 처리량도 함께 잰다.
+질의는 bench_search.make_keywords 의 키워드 집합을 시드만 바꿔 만든다 (일부 키워드가 질의 간에 겹침).
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "benchmarks"))
+from bench_search import make_filenames, make_keywords  # noqa: E402
+
+
+class Conn:
+    """최소 HTTP/1.1 keep-alive 클라이언트 (외부 의존성 없이 측정)."""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def post(self, path: str, body: dict) -> dict:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode("ascii") + data
+        )
+        await self.writer.drain()
+        status = await self.reader.readline()
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        payload = await self.reader.readexactly(length)
+        if b" 200 " not in status:
+            raise RuntimeError(f"{status!r} {payload[:200]!r}")
+        return json.loads(payload)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def load(host: str, port: int, path: str, bodies: list, concurrency: int) -> float:
+    """bodies 를 concurrency 개 연결로 나눠 보내고 걸린 시간(초)."""
+    pending = iter(bodies)
+    conns = [Conn(host, port) for _ in range(concurrency)]
+
+    async def worker(conn):
+        for body in pending:
+            await conn.post(path, body)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(c) for c in conns))
+    elapsed = time.perf_counter() - t0
+    for c in conns:
+        c.close()
+    return elapsed
+
+
+async def wait_ready(host: str, port: int, proc: subprocess.Popen, timeout: float = 600) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited")
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise TimeoutError("server did not start")
+
+
+def make_queries(n: int, keywords: int, first_seed: int = 0):
+    return [{"keywords": make_keywords(keywords, seed=first_seed + i), "limit": 30} for i in range(n)]
+
+
+async def run(args, port: int, proc: subprocess.Popen) -> None:
+    host = "127.0.0.1"
+    await wait_ready(host, port, proc)
+    queries = make_queries(args.queries, args.keywords)
+    # 한 번 돌려 결과 LRU 를 채운 상태와, 처음 보는 질의(다른 시드) 상태를 각각 잰다
+    fresh = [make_queries(args.queries, args.keywords, (k + 1) * args.queries) for k in range(len(args.concurrency))]
+    await load(host, port, "/search", queries, max(args.concurrency))
+
+    print(f"{'endpoint':<14} {'conc':>5} {'cache':>6} {'queries':>8} {'qps':>9}")
+    for conc, cold in zip(args.concurrency, fresh):
+        for label, bodies in (("cold", cold), ("warm", queries)):
+            elapsed = await load(host, port, "/search", bodies, conc)
+            print(f"{'/search':<14} {conc:>5} {label:>6} {len(bodies):>8} {len(bodies) / elapsed:>9.1f}")
+
+    cold = make_queries(args.queries, args.keywords, (len(args.concurrency) + 1) * args.queries)
+    for label, qs in (("cold", cold), ("warm", queries)):
+        batches = [
+            {"queries": [dict(q, limit=0) for q in qs[i:i + args.batch]]}
+            for i in range(0, len(qs), args.batch)
+        ]
+        elapsed = await load(host, port, "/search/batch", batches, max(args.concurrency))
+        print(f"{'/search/batch':<14} {max(args.concurrency):>5} {label:>6} {len(qs):>8} {len(qs) / elapsed:>9.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--workers", type=int, default=1, help="서버 프로세스 수")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    ap.add_argument("--queries", type=int, default=500, help="측정당 질의 수")
+    ap.add_argument("--keywords", type=int, default=30, help="질의당 키워드 수")
+    ap.add_argument("--batch", type=int, default=100, help="/search/batch 한 요청의 질의 수")
+    ap.add_argument("--port", type=int, default=8699)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = Path(tmp) / "dataset.csv"
+        make_filenames(args.rows).to_csv(dataset, index=False)
+        env = dict(os.environ, PYTHONPATH=str(ROOT), LLM_OFFLINE="1")
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "kwtool.api", str(dataset), "--port", str(args.port),
+             "--workers", str(args.workers), "--log-dir", str(Path(tmp) / "logs")],
+            env=env,
+        )
+        try:
+            asyncio.run(run(args, args.port, proc))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+본문 색인(kwtool.content) 구축 처리량과 본문 검색 비용.
+
+    python benchmarks/bench_content.py                           # 문서 2,000개, 워커 1·2·4·…·코어 수
+    python benchmarks/bench_content.py --docs 20000 --workers 1 8 16
+
+TXT·DOCX·HWPX 를 섞은 가짜 문서 디렉토리를 임시로 만들고 워커 수별로 처음부터 색인한다 (files/s, MB/s).
+이어서 바뀐 것 없는 재실행(크기·mtime 만 확인)과 10% 수정 후 증분 재실행 시간을 재고,
+본문 색인을 붙인 검색을 색인 없이 본문을 전부 읽어 찾는 방식과 비교한다.
+"""
+import argparse
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+from bench_search import WORDS  # noqa: E402
+from kwtool import content  # noqa: E402
+from kwtool.content import ContentIndex, build, index_dir_for  # noqa: E402
+from kwtool.dataset import Dataset  # noqa: E402
+
+QUERIES = ["보고서", "budget2023", "계약서초안", "없는키워드"]
+
+
+def _zip(member: str, xml: str) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(member, xml)
+    return buf.getvalue()
+
+
+def make_docs(doc_dir: Path, n: int, words_per_doc: int, seed: int = 0) -> list:
+    rnd = random.Random(seed)
+    vocab = WORDS + ["계약서 초안", "budget2023", "press release"]
+    names = []
+    for i in range(n):
+        paras = [" ".join(rnd.choice(vocab) for _ in range(20)) for _ in range(words_per_doc // 20)]
+        ext = rnd.choice([".txt", ".docx", ".hwpx"])
+        path = doc_dir / f"d{i % 50:02d}" / f"doc_{i:06d}{ext}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if ext == ".txt":
+            path.write_bytes("\n".join(paras).encode("cp949" if i % 2 else "utf-8"))
+        elif ext == ".docx":
+            body = "".join(f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in paras)
+            path.write_bytes(_zip("word/document.xml", f'<w:document xmlns:w="w"><w:body>{body}</w:body></w:document>'))
+        else:
+            body = "".join(f"<hp:p><hp:run><hp:t>{p}</hp:t></hp:run></hp:p>" for p in paras)
+            path.write_bytes(_zip("Contents/section0.xml", f'<hs:sec xmlns:hs="s" xmlns:hp="p">{body}</hs:sec>'))
+        names.append(path.name)
+    return names
+
+
+def scan_all(doc_dir: Path, norm_kw: str) -> int:
+    """색인 없이: 질의마다 모든 문서를 추출·정규화해 찾기 (비교 기준)."""
+    hits = 0
+    for path in doc_dir.rglob("*"):
+        if path.is_file():
+            hits += norm_kw in content.normalize_text(content.extract_text(path))
+    return hits
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    res = fn(*args, **kwargs)
+    return res, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--docs", type=int, default=2000)
+    ap.add_argument("--words", type=int, default=2000, help="문서당 단어 수")
+    cpus = os.cpu_count() or 1
+    ap.add_argument("--workers", type=int, nargs="+",
+                    default=sorted({1, 2, 4, cpus} & set(range(1, cpus + 1))) or [1])
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench_content_"))
+    try:
+        doc_dir = tmp / "docs"
+        names = make_docs(doc_dir, args.docs, args.words)
+        mb = sum(p.stat().st_size for p in doc_dir.rglob("*") if p.is_file()) / 1e6
+        print(f"{args.docs} docs, {mb:.1f} MB, {os.cpu_count()} cpus")
+
+        print(f"{'workers':>8} {'build(s)':>9} {'files/s':>9} {'MB/s':>7}")
+        for w in args.workers:
+            shutil.rmtree(index_dir_for(doc_dir), ignore_errors=True)
+            _, t = timed(build, doc_dir, workers=w)
+            print(f"{w:>8} {t:>9.2f} {args.docs / t:>9.0f} {mb / t:>7.1f}")
+
+        _, t_noop = timed(build, doc_dir, workers=args.workers[-1])
+        for path in sorted(doc_dir.rglob("*.txt"))[:args.docs // 10]:
+            path.write_text(path.read_text(encoding="utf-8", errors="replace") + " 수정", encoding="utf-8")
+        stats, t_inc = timed(build, doc_dir, workers=args.workers[-1])
+        print(f"unchanged rescan {t_noop * 1e3:.0f} ms; incremental ({stats['indexed']} changed) {t_inc:.2f} s")
+
+        index = ContentIndex.open(index_dir_for(doc_dir))
+        ds = Dataset.from_frame(pd.DataFrame({"filename": names, "label": "F"}))
+        print(f"{'query':>12} {'scan(ms)':>10} {'cold(ms)':>9} {'warm(ms)':>9} {'hits':>6}")
+        for kw in QUERIES:
+            n_scan, t_scan = timed(scan_all, doc_dir, kw)
+            rows, t_cold = timed(ds.term_rows, kw, content=index)
+            _, t_warm = timed(ds.term_rows, kw, content=index)
+            if len(rows) != n_scan:      # 파일명(doc_000123.txt)에는 질의 키워드가 없다
+                raise SystemExit(f"결과 불일치: {kw}")
+            print(f"{kw:>12} {t_scan * 1e3:>10.0f} {t_cold * 1e3:>9.1f} {t_warm * 1e3:>9.3f} {len(rows):>6}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
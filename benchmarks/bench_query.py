@@ -0,0 +1,74 @@
+"""
+불리언 검색어(kwtool.query) 평가 비용: 키워드별 적중 배열의 집합 연산 vs 질의마다 파일명 컬럼 전체 스캔.
+
+    python benchmarks/bench_query.py                      # 1M 행
+    python benchmarks/bench_query.py --rows 100000 1000000
+
+기준(scan)은 잎 노드마다 정규화 컬럼에 str.contains / str.endswith 를 돌리고 불리언 마스크로 AND/OR/NOT.
+indexed 는 Dataset.query_rows (cold: 키워드 캐시 비움, warm: 같은 질의 반복). 결과 행이 같은지도 확인한다.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_search import make_filenames  # noqa: E402
+from kwtool.dataset import Dataset  # noqa: E402
+from kwtool.query import Query  # noqa: E402
+
+QUERIES = [
+    "보고서 report",
+    "보고서 AND 부동산",
+    '"press release" AND (토지정책 OR 주택정책) -draft',
+    "보고서 report 결재 approval ext:hwp ext:pdf -초안 -photo",
+    "(budget OR 예산) AND (final OR 결재) AND NOT (holiday OR photo) ext:xlsx",
+    "NOT (notes OR meeting OR 회의록)",
+]
+
+
+def scan_mask(node, norm: pd.Series) -> np.ndarray:
+    op = node[0]
+    if op == "term":
+        return norm.str.contains(node[1], regex=False).to_numpy(dtype=bool)
+    if op == "ext":
+        return norm.str.endswith("." + node[1]).to_numpy(dtype=bool)
+    if op == "not":
+        return ~scan_mask(node[1], norm)
+    masks = [scan_mask(c, norm) for c in node[1]]
+    if not masks:
+        return np.zeros(len(norm), dtype=bool)
+    return np.logical_and.reduce(masks) if op == "and" else np.logical_or.reduce(masks)
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    res = fn(*args)
+    return res, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    args = ap.parse_args()
+
+    print(f"{'rows':>9} {'scan(ms)':>9} {'cold(ms)':>9} {'warm(ms)':>9} {'hits':>8}  query")
+    for n in args.rows:
+        ds = Dataset.from_frame(make_filenames(n))
+        for text in QUERIES:
+            query = Query.parse(text)
+            mask, t_scan = timed(scan_mask, query.node, ds.norm)
+            ds._term_cache.clear()
+            rows, t_cold = timed(ds.query_rows, query)
+            _, t_warm = timed(ds.query_rows, query)
+            if not np.array_equal(rows, np.flatnonzero(mask)):
+                raise SystemExit(f"결과 불일치: {text}")
+            print(f"{n:>9} {t_scan * 1e3:>9.1f} {t_cold * 1e3:>9.1f} {t_warm * 1e3:>9.2f} {len(rows):>8}  {query}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+검색 결과 화면의 상호작용 1회당 서버 시간 측정.
+
+Streamlit 은 체크 하나에도 스크립트 전체를 다시 실행하므로, 결과 화면이 떠 있는 상태에서
+재실행 1회 시간을 상호작용 비용으로 본다 (AppTest 로 구동, 브라우저 렌더링 시간 제외).
+
+    python benchmarks/bench_results_ui.py                          # 현재 트리
+    git worktree add /tmp/kw_old <commit>
+    python benchmarks/bench_results_ui.py --app /tmp/kw_old        # 이전 구현과 비교
+
+"Rows per page" 선택이 있으면 --page-sizes 각각을, 없으면(이전 구현) 고정 페이지 크기만 잰다.
+"""
+import argparse
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_search import make_filenames  # noqa: E402
+
+APP_FILE = "LLM_Keyword_augumentation_evaluation_tool.py"
+
+
+def start_app(app_dir: Path):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(app_dir / APP_FILE), default_timeout=120)
+    at.run()
+    at.sidebar.text_input[0].input("bench").run()
+    [t for t in at.text_input if t.label.startswith("Basic")][0].input("보고서, report")
+    [b for b in at.button if b.label == "Input Initial Keywords"][0].click().run()
+    [b for b in at.button if b.label == "Search"][0].click().run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return at
+
+
+def time_reruns(at, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--app", type=Path, default=Path(__file__).resolve().parents[1], help="측정할 트리 (앱 스크립트 위치)")
+    ap.add_argument("--rows", type=int, default=100_000, help="합성 데이터셋 행 수")
+    ap.add_argument("--page-sizes", type=int, nargs="+", default=[30, 100, 500, 1000])
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        app_dir = Path(tmp) / "app"
+        shutil.copytree(args.app, app_dir, ignore=shutil.ignore_patterns(".git", "__pycache__", "logs", "*.cache"))
+        make_filenames(args.rows).to_csv(app_dir / "dataset.csv", index=False)
+        os.chdir(app_dir)
+
+        at = start_app(app_dir)
+        sizes = [s for s in at.selectbox if s.label == "Rows per page"]
+        print(f"{'page size':>10} {'rerun ms':>10}")
+        if not sizes:
+            print(f"{'fixed':>10} {time_reruns(at, args.repeat):10.1f}")
+            return
+        for size in args.page_sizes:
+            sizes[0].set_value(size).run()
+            print(f"{size:>10} {time_reruns(at, args.repeat):10.1f}")
+            sizes = [s for s in at.selectbox if s.label == "Rows per page"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+기존 행 단위 score() 검색과 kwtool.engine 벡터화 검색의 속도 비교.
+
+    python benchmarks/bench_search.py                      # 10k / 1M / 10M 행
+    python benchmarks/bench_search.py --rows 10000 1000000 --keywords 30
+
+같은 행·점수가 나오는지도 크기마다 함께 확인한다.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from kwtool.engine import filter_keywords, normalize_names, search_frame  # noqa: E402
+
+WORDS = [
+    "보고서", "결재", "보도자료", "주택정책", "토지정책", "부동산", "회의록", "예산",
+    "report", "final", "draft", "meeting", "notes", "budget", "policy", "housing",
+    "land", "press", "release", "approval", "plan", "photo", "holiday", "invoice",
+]
+EXTS = ["hwp", "docx", "pdf", "xlsx", "txt", "pptx", "zip", "jpg"]
+
+
+def make_filenames(n: int, seed: int = 0) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    names = [
+        "{}_{} {}_{}.{}".format(
+            rnd.choice(WORDS), rnd.choice(WORDS), rnd.choice(WORDS),
+            rnd.randint(0, 9999), rnd.choice(EXTS)
+        )
+        for _ in range(n)
+    ]
+    labels = [rnd.choice("TF") for _ in range(n)]
+    return pd.DataFrame({"filename": names, "label": labels})
+
+
+def make_keywords(k: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    # 파일명에 쓰인 단어 몇 개 + 없는 단어 위주 (LLM 추천 키워드 대부분은 적중이 드묾)
+    misses = [f"{w}{i}" for i in range(k) for w in ("기안", "secret", "국토", "minutes")]
+    return rnd.sample(WORDS, min(3, k)) + rnd.sample(misses, max(k - 3, 0))
+
+
+def legacy_search(df: pd.DataFrame, keywords: list, threshold: float) -> pd.DataFrame:
+    """기존 search() 본문 그대로 (비교 기준)."""
+    filtered_kw = filter_keywords(keywords)
+    if not filtered_kw:
+        return df.iloc[0:0]
+
+    def normalize(txt: str) -> str:
+        return txt.lower().replace(" ", "")
+
+    def score(name: str) -> float:
+        norm_name = normalize(name)
+        for kw in filtered_kw:
+            if normalize(kw) in norm_name:
+                return 1.0
+        return 0.0
+
+    out = df.copy()
+    out["score"] = out["filename"].apply(score)
+    return out[out["score"] >= threshold].sort_values("score", ascending=False)
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    res = fn(*args, **kwargs)
+    return res, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    ap.add_argument("--keywords", type=int, default=30)
+    ap.add_argument("--skip-legacy", action="store_true", help="기존 구현 측정 생략 (대용량에서 수 분 소요)")
+    args = ap.parse_args()
+
+    keywords = make_keywords(args.keywords)
+    print(f"keywords={len(keywords)}")
+    print(f"{'rows':>10} {'legacy(s)':>10} {'engine(s)':>10} {'engine+norm(s)':>15} {'speedup':>8} {'hits':>9}")
+    for n in args.rows:
+        df = make_filenames(n)
+        norm, _ = timed(normalize_names, df["filename"])
+        fast, t_engine = timed(search_frame, df, keywords, 1.0, norm=norm)
+        _, t_engine_norm = timed(search_frame, df, keywords, 1.0)
+
+        if args.skip_legacy:
+            t_legacy, speedup = float("nan"), "-"
+        else:
+            slow, t_legacy = timed(legacy_search, df, keywords, 1.0)
+            if not (slow.index.equals(fast.index) and slow["score"].equals(fast["score"])):
+                raise SystemExit(f"결과 불일치 (rows={n})")
+            speedup = f"{t_legacy / t_engine:.1f}x"
+        print(f"{n:>10} {t_legacy:>10.3f} {t_engine:>10.3f} {t_engine_norm:>15.3f} {speedup:>8} {len(fast):>9}")
+
+
+if __name__ == "__main__":
+    main()
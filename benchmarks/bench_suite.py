@@ -0,0 +1,220 @@
+"""
+검색·적재·로깅·LLM 호출 경로 회귀 측정 모음. 결과를 JSON 으로 남겨 커밋 간 비교한다.
+
+    python benchmarks/bench_suite.py --out bench.json                       # 10k / 1M / 10M 행
+    python benchmarks/bench_suite.py --rows 10000 --out quick.json --repeat 3
+    python benchmarks/bench_suite.py --compare before.json after.json       # 항목별 비율
+
+측정 항목 (모두 Streamlit 없이 kwtool 만 사용):
+- ingest : CSV 스트리밍 적재(ingest_csv), 디스크 캐시 구축(open_dataset, 캐시 없음), 캐시 열기(메모리 맵)
+- search : Dataset.search / Dataset.rank, 키워드 1~100개, 키워드 캐시가 빈 상태(cold)와 찬 상태(warm)
+- log    : EventLogger.log 큐 투입, flush 까지 디스크 반영
+- llm    : KeywordClient.fetch — 업스트림은 스텁(고정 키워드 스트리밍), 캐시 미스·적중 각각
+데이터는 bench_search.make_filenames (한글·영문 단어를 섞은 파일명, label T/F 무작위).
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+from bench_search import WORDS, make_filenames, make_keywords  # noqa: E402
+from kwtool.dataset import ENCODING_CANDIDATES, ingest_csv  # noqa: E402
+from kwtool.eventlog import EventLogger  # noqa: E402
+from kwtool.llm import KeywordClient  # noqa: E402
+from kwtool.llm_cache import LLMCache  # noqa: E402
+from kwtool.store import open_dataset  # noqa: E402
+
+KEYWORD_COUNTS = [1, 10, 30, 100]
+LOG_EVENTS = 10_000
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Callable[[], None] = None) -> dict:
+    """fn 을 repeat 번 실행한 시간(초) 요약. setup 은 매 회 측정 밖에서 먼저 실행."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {"median_s": statistics.median(times), "min_s": min(times), "repeat": repeat}
+
+
+class StubKeywordClient(KeywordClient):
+    """업스트림 호출 대신 고정 키워드를 스트리밍하는 클라이언트 (네트워크·API 키 불필요)."""
+
+    def __init__(self, *, delay: float = 0.0, **kwargs):
+        super().__init__(api_key="stub", **kwargs)
+        self.delay = delay
+
+    async def _complete(self, user_input: str, n: int, call) -> List[str]:
+        keywords = [f"{WORDS[i % len(WORDS)]}{i}" for i in range(n)]
+        for i in range(0, n, 5):
+            await asyncio.sleep(self.delay)
+            call.partial = keywords[:i + 5]
+        return keywords
+
+
+def bench_ingest(csv_path: Path, work: Path, repeat: int) -> List[dict]:
+    cache_dir = work / "cache"
+
+    def clear_cache():
+        for f in cache_dir.glob("*"):
+            f.unlink()
+
+    return [
+        {"name": "ingest_csv", **measure(lambda: ingest_csv(csv_path, ENCODING_CANDIDATES), repeat)},
+        {"name": "open_dataset_build", **measure(
+            lambda: open_dataset(csv_path, ENCODING_CANDIDATES, cache_dir=cache_dir), repeat, setup=clear_cache
+        )},
+        {"name": "open_dataset_cached", **measure(
+            lambda: open_dataset(csv_path, ENCODING_CANDIDATES, cache_dir=cache_dir), repeat
+        )},
+    ]
+
+
+def bench_search(ds, repeat: int) -> List[dict]:
+    out = []
+    base = make_keywords(3)
+    for k in KEYWORD_COUNTS:
+        keywords = make_keywords(k)
+        cases = {
+            "search": lambda: ds.search(keywords, 1.0),
+            "rank": lambda: ds.rank(keywords, base, min_len=2, ignore_single_digit=True).page(0, 30),
+        }
+        for name, fn in cases.items():
+            out.append({"name": f"{name}_cold", "keywords": k, **measure(fn, repeat, setup=ds._term_cache.clear)})
+            fn()
+            out.append({"name": f"{name}_warm", "keywords": k, **measure(fn, repeat)})
+    return out
+
+
+def bench_log(work: Path, repeat: int) -> List[dict]:
+    logger = EventLogger(work / "logs")
+    payload = {"base_keywords": ["보고서", "report"], "llm_keywords": make_keywords(30)}
+
+    def enqueue():
+        for i in range(LOG_EVENTS):
+            logger.log(f"P{i % 50:02d}", "search", payload)
+
+    def end_to_end():
+        enqueue()
+        logger.flush()
+
+    res = [
+        {"name": "log_enqueue", "events": LOG_EVENTS, **measure(enqueue, repeat, setup=logger.flush)},
+        {"name": "log_flush", "events": LOG_EVENTS, **measure(end_to_end, repeat)},
+    ]
+    logger.shutdown()
+    return res
+
+
+def bench_llm(work: Path, repeat: int) -> List[dict]:
+    cache = LLMCache(work / "llm_cache.sqlite")
+    client = StubKeywordClient(cache=cache)
+    counter = iter(range(1 << 30))
+
+    def miss():
+        client.fetch(["보고서", f"draft{next(counter)}"], 30)
+
+    client.fetch(["보고서", "report"], 30)
+    res = [
+        {"name": "llm_fetch_miss", **measure(miss, repeat)},
+        {"name": "llm_fetch_cached", **measure(lambda: client.fetch(["보고서", "report"], 30), repeat)},
+    ]
+    client.close()
+    return res
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(rows: List[int], repeat: int) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        for n in rows:
+            csv_path = work / f"dataset_{n}.csv"
+            make_filenames(n).to_csv(csv_path, index=False)
+            # 적재는 느리므로 반복 횟수를 줄인다
+            for r in bench_ingest(csv_path, work, max(1, repeat // 3)):
+                results.append({"group": "ingest", "rows": n, **r})
+            ds = open_dataset(csv_path, ENCODING_CANDIDATES, cache_dir=work / "cache")
+            for r in bench_search(ds, repeat):
+                results.append({"group": "search", "rows": n, **r})
+            del ds
+            print(f"rows={n} done", file=sys.stderr)
+        for r in bench_log(work, repeat):
+            results.append({"group": "log", **r})
+        for r in bench_llm(work, repeat):
+            results.append({"group": "llm", **r})
+    return {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__, "pyarrow": pa.__version__},
+        "results": results,
+    }
+
+
+def case_key(r: dict) -> tuple:
+    return tuple((k, r[k]) for k in ("group", "name", "rows", "keywords", "events") if k in r)
+
+
+def compare(before_path: Path, after_path: Path) -> None:
+    before = json.loads(before_path.read_text(encoding="utf-8"))
+    after = json.loads(after_path.read_text(encoding="utf-8"))
+    old = {case_key(r): r for r in before["results"]}
+    print(f"{before.get('commit') or before_path} → {after.get('commit') or after_path}")
+    print(f"{'case':<48} {'before ms':>10} {'after ms':>10} {'ratio':>7}")
+    for r in after["results"]:
+        prev = old.get(case_key(r))
+        label = " ".join(str(v) for _, v in case_key(r))
+        if prev is None:
+            print(f"{label:<48} {'-':>10} {r['median_s'] * 1000:>10.2f} {'-':>7}")
+            continue
+        ratio = r["median_s"] / prev["median_s"] if prev["median_s"] else float("nan")
+        print(f"{label:<48} {prev['median_s'] * 1000:>10.2f} {r['median_s'] * 1000:>10.2f} {ratio:>6.2f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", type=Path, help="결과 JSON 경로 (없으면 표준 출력)")
+    ap.add_argument("--compare", type=Path, nargs=2, metavar=("BEFORE", "AFTER"), help="두 결과 JSON 비교만 수행")
+    args = ap.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    report = json.dumps(run(args.rows, args.repeat), ensure_ascii=False, indent=2)
+    if args.out:
+        args.out.write_text(report + "\n", encoding="utf-8")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
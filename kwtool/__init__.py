@@ -0,0 +1 @@
+"""LLM 키워드 증강 도구의 Streamlit 독립 코어 모듈."""
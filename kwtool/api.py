@@ -0,0 +1,220 @@
+"""
+헤드리스 HTTP 검색 API (Starlette + uvicorn).
+
+앱 검색 버튼과 같은 Core.search() 규칙(키워드 필터, 결과 LRU, 순위·근사 일치 옵션)과 LLM 키워드 증강을
+스크립트에서 호출할 수 있게 한다. 데이터셋·색인은 프로세스당 한 번 열고(디스크 캐시 메모리 맵) 모든 요청이 공유한다.
+
+    python -m kwtool.api dataset.csv --port 8600 --workers 4
+
+    python -m kwtool.api dataset.csv --content-dir evidence_docs    # 본문 색인(kwtool.content) 검색 허용
+
+    POST /search        {"keywords": [...], "threshold": 1.0, "base_keywords": [...], "fuzzy": false, "content": false,
+                         "min_len": 2, "ignore_single_digit": true, "offset": 0, "limit": 30}
+                        → {"count": N, "rows": [{"row", "filename", "label", "score"}, ...]}
+                        keywords 대신 {"query": "보고서 AND (report OR 결재) ext:hwp -초안"} (kwtool.query 문법)
+    POST /search/batch  {"queries": [{...}, ...], "limit": 0} → {"results": [{"count", "rows"}, ...]}
+    POST /augment       {"base_keywords": [...], "n": 30} → {"keywords": [...]}
+    GET  /health        → {"rows", "fingerprint"}
+    GET  /metrics       → Prometheus text (KWTOOL_METRICS=1 일 때 값이 쌓인다, 워커 프로세스별)
+
+검색은 CPU 작업이므로 이벤트 루프 밖 스레드 풀에서 돌린다. 배치는 질의 전체를 스레드 작업 하나로 처리해
+키워드별 적중 캐시(Dataset.term_rows)와 결과 LRU 를 질의끼리 바로 공유한다.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from kwtool.core import Core
+from kwtool.metrics import METRICS
+from kwtool.query import Query
+
+DEFAULT_LIMIT = 30
+MAX_LIMIT = 1000
+MAX_BATCH = 1000
+SEARCH_OPTIONS = ("min_len", "ignore_single_digit", "base_keywords", "fuzzy", "content")
+ENV_DATASET = "KWTOOL_DATASET"
+ENV_LOG_DIR = "KWTOOL_LOG_DIR"
+ENV_CONTENT_DIR = "KWTOOL_CONTENT_DIR"
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _str_list(value, field: str) -> List[str]:
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise BadRequest(f"{field} must be a list of strings")
+    return value
+
+
+def _int(value, field: str, lo: int, hi: int) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or not lo <= value <= hi:
+        raise BadRequest(f"{field} must be an integer in [{lo}, {hi}]")
+    return value
+
+
+def _bool(value, field: str) -> bool:
+    if not isinstance(value, bool):
+        raise BadRequest(f"{field} must be true or false")
+    return value
+
+
+def parse_query(body) -> dict:
+    """요청 JSON → Core.search 인자 + 페이지 범위. 잘못된 입력은 BadRequest."""
+    if not isinstance(body, dict):
+        raise BadRequest("query must be a JSON object")
+    if "query" in body:
+        if not isinstance(body["query"], str):
+            raise BadRequest("query must be a string")
+        keywords = Query.parse(body["query"])   # 문법 오류는 QuerySyntaxError (ValueError → 400)
+    else:
+        keywords = _str_list(body.get("keywords"), "keywords")
+    query = {
+        "keywords": keywords,
+        "threshold": body.get("threshold", 1.0),
+        "offset": _int(body.get("offset", 0), "offset", 0, 1 << 31),
+        "limit": _int(body.get("limit", DEFAULT_LIMIT), "limit", 0, MAX_LIMIT),
+    }
+    if isinstance(query["threshold"], bool) or not isinstance(query["threshold"], (int, float)):
+        raise BadRequest("threshold must be a number")
+    for name in SEARCH_OPTIONS:
+        if name in body:
+            query[name] = body[name]
+    if "base_keywords" in query and query["base_keywords"] is not None:
+        _str_list(query["base_keywords"], "base_keywords")
+    if "min_len" in query:
+        _int(query["min_len"], "min_len", 0, 1 << 16)
+    for name in ("ignore_single_digit", "fuzzy", "content"):
+        if name in query:
+            _bool(query[name], name)
+    return query
+
+
+def run_query(core: Core, query: dict) -> dict:
+    """질의 하나 실행 → {"count", "rows"} (rows 는 [offset, offset+limit) 구간만 구성)."""
+    opts = {k: query[k] for k in SEARCH_OPTIONS if k in query}
+    res = core.search(query["keywords"], query["threshold"], **opts)
+    out = {"count": len(res), "rows": []}
+    if query["limit"]:
+        start = min(query["offset"], len(res))
+        page = res.page(start, start + query["limit"])
+        # DataFrame.to_dict 대신 컬럼별 tolist (페이지 직렬화가 질의 시간의 대부분이라)
+        cols = {"row": page.index.tolist()}
+        cols.update((c, [None if pd.isna(v) else v for v in page[c].tolist()]) for c in page.columns)
+        out["rows"] = [dict(zip(cols, values)) for values in zip(*cols.values())]
+    return out
+
+
+def create_app(core: Core) -> Starlette:
+    async def health(request: Request):
+        ds = await run_in_threadpool(core.load_data)
+        return JSONResponse({"rows": len(ds), "fingerprint": ds.fingerprint})
+
+    async def search(request: Request):
+        try:
+            query = parse_query(await request.json())
+        except (BadRequest, ValueError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return JSONResponse(await run_in_threadpool(run_query, core, query))
+
+    async def search_batch(request: Request):
+        try:
+            body = await request.json()
+            raw = body.get("queries") if isinstance(body, dict) else None
+            if not isinstance(raw, list) or len(raw) > MAX_BATCH:
+                raise BadRequest(f"queries must be a list of at most {MAX_BATCH} queries")
+            # 배치 공통 limit 은 각 질의에 limit 이 없을 때만 적용 (기본 0: 적중 수만)
+            limit = body.get("limit", 0)
+            queries = [parse_query({"limit": limit, **q} if isinstance(q, dict) else q) for q in raw]
+        except (BadRequest, ValueError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        results = await run_in_threadpool(lambda: [run_query(core, q) for q in queries])
+        return JSONResponse({"results": results})
+
+    async def augment(request: Request):
+        try:
+            body = await request.json()
+            if not isinstance(body, dict):
+                raise BadRequest("body must be a JSON object")
+            base = _str_list(body.get("base_keywords"), "base_keywords")
+            n = _int(body.get("n", 30), "n", 1, 200)
+        except (BadRequest, ValueError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        try:
+            call = core.llm_client.submit(base, n)
+        except RuntimeError as e:   # API 키 없음
+            return JSONResponse({"error": str(e)}, status_code=503)
+        # 같은 요청을 기다리는 다른 호출과 업스트림 응답을 공유 (KeywordClient 요청 합치기)
+        keywords = await asyncio.wrap_future(call.future)
+        return JSONResponse({"keywords": keywords, "cached": call.cached})
+
+    async def metrics(request: Request):
+        return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        await run_in_threadpool(core.load_data)   # 첫 요청이 적재 비용을 내지 않도록
+        yield
+
+    return Starlette(
+        routes=[
+            Route("/health", health),
+            Route("/search", search, methods=["POST"]),
+            Route("/search/batch", search_batch, methods=["POST"]),
+            Route("/augment", augment, methods=["POST"]),
+            Route("/metrics", metrics),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def create_app_from_env() -> Starlette:
+    """uvicorn --factory 용 (워커 프로세스마다 호출). 경로는 main() 이 환경변수로 넘긴다."""
+    base = Path(os.environ[ENV_DATASET]).resolve().parent
+    METRICS.configure(enabled=os.getenv("KWTOOL_METRICS") == "1")
+    return create_app(Core(
+        os.environ[ENV_DATASET],
+        os.environ.get(ENV_LOG_DIR) or base / "logs" / "phase_b",
+        fuzzy=True,
+        content_dir=os.environ.get(ENV_CONTENT_DIR) or None,
+        llm_cache_path=base / "llm_cache.sqlite3",
+    ))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import uvicorn
+
+    ap = argparse.ArgumentParser(prog="python -m kwtool.api", description="헤드리스 검색 API")
+    ap.add_argument("dataset", type=Path)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8600)
+    ap.add_argument("--workers", type=int, default=1, help="프로세스 수 (데이터셋 캐시는 메모리 맵으로 공유)")
+    ap.add_argument("--log-dir", type=Path, help="결과 집합·증거 저장소 위치 (기본: <dataset 옆>/logs/phase_b)")
+    ap.add_argument("--content-dir", type=Path, help="본문 색인 대상 문서 디렉토리 (\"content\": true 검색용)")
+    args = ap.parse_args(argv)
+
+    os.environ[ENV_DATASET] = str(args.dataset.resolve())
+    if args.log_dir:
+        os.environ[ENV_LOG_DIR] = str(args.log_dir.resolve())
+    if args.content_dir:
+        os.environ[ENV_CONTENT_DIR] = str(args.content_dir.resolve())
+    uvicorn.run(
+        "kwtool.api:create_app_from_env", factory=True,
+        host=args.host, port=args.port, workers=args.workers, log_level="warning"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
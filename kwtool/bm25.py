@@ -0,0 +1,36 @@
+"""
+관련도 순위 점수 (BM25).
+
+행 점수 = Σ (일치한 키워드마다) idf(키워드) × tf 포화값 × (기본 키워드면 BASE_BOOST)
+- tf: 정규화 파일명 안 키워드 출현 횟수
+- 문서 길이: 원본 파일명의 토큰(문자·숫자 연속) 수, 데이터셋 평균으로 정규화
+일치한 키워드 항이 모두 더해지므로 서로 다른 키워드가 많이 일치할수록 점수가 높다.
+모든 계산은 일치 행 배열 단위(Arrow 커널 + numpy)로 한다.
+"""
+import math
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+K1 = 1.2
+B = 0.75
+BASE_BOOST = 2.0             # 사용자가 직접 입력한 기본 키워드 가중치 (LLM 키워드 = 1.0)
+FUZZY_TF = 0.5               # 근사 일치로만 걸린 행의 tf
+TOKEN_PATTERN = r"[\pL\pN]+"
+
+
+def idf(df: int, n: int) -> float:
+    return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+
+def length_norm(doc_len: np.ndarray, avg_len: float) -> np.ndarray:
+    return K1 * (1 - B + B * doc_len / max(avg_len, 1e-9))
+
+
+def saturate(tf: np.ndarray, norm: np.ndarray) -> np.ndarray:
+    return tf * (K1 + 1) / (tf + norm)
+
+
+def token_counts(names: pa.Array) -> pa.Array:
+    return pc.fill_null(pc.count_substring_regex(names, TOKEN_PATTERN), 0)
@@ -0,0 +1,558 @@
+"""
+문서 본문 색인: 압수 드라이브의 HWP/HWPX/DOCX/PDF/TXT 본문 → 디스크 역색인 (증분, 중단 후 재개).
+
+    python -m kwtool.content build evidence_docs/                # 바뀐 파일만 다시 추출
+    python -m kwtool.content build evidence_docs/ --watch 60     # 60초마다 반복 (백그라운드 색인)
+    python -m kwtool.content build evidence_docs/ --rebuild      # 처음부터 다시
+
+    core = Core("dataset.csv", "logs/phase_b", content_dir="evidence_docs")
+    res = core.search(["보고서"], 1.0, content=True)               # 파일명 또는 본문에 키워드가 있는 행
+
+    <doc_dir>.index/
+        manifest.json                 스냅샷: 세그먼트 목록 + 파일별 크기·mtime·sha256·(세그먼트, 문서 번호)
+        journal.jsonl                 스냅샷 이후 커밋된 묶음 (한 줄 = 세그먼트 하나)
+        seg-<run>-<n>/docs.arrow      문서별 상대 경로, 이름(정규화 basename), 정규화 본문
+        seg-<run>-<n>/trigram_*.npy   본문 트라이그램 색인 (kwtool.index, 행 = 세그먼트 안 문서 번호)
+
+- 추출은 프로세스 풀에서: 파일 묶음 하나 = 워커 작업 하나 = 세그먼트 하나. 묶음이 끝날 때마다 저널에 한 줄을
+  fsync 하므로, 중간에 죽어도 다음 실행은 커밋되지 않은 세그먼트만 지우고 남은 파일부터 이어 간다.
+- 변경 판별은 kwtool.store 와 같은 규칙: 크기+mtime 이 같으면 건너뛰고, 크기만 같으면 sha256 비교 (워커에서).
+- 바뀐 파일은 새 세그먼트에 다시 들어가고 매니페스트가 새 위치를 가리킨다 (예전 문서는 죽은 문서).
+  세그먼트가 MERGE_SEGMENTS 개를 넘으면 산 문서만 모아 하나로 합친다.
+- 검색: 본문은 소문자 + 공백·줄바꿈 제거로 정규화해 파일명과 같은 부분 문자열 규칙으로 찾고,
+  데이터셋 filename 의 basename 이 같은 행에 대응시킨다 (Dataset.content_rows). 데이터셋에 없는 문서는 결과에 없다.
+- HWP 5.x 는 olefile, PDF 는 pypdf 가 있어야 추출한다 (없으면 그 형식은 건너뛰고 알린다).
+"""
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import re
+import secrets
+import shutil
+import sys
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple
+from xml.etree import ElementTree
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from kwtool.dataset import intersect_rows
+from kwtool.index import NGRAM, TrigramIndex, query_trigrams
+from kwtool.store import _INDEX_ARRAYS, _build_lock
+from kwtool.text import normalize
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".index"
+MANIFEST = "manifest.json"
+JOURNAL = "journal.jsonl"
+FILES_PER_TASK = 64             # 워커 작업 하나(= 세그먼트 하나)가 맡는 최대 파일 수
+BYTES_PER_TASK = 64 << 20       # 작업 하나가 맡는 최대 원본 크기 (큰 PDF 가 한 작업에 몰리지 않도록)
+MERGE_SEGMENTS = 16             # 세그먼트가 이보다 많으면 build 끝에 하나로 합친다
+TRIGRAM_SLICE = 1 << 20         # 본문 트라이그램을 나눠 계산할 글자 수 (UTF-32 행렬 메모리 상한)
+TEXT_ENCODINGS = ["utf-8-sig", "cp949", "latin1"]
+
+HWPTAG_PARA_TEXT = 67
+# 8 글자(16바이트)를 차지하는 인라인·확장 컨트롤 문자 (HWP 5.0 문서 구조)
+_HWP_WIDE_CONTROLS = frozenset(range(1, 10)) | {11, 12} | frozenset(range(14, 24))
+
+
+# ── 본문 추출 ─────────────────────────────────────────────
+def normalize_text(text: str) -> str:
+    """본문 정규화: 소문자 + 모든 공백 문자 제거 (키워드 쪽 normalize 와 같은 결과가 되도록)."""
+    return "".join(text.lower().split())
+
+
+def _plain_text(data: bytes) -> str:
+    if data.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return data.decode("utf-16")
+    for enc in TEXT_ENCODINGS:
+        try:
+            return data.decode(enc)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("latin1")
+
+
+def _section_no(name: str) -> int:
+    m = re.search(r"(\d+)\D*$", name)
+    return int(m.group(1)) if m else 0
+
+
+def _xml_text(f) -> List[str]:
+    """XML 스트림에서 <*:t> 텍스트 (docx w:t, hwpx hp:t). 문단이 끝날 때마다 비워 메모리를 묶어 둔다."""
+    parts = []
+    for _, el in ElementTree.iterparse(f):
+        local = el.tag.rsplit("}", 1)[-1]
+        if local == "t":
+            parts.append("".join(el.itertext()))
+        elif local == "p":
+            el.clear()
+    return parts
+
+
+def _zip_text(data: bytes, pattern: str) -> str:
+    parts = []
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        for name in sorted((n for n in zf.namelist() if re.fullmatch(pattern, n)), key=_section_no):
+            with zf.open(name) as f:
+                parts.extend(_xml_text(f))
+    return "\n".join(parts)
+
+
+def _docx_text(data: bytes) -> str:
+    return _zip_text(data, r"word/(document|header\d*|footer\d*|footnotes|endnotes)\.xml")
+
+
+def _hwpx_text(data: bytes) -> str:
+    return _zip_text(data, r"Contents/section\d+\.xml")
+
+
+def _hwp_para_text(raw: bytes) -> str:
+    """PARA_TEXT 레코드 (UTF-16LE) → 문자열. 컨트롤 문자는 버리고 8 글자짜리 컨트롤은 통째로 건너뛴다."""
+    codes = np.frombuffer(raw[:len(raw) // 2 * 2], dtype="<u2")
+    keep = codes >= 32
+    skip_until = 0
+    for i in np.flatnonzero(~keep):
+        if i >= skip_until and int(codes[i]) in _HWP_WIDE_CONTROLS:
+            keep[i:i + 8] = False
+            skip_until = i + 8
+    return codes[keep].tobytes().decode("utf-16-le", "replace")
+
+
+def _hwp_records_text(data: bytes) -> str:
+    parts, pos = [], 0
+    while pos + 4 <= len(data):
+        header = int.from_bytes(data[pos:pos + 4], "little")
+        pos += 4
+        tag, size = header & 0x3FF, header >> 20
+        if size == 0xFFF:
+            size = int.from_bytes(data[pos:pos + 4], "little")
+            pos += 4
+        if tag == HWPTAG_PARA_TEXT:
+            parts.append(_hwp_para_text(data[pos:pos + size]))
+        pos += size
+    return "\n".join(parts)
+
+
+def _hwp_text(data: bytes) -> str:
+    """HWP 5.x (OLE 복합 문서): BodyText/Section* 스트림의 문단 텍스트 레코드."""
+    import olefile
+
+    with olefile.OleFileIO(data) as ole:
+        flags = int.from_bytes(ole.openstream("FileHeader").read()[36:40], "little")
+        if flags & 0x06:
+            raise ValueError("암호화되었거나 배포용인 HWP 문서")
+        sections = sorted((e for e in ole.listdir() if len(e) == 2 and e[0] == "BodyText"),
+                          key=lambda e: _section_no(e[1]))
+        parts = []
+        for entry in sections:
+            raw = ole.openstream(entry).read()
+            parts.append(_hwp_records_text(zlib.decompress(raw, -15) if flags & 0x01 else raw))
+    return "\n".join(parts)
+
+
+def _pdf_text(data: bytes) -> str:
+    from pypdf import PdfReader
+
+    return "\n".join(page.extract_text() or "" for page in PdfReader(io.BytesIO(data)).pages)
+
+
+EXTRACTORS = {
+    ".txt": _plain_text, ".csv": _plain_text, ".log": _plain_text, ".md": _plain_text,
+    ".docx": _docx_text, ".hwpx": _hwpx_text, ".hwp": _hwp_text, ".pdf": _pdf_text,
+}
+REQUIRES = {".hwp": "olefile", ".pdf": "pypdf"}   # 선택 의존성
+
+
+def supported_suffixes() -> List[str]:
+    """지금 환경에서 추출할 수 있는 확장자 (선택 의존성이 없는 형식은 빠진다)."""
+    return [s for s in EXTRACTORS if s not in REQUIRES or importlib.util.find_spec(REQUIRES[s]) is not None]
+
+
+def extract_text(path: Path, data: Optional[bytes] = None) -> str:
+    """파일 하나의 본문 텍스트 (정규화 전). 지원하지 않는 확장자는 ValueError."""
+    extractor = EXTRACTORS.get(Path(path).suffix.lower())
+    if extractor is None:
+        raise ValueError(f"지원하지 않는 형식: {path}")
+    return extractor(Path(path).read_bytes() if data is None else data)
+
+
+def doc_name(rel: str) -> str:
+    """데이터셋 filename 과 맞춰 볼 문서 이름 (정규화 basename)."""
+    return normalize(PurePosixPath(rel).name)
+
+
+def doc_postings(text: str, doc: int) -> np.ndarray:
+    """정규화 본문 하나의 고유 트라이그램을 (키<<32 | 문서 번호) 로 (kwtool.index.chunk_postings 와 같은 형식)."""
+    keys = [
+        query_trigrams(text[i:i + TRIGRAM_SLICE + NGRAM - 1])
+        for i in range(0, max(len(text) - NGRAM + 1, 0), TRIGRAM_SLICE)
+    ]
+    keys = np.unique(np.concatenate(keys)) if keys else np.empty(0, dtype=np.uint32)
+    return (keys.astype(np.uint64) << np.uint64(32)) | np.uint64(doc)
+
+
+# ── 세그먼트 ──────────────────────────────────────────────
+def _write_segment(seg_dir: Path, rels: List[str], texts: List[str], postings: List[np.ndarray]) -> None:
+    """임시 디렉토리에 다 쓴 뒤 교체. 문서 테이블은 레코드 배치 하나 (열 때 청크 결합 없이 맵)."""
+    tmp = seg_dir.with_name(seg_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    table = pa.table({
+        "path": pa.array(rels, pa.large_string()),
+        "name": pa.array([doc_name(r) for r in rels], pa.large_string()),
+        "text": pa.array(texts, pa.large_string()),
+    }).combine_chunks()
+    with pa.OSFile(str(tmp / "docs.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    index = TrigramIndex.from_parts(postings, len(texts))
+    for name in _INDEX_ARRAYS:
+        np.save(tmp / f"trigram_{name}.npy", getattr(index, name))
+    os.replace(tmp, seg_dir)
+
+
+def _index_task(root: str, seg: str, doc_dir: str, files: List[Tuple[str, int, int, Optional[str]]]) -> Dict[str, dict]:
+    """
+    파일 묶음 하나 → 세그먼트 하나 (워커 프로세스). {상대 경로: 매니페스트 항목} 반환.
+    known_sha 와 내용이 같으면 추출하지 않고 "unchanged", 추출 실패는 "error" 로 남긴다.
+    """
+    entries: Dict[str, dict] = {}
+    rels, texts, postings = [], [], []
+    for rel, size, mtime_ns, known_sha in files:
+        entry = {"size": size, "mtime_ns": mtime_ns}
+        try:
+            data = (Path(doc_dir) / rel).read_bytes()
+            entry["sha256"] = hashlib.sha256(data).hexdigest()
+            if entry["sha256"] == known_sha:
+                entry["unchanged"] = True          # 내용은 같고 mtime 만 바뀜 (복사/touch)
+            else:
+                text = normalize_text(extract_text(Path(rel), data))
+                entry.update(seg=seg, doc=len(texts), chars=len(text))
+                postings.append(doc_postings(text, len(texts)))
+                rels.append(rel)
+                texts.append(text)
+        except Exception as e:                     # 깨진 문서 하나가 묶음 전체를 망치지 않도록
+            entry["error"] = f"{type(e).__name__}: {e}"
+        entries[rel] = entry
+    if texts:
+        _write_segment(Path(root) / seg, rels, texts, postings)
+    return entries
+
+
+# ── 매니페스트 (스냅샷 + 저널) ────────────────────────────
+def index_dir_for(doc_dir: Path) -> Path:
+    doc_dir = Path(doc_dir)
+    return doc_dir.with_name(doc_dir.name + INDEX_SUFFIX)
+
+
+def _empty_manifest() -> dict:
+    return {"version": INDEX_VERSION, "segments": [], "files": {}, "offset": 0}
+
+
+def _apply(manifest: dict, record: dict) -> None:
+    """저널 한 줄(커밋된 묶음 하나 또는 삭제 목록)을 매니페스트에 반영."""
+    files = manifest["files"]
+    for rel in record.get("removed", []):
+        files.pop(rel, None)
+    for rel, entry in record.get("files", {}).items():
+        if entry.get("unchanged") and rel in files:
+            files[rel].update(mtime_ns=entry["mtime_ns"])
+        else:
+            files[rel] = {k: v for k, v in entry.items() if k != "unchanged"}
+    seg = record.get("segment")
+    if seg and seg not in manifest["segments"]:
+        manifest["segments"].append(seg)
+
+
+def read_manifest(root: Path) -> dict:
+    """스냅샷 + 그 이후 저널 (쓰다 만 마지막 줄은 무시). offset 은 반영한 저널 끝 위치."""
+    try:
+        manifest = json.loads((Path(root) / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = _empty_manifest()
+    if manifest.get("version") != INDEX_VERSION:
+        manifest = _empty_manifest()
+    try:
+        with (Path(root) / JOURNAL).open("rb") as f:
+            f.seek(manifest["offset"])
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                manifest["offset"] += len(line)
+                try:
+                    _apply(manifest, json.loads(line))
+                except (ValueError, AttributeError):
+                    continue
+    except OSError:
+        pass
+    return manifest
+
+
+def _append_journal(root: Path, manifest: dict, record: dict) -> None:
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    with (root / JOURNAL).open("ab") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    _apply(manifest, record)
+    manifest["offset"] += len(line)
+
+
+def _write_manifest(root: Path, manifest: dict) -> None:
+    tmp = root / f"{MANIFEST}.tmp{os.getpid()}"
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, root / MANIFEST)
+
+
+def _live_docs(manifest: dict) -> Dict[str, List[int]]:
+    live: Dict[str, List[int]] = {}
+    for entry in manifest["files"].values():
+        if entry.get("seg"):
+            live.setdefault(entry["seg"], []).append(entry["doc"])
+    return live
+
+
+def _sweep(root: Path, manifest: dict) -> None:
+    """매니페스트에 없는 세그먼트 디렉토리(중단된 묶음·합치기 전 세그먼트) 삭제."""
+    keep = set(manifest["segments"])
+    for p in root.glob("seg-*"):
+        if p.name not in keep:
+            shutil.rmtree(p, ignore_errors=True)
+
+
+# ── 구축 ──────────────────────────────────────────────────
+def _scan(doc_dir: Path, suffixes: List[str]) -> Tuple[Dict[str, Tuple[int, int]], Dict[str, int]]:
+    """doc_dir 아래 추출 대상 {상대 경로: (크기, mtime_ns)}, 추출기가 없어 건너뛴 {확장자: 개수}."""
+    current, missing = {}, {}
+    for dirpath, _, filenames in os.walk(doc_dir):
+        for fn in filenames:
+            suffix = os.path.splitext(fn)[1].lower()
+            if suffix not in EXTRACTORS:
+                continue
+            if suffix not in suffixes:
+                missing[suffix] = missing.get(suffix, 0) + 1
+                continue
+            path = Path(dirpath) / fn
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            current[path.relative_to(doc_dir).as_posix()] = (st.st_size, st.st_mtime_ns)
+    return current, missing
+
+
+def _run_id() -> str:
+    """세그먼트 이름 접두어 (--watch 로 같은 초에 다시 돌아도 겹치지 않게)."""
+    return time.strftime("%Y%m%dT%H%M%S") + f"_{os.getpid()}_{secrets.token_hex(3)}"
+
+
+def _groups(tasks: List[tuple]) -> List[List[tuple]]:
+    groups, group, size = [], [], 0
+    for task in tasks:
+        if group and (len(group) >= FILES_PER_TASK or size + task[1] > BYTES_PER_TASK):
+            groups.append(group)
+            group, size = [], 0
+        group.append(task)
+        size += task[1]
+    return groups + ([group] if group else [])
+
+
+def build(doc_dir: Path, root: Optional[Path] = None, *, workers: Optional[int] = None,
+          rebuild: bool = False) -> dict:
+    """
+    doc_dir 아래 문서의 본문 색인을 갱신. {"indexed", "unchanged", "errors", "removed", "skipped", "missing"} 반환.
+    묶음마다 커밋하므로 중단되면 다시 실행해 이어 간다 (잠금으로 구축은 한 번에 하나).
+    """
+    doc_dir = Path(doc_dir)
+    root = Path(root) if root else index_dir_for(doc_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    stats = {"indexed": 0, "unchanged": 0, "errors": 0, "removed": 0, "skipped": 0, "missing": {}}
+    with _build_lock(root):
+        if rebuild:
+            (root / JOURNAL).unlink(missing_ok=True)
+            _write_manifest(root, _empty_manifest())
+        manifest = read_manifest(root)
+        _sweep(root, manifest)
+
+        current, stats["missing"] = _scan(doc_dir, supported_suffixes())
+        files = manifest["files"]
+        removed = [rel for rel in files if rel not in current]
+        if removed:
+            _append_journal(root, manifest, {"removed": removed})
+            stats["removed"] = len(removed)
+        tasks = []
+        for rel, (size, mtime_ns) in sorted(current.items()):
+            seen = files.get(rel)
+            if seen and "error" in seen:
+                tasks.append((rel, size, mtime_ns, None))   # 추출 실패한 파일은 바뀌지 않았어도 다시 시도
+            elif seen and seen["size"] == size:
+                if seen["mtime_ns"] == mtime_ns:
+                    continue
+                tasks.append((rel, size, mtime_ns, seen.get("sha256")))
+            else:
+                tasks.append((rel, size, mtime_ns, None))
+        stats["skipped"] = len(current) - len(tasks)
+
+        if tasks:
+            run = _run_id()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(_index_task, str(root), f"seg-{run}-{i:05d}", str(doc_dir), group): f"seg-{run}-{i:05d}"
+                    for i, group in enumerate(_groups(tasks))
+                }
+                for future in as_completed(futures):
+                    entries = future.result()
+                    seg = futures[future] if any("doc" in e for e in entries.values()) else None
+                    _append_journal(root, manifest, {"segment": seg, "files": entries})   # 여기까지 오면 커밋
+                    for e in entries.values():
+                        key = "errors" if "error" in e else "unchanged" if e.get("unchanged") else "indexed"
+                        stats[key] += 1
+
+        live = _live_docs(manifest)
+        manifest["segments"] = [s for s in manifest["segments"] if s in live]
+        if len(manifest["segments"]) > MERGE_SEGMENTS:
+            _merge(root, manifest, live)
+        _write_manifest(root, manifest)            # 체크포인트: 다음 읽기는 이 뒤 저널만
+        _sweep(root, manifest)
+    return stats
+
+
+def _merge(root: Path, manifest: dict, live: Dict[str, List[int]]) -> None:
+    """산 문서만 모아 세그먼트 하나로 (트라이그램은 다시 뽑지 않고 기존 CSR 에서 문서 번호만 바꿔 합친다)."""
+    rels, texts, postings, n = [], [], [], 0
+    moved: Dict[Tuple[str, int], int] = {}
+    for seg in manifest["segments"]:
+        table = pa.ipc.open_file(pa.memory_map(str(root / seg / "docs.arrow"))).read_all()
+        docs = np.array(sorted(live[seg]), dtype=np.int64)
+        remap = np.full(table.num_rows, -1, dtype=np.int64)
+        remap[docs] = np.arange(n, n + len(docs))
+        arrays = {name: np.load(root / seg / f"trigram_{name}.npy", mmap_mode="r") for name in _INDEX_ARRAYS}
+        keys = np.repeat(arrays["keys"].astype(np.uint64), np.diff(arrays["offsets"]))
+        new_rows = remap[arrays["rows"]]
+        ok = new_rows >= 0
+        postings.append((keys[ok] << np.uint64(32)) | new_rows[ok].astype(np.uint64))
+        rels.extend(table.column("path").take(pa.array(docs)).to_pylist())
+        texts.extend(table.column("text").take(pa.array(docs)).to_pylist())
+        moved.update(((seg, int(d)), int(remap[d])) for d in docs)
+        n += len(docs)
+
+    merged = f"seg-{_run_id()}-merged"
+    _write_segment(root / merged, rels, texts, postings)
+    for entry in manifest["files"].values():
+        if entry.get("seg"):
+            entry["doc"] = moved[(entry["seg"], entry["doc"])]
+            entry["seg"] = merged
+    manifest["segments"] = [merged]
+
+
+# ── 검색 ──────────────────────────────────────────────────
+class _Segment:
+    def __init__(self, seg_dir: Path, live: np.ndarray):
+        table = pa.ipc.open_file(pa.memory_map(str(seg_dir / "docs.arrow"))).read_all()
+        chunks = table.column("text").chunks
+        self.text = chunks[0] if len(chunks) == 1 else pa.concat_arrays(chunks)
+        self.names = table.column("name")
+        arrays = {name: np.load(seg_dir / f"trigram_{name}.npy", mmap_mode="r") for name in _INDEX_ARRAYS}
+        self.index = TrigramIndex(arrays["keys"], arrays["offsets"], arrays["rows"], table.num_rows)
+        self.live = live              # 매니페스트가 가리키는 문서 번호 (오름차순)
+
+    def match(self, norm_kw: str) -> pa.Array:
+        cand = intersect_rows(self.index.candidates(norm_kw), self.live) if len(norm_kw) >= NGRAM else self.live
+        if not len(cand):
+            return pa.array([], pa.large_string())
+        ok = pc.fill_null(pc.match_substring(self.text.take(pa.array(cand)), norm_kw), False)
+        return self.names.take(pa.array(cand[ok.to_numpy(zero_copy_only=False)])).combine_chunks()
+
+
+class ContentIndex:
+    """
+    본문 색인의 읽기 전용 스냅샷 (세그먼트는 메모리 맵). generation 은 커밋이 생길 때마다 바뀌므로
+    검색 캐시 키에 넣고, stale() 이 참이면 open() 으로 새 스냅샷을 연다.
+    """
+
+    def __init__(self, root: Path, manifest: dict, segments: List[_Segment], stamp: tuple):
+        self.root = root
+        self.files = len(manifest["files"])
+        self.segments = segments
+        self._stamp = stamp
+        self.generation = "{}:{}".format(*stamp)
+
+    @staticmethod
+    def _read_stamp(root: Path) -> tuple:
+        try:
+            snapshot = (root / MANIFEST).stat().st_mtime_ns
+        except OSError:
+            snapshot = 0
+        try:
+            journal = (root / JOURNAL).stat().st_size
+        except OSError:
+            journal = 0
+        return snapshot, journal
+
+    @classmethod
+    def open(cls, root: Path) -> "ContentIndex":
+        """색인이 아직 없으면 빈 색인. 세그먼트가 사라졌으면(동시에 합치기) OSError."""
+        root = Path(root)
+        stamp = cls._read_stamp(root)
+        manifest = read_manifest(root)
+        live = _live_docs(manifest)
+        segments = [
+            _Segment(root / seg, np.array(sorted(live[seg]), dtype=np.int32))
+            for seg in manifest["segments"] if seg in live
+        ]
+        return cls(root, manifest, segments, stamp)
+
+    def stale(self) -> bool:
+        return self._read_stamp(self.root) != self._stamp
+
+    def __len__(self) -> int:
+        return sum(len(s.live) for s in self.segments)
+
+    def match(self, norm_kw: str) -> pa.Array:
+        """본문에 정규화 키워드가 있는 문서 이름 (정규화 basename, 중복 가능)."""
+        parts = [s.match(norm_kw) for s in self.segments]
+        return pa.concat_arrays(parts) if parts else pa.array([], pa.large_string())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kwtool.content", description="문서 본문 색인")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    bp = sub.add_parser("build", help="문서 디렉토리의 새·바뀐 파일을 색인에 추가")
+    bp.add_argument("doc_dir", type=Path)
+    bp.add_argument("--out", type=Path, help=f"색인 경로 (기본: <doc_dir>{INDEX_SUFFIX})")
+    bp.add_argument("--workers", type=int, default=os.cpu_count())
+    bp.add_argument("--rebuild", action="store_true", help="기존 색인을 버리고 처음부터")
+    bp.add_argument("--watch", type=float, metavar="SEC", help="SEC 초마다 다시 훑어 계속 갱신")
+    args = ap.parse_args(argv)
+
+    rebuild = args.rebuild
+    while True:
+        t0 = time.perf_counter()
+        stats = build(args.doc_dir, args.out, workers=args.workers, rebuild=rebuild)
+        rebuild = False
+        missing = ", ".join(f"{s} {n} ({REQUIRES[s]} 필요)" for s, n in stats["missing"].items())
+        print(
+            f"indexed {stats['indexed']}, unchanged {stats['skipped'] + stats['unchanged']}, "
+            f"errors {stats['errors']}, removed {stats['removed']} in {time.perf_counter() - t0:.1f}s"
+            + (f"; skipped {missing}" if missing else ""), file=sys.stderr
+        )
+        if not args.watch:
+            return 0
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
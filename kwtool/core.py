@@ -0,0 +1,266 @@
+"""
+Streamlit 없이 쓰는 앱 코어: 데이터셋 열기, 결과 캐시를 거치는 검색, LLM 키워드, 이벤트 로그, 증거 복원.
+
+앱 스크립트는 프로세스당 Core 하나를 st.cache_resource 로 들고 있고, 배치 작업·벤치마크·다른 프런트엔드도
+같은 객체를 직접 만든다.
+
+    from kwtool.core import Core
+    core = Core("dataset.csv", "logs/phase_b")
+    res = core.search(["보고서", "report"], 1.0)
+    core.log_event("P01", "search", {...})
+
+    core = Core("dataset.csv", "logs/phase_b", content_dir="evidence_docs")   # 본문 색인 (kwtool.content)
+    res = core.search(["보고서"], 1.0, content=True)
+
+구성 요소는 처음 쓸 때 만들고, 무거운 모듈도 그때 import 한다. 검색만 하면 openai 를 읽지 않고,
+LLM·로그만 쓰면 pandas/pyarrow 를 읽지 않는다 (import kwtool.core 자체는 표준 라이브러리만).
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+
+from kwtool.metrics import METRICS
+from kwtool.query import Query
+from kwtool.text import filter_keywords, normalize
+
+if TYPE_CHECKING:
+    from kwtool.content import ContentIndex
+    from kwtool.dataset import Dataset
+    from kwtool.eventlog import EventLogger
+    from kwtool.evidence import EvidenceStore
+    from kwtool.llm import KeywordClient
+    from kwtool.lru import LRUCache
+    from kwtool.resultref import ResultStore
+    from kwtool.results import ResultSet
+
+RESULT_CACHE_ITEMS = 256                # 검색 결과 캐시 최대 항목 수
+RESULT_CACHE_BYTES = 512 * 1024 * 1024  # 검색 결과 캐시 메모리 상한
+LLM_CACHE_TTL_SEC = 7 * 24 * 3600
+LLM_CACHE_MAX_ENTRIES = 5000
+CONTENT_REFRESH_SEC = 2.0               # 본문 색인 갱신(새 커밋) 확인 주기
+
+
+class Core:
+    def __init__(
+        self,
+        data_path: Path,
+        log_dir: Path,
+        *,
+        delimiter: str = ",",
+        col_map: Optional[Dict[str, str]] = None,
+        fuzzy: bool = False,
+        content_dir: Optional[Path] = None,
+        result_cache_items: int = RESULT_CACHE_ITEMS,
+        result_cache_bytes: int = RESULT_CACHE_BYTES,
+        llm_cache_path: Optional[Path] = None,
+        llm_cache_ttl: float = LLM_CACHE_TTL_SEC,
+        llm_cache_max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        llm_offline: Optional[bool] = None,
+        log_flush_interval: float = 1.0,
+        log_fsync: str = "batch"
+    ):
+        """
+        - log_dir: 참가자 로그 디렉토리 (예: logs/phase_b). 결과 집합·증거 저장소도 이 아래에 둔다.
+        - fuzzy: True 면 load_data() 때 근사 일치 색인까지 구축
+        - content_dir: 본문 색인 대상 문서 디렉토리 (색인은 <content_dir>.index, python -m kwtool.content build 로 구축)
+        - llm_cache_path: None 이면 LLM 응답 캐시 없음
+        - llm_offline: None 이면 환경변수 LLM_OFFLINE=1 여부
+        """
+        self.data_path = Path(data_path)
+        self.log_dir = Path(log_dir)
+        self.delimiter = delimiter
+        self.col_map = col_map
+        self.fuzzy = fuzzy
+        self.content_dir = Path(content_dir) if content_dir else None
+        self.result_cache_items = result_cache_items
+        self.result_cache_bytes = result_cache_bytes
+        self.llm_cache_path = llm_cache_path
+        self.llm_cache_ttl = llm_cache_ttl
+        self.llm_cache_max_entries = llm_cache_max_entries
+        self.llm_offline = os.getenv("LLM_OFFLINE") == "1" if llm_offline is None else llm_offline
+        self.log_flush_interval = log_flush_interval
+        self.log_fsync = log_fsync
+        self._parts: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._content_checked = 0.0
+
+    def _part(self, name: str, factory: Callable[[], Any]) -> Any:
+        """구성 요소를 한 번만 만든다 (여러 세션 스레드가 동시에 처음 접근해도)."""
+        part = self._parts.get(name)
+        if part is None:
+            with self._lock:
+                part = self._parts.get(name)
+                if part is None:
+                    part = self._parts[name] = factory()
+        return part
+
+    # ── 데이터셋·검색 ─────────────────────────────────────────
+    def load_data(self) -> "Dataset":
+        """
+        데이터셋 + 정규화 파일명 컬럼 + 트라이그램 색인 (디스크 캐시가 유효하면 메모리 맵으로, kwtool.store).
+        - 파일 없음: FileNotFoundError
+        - 인코딩 후보 모두 실패: UnicodeDecodeError / filename 열 없음: ValueError
+        """
+        return self._part("dataset", self._open_dataset)
+
+    def _open_dataset(self) -> "Dataset":
+        from kwtool.dataset import ENCODING_CANDIDATES
+        from kwtool.store import open_dataset
+
+        if not self.data_path.exists():
+            raise FileNotFoundError(f"{self.data_path} 파일을 찾을 수 없습니다.")
+        with METRICS.span("load_data"):
+            ds = open_dataset(self.data_path, ENCODING_CANDIDATES, self.delimiter, self.col_map)
+            if self.fuzzy:
+                with METRICS.span("load_data.fuzzy_index"):
+                    ds.fuzzy
+        return ds
+
+    def content_index(self) -> Optional["ContentIndex"]:
+        """
+        본문 색인의 현재 스냅샷 (content_dir 가 없으면 None). 색인 작업이 돌고 있으면 커밋된 묶음까지 보이도록
+        CONTENT_REFRESH_SEC 마다 확인해 새 스냅샷으로 바꾼다. 여는 중 세그먼트가 합쳐져 사라졌으면 이전 것을 쓴다.
+        """
+        if self.content_dir is None:
+            return None
+        with self._lock:
+            index = self._parts.get("content_index")
+            now = time.monotonic()
+            if index is None or now - self._content_checked >= CONTENT_REFRESH_SEC:
+                self._content_checked = now
+                if index is None or index.stale():
+                    from kwtool.content import ContentIndex, index_dir_for
+                    try:
+                        with METRICS.span("content.open"):
+                            index = self._parts["content_index"] = ContentIndex.open(index_dir_for(self.content_dir))
+                    except OSError:
+                        pass
+        return index
+
+    @property
+    def result_cache(self) -> "LRUCache":
+        """검색 결과 LRU (프로세스 내 전 세션 공유). 항목 수·메모리 상한과 적중/미스 카운터."""
+        def make():
+            from kwtool.lru import LRUCache
+            return LRUCache(self.result_cache_bytes, sizeof=lambda res: res.nbytes, max_items=self.result_cache_items)
+        return self._part("result_cache", make)
+
+    def search(
+        self,
+        keywords: Union[List[str], Query],
+        threshold: float,
+        *,                       # 키워드 필터 옵션은 키워드 인자로만 전달
+        min_len: int = 2,        # N글자 미만은 무시
+        ignore_single_digit: bool = True,  # 한 자리 숫자 필터
+        base_keywords: Optional[List[str]] = None,  # 주면 관련도 순위 모드
+        fuzzy: bool = False,     # 근사 일치(오탈자·자모·로마자) 포함
+        content: bool = False,   # 본문 색인(kwtool.content) 일치 포함
+        dataset: Optional["Dataset"] = None
+    ) -> "ResultSet":
+        """
+        - min_len:  이 길이보다 짧은 키워드는 검색에서 제외
+        - ignore_single_digit: True 이면 0~9 단독 키워드는 무시
+        - base_keywords: 주어지면 일치 행을 BM25 점수순으로 (기본 키워드 가중, threshold 미사용)
+        - dataset: 생략하면 load_data()
+        - keywords 대신 Query(kwtool.query) 를 주면 AND/NOT/구문/ext: 검색 (키워드 필터 규칙은 같다)
+        - content: content_dir 의 본문 색인에서도 찾는다 (색인이 없으면 파일명만)
+        캐시 키는 DataFrame 해시 대신 load_data() 때 한 번 구한 dataset.fingerprint + 정규화 키워드 집합
+        (+ 본문 색인 세대).
+        반환값은 공유 데이터셋 위의 행 번호 핸들 (페이지는 res.page(start, stop) 으로 필요할 때 구성).
+        """
+        dataset = dataset if dataset is not None else self.load_data()
+        if isinstance(keywords, Query):
+            filtered_kw = keywords.filtered(min_len, ignore_single_digit)
+            terms = ("query", str(filtered_kw))   # 정식 표기 = 같은 트리
+        else:
+            filtered_kw = filter_keywords(keywords, min_len, ignore_single_digit)
+            terms = tuple(sorted({normalize(kw) for kw in filtered_kw}))
+        ranked = None if base_keywords is None else tuple(sorted({normalize(kw) for kw in base_keywords}))
+        index = self.content_index() if content else None
+        key = (dataset.fingerprint, terms, threshold, ranked, fuzzy, index.generation if index else None)
+        cache = self.result_cache
+        with METRICS.span("search.lookup"):
+            res = cache.get(key)
+        METRICS.count("search_cache_total", result="miss" if res is None else "hit")
+        if res is None:
+            # 미리 정규화된 컬럼 + 트라이그램 색인으로 후보 행만 검증 (kwtool.dataset)
+            with METRICS.span("search.compute"):
+                if ranked is None:
+                    res = dataset.search(filtered_kw, threshold, min_len=0, ignore_single_digit=False,
+                                         fuzzy=fuzzy, content=index)
+                else:
+                    res = dataset.rank(filtered_kw, base_keywords, min_len=0, ignore_single_digit=False,
+                                       fuzzy=fuzzy, content=index)
+            cache.put(key, res)
+        return res
+
+    # ── LLM ───────────────────────────────────────────────────
+    @property
+    def llm_client(self) -> "KeywordClient":
+        """프로세스 공용 비동기 LLM 클라이언트 (커넥션 풀·동일 요청 합치기 공유, openai 는 첫 호출 때 import)."""
+        def make():
+            from kwtool.llm import KeywordClient
+            from kwtool.llm_cache import LLMCache
+
+            cache = None
+            if self.llm_cache_path is not None:
+                cache = LLMCache(self.llm_cache_path, ttl=self.llm_cache_ttl, max_entries=self.llm_cache_max_entries)
+            return KeywordClient(cache=cache, offline=self.llm_offline)
+        return self._part("llm_client", make)
+
+    def fetch_llm_keywords(
+        self,
+        base_keywords: List[str],
+        n: int = 30,
+        retry: int = 3,
+        on_partial: Optional[Callable[[List[str]], None]] = None
+    ) -> List[str]:
+        """on_partial: 스트리밍 중 키워드가 도착할 때마다 지금까지의 목록으로 호출."""
+        return self.llm_client.fetch(base_keywords, n, retry, on_partial)
+
+    # ── 로그·저장소 ───────────────────────────────────────────
+    @property
+    def event_logger(self) -> "EventLogger":
+        """프로세스 공용 이벤트 로거 (백그라운드 writer 스레드, 참가자별 파일 핸들 유지)."""
+        def make():
+            from kwtool.eventlog import EventLogger
+            return EventLogger(self.log_dir, flush_interval=self.log_flush_interval, fsync=self.log_fsync)
+        return self._part("event_logger", make)
+
+    def log_event(self, pid: str, event: str, payload: Any) -> None:
+        """큐에 넣고 바로 반환. 디스크 반영이 필요한 시점에는 event_logger.flush(pid)."""
+        self.event_logger.log(pid, event, payload)
+
+    @property
+    def result_store(self) -> "ResultStore":
+        """search_results 참조가 가리키는 결과 집합 저장소 (<log_dir>/resultsets/)."""
+        def make():
+            from kwtool.resultref import STORE_DIRNAME, ResultStore
+            return ResultStore(self.log_dir / STORE_DIRNAME)
+        return self._part("result_store", make)
+
+    @property
+    def evidence_store(self) -> "EvidenceStore":
+        """참가자별 증거 저장 목록 (<log_dir>/evidence/, append-only 저널 + 스냅샷)."""
+        def make():
+            from kwtool.evidence import STORE_DIRNAME, EvidenceStore
+            return EvidenceStore(self.log_dir / STORE_DIRNAME)
+        return self._part("evidence_store", make)
+
+    def load_saved_evidence(self, pid: str) -> Tuple[set, set]:
+        """
+        이미 '증거로 저장'된 파일들을 복원(세션 재시작 대비).
+        증거 저장소(스냅샷 + 이후 저널)만 읽으므로 로그 CSV 크기와 무관하다.
+        저장소에 pid 가 없으면(저장소 도입 전 로그) 로그를 한 번 스캔해 저장소를 만든다.
+        """
+        from kwtool.evidence import scan_log
+
+        store = self.evidence_store
+        if not store.exists(pid):
+            self.event_logger.flush(pid)  # 아직 큐에 있는 이벤트까지 반영
+            log_path = self.event_logger.path_for(pid)
+            if log_path.exists():
+                store.rebuild(pid, scan_log(log_path))
+        return store.load(pid)
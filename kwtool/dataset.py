@@ -0,0 +1,481 @@
+"""
+검색 대상 데이터셋: 원본 DataFrame + 정규화 파일명 컬럼 + 트라이그램 역색인.
+
+load_data() 직후 한 번 만들어 두고 모든 search() 호출이 공유한다.
+질의 비용은 코퍼스 크기가 아니라 후보/적중 행 수에 비례한다
+(정규화 길이 3 미만 키워드만 전체 스캔으로 처리).
+"""
+import codecs
+import hashlib
+import io
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from kwtool.engine import filter_keywords, normalize, normalize_names
+from kwtool.fuzzy import FuzzyIndex
+from kwtool.index import BUILD_CHUNK, NGRAM, TrigramIndex, chunk_postings
+from kwtool import bm25
+from kwtool.lru import LRUCache
+from kwtool.query import Node, Query
+from kwtool.results import ResultSet
+
+if TYPE_CHECKING:
+    from kwtool.content import ContentIndex
+
+
+ENCODING_CANDIDATES = ["utf-8", "utf-8-sig", "cp949", "euc-kr", "latin1"]
+SNIFF_BYTES = 1 << 20        # 인코딩 판별에 쓰는 파일 앞부분 크기
+CHUNK_ROWS = 200_000         # 스트리밍 파싱 청크 크기
+TERM_CACHE_BYTES = 256 << 20  # 키워드별 적중 행 번호 캐시 상한
+
+
+def sniff_encoding(path: Path, encodings: List[str], prefix_bytes: int = SNIFF_BYTES) -> List[str]:
+    """
+    파일 앞 prefix_bytes 만 디코딩해 보고 통과한 후보부터 시작하는 인코딩 순서를 반환.
+    접두부만으로는 확정할 수 없으므로(뒤쪽에만 비ASCII 가 있는 경우) 남은 후보는 재시도용으로 뒤에 둔다.
+    """
+    with Path(path).open("rb") as f:
+        head = f.read(prefix_bytes)
+    for i, enc in enumerate(encodings):
+        try:
+            codecs.getincrementaldecoder(enc)().decode(head, final=False)
+        except (UnicodeDecodeError, LookupError):
+            continue
+        return encodings[i:]
+    return list(encodings)
+
+
+def _rename_map(columns: List[str], col_map: Dict[str, str]) -> Dict[str, str]:
+    """헤더 BOM/공백/대소문자 정리 + col_map(표준명 → 실제 헤더)대로 이름 맞추기."""
+    norm = [c.replace("\ufeff", "").strip().lower() for c in columns]
+    rename_map = dict(zip(columns, norm))
+    for std_name, real_name in (col_map or {}).items():
+        real_norm = real_name.lower().strip()
+        match_cols = [c for c in columns if rename_map[c] == real_norm]
+        if match_cols:
+            rename_map[match_cols[0]] = std_name
+    return rename_map
+
+
+def _to_arrow(values: pd.Series) -> pa.Array:
+    return pa.array(values, type=pa.string(), from_pandas=True)
+
+
+def _from_arrow(chunks: List[pa.Array]) -> pd.Series:
+    """Arrow 문자열 청크들을 복사 없이 string[pyarrow] 시리즈로 (파이썬 str 객체를 만들지 않음)."""
+    return pd.Series(pd.arrays.ArrowStringArray(pa.chunked_array(chunks, type=pa.string())))
+
+
+class _HashingReader(io.RawIOBase):
+    """읽어 간 바이트를 그대로 sha256 에 넣는 파일 래퍼 (파싱과 원본 해시를 한 번의 읽기로)."""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = self.f.readinto(b)
+        if n:
+            self.sha.update(memoryview(b)[:n])
+        return n
+
+    def hexdigest(self) -> str:
+        """파서가 읽지 않고 남긴 꼬리까지 마저 넣은 전체 파일 해시."""
+        for block in iter(lambda: self.f.read(1 << 20), b""):
+            self.sha.update(block)
+        return self.sha.hexdigest()
+
+
+def _ingest(path: Path, enc: str, delimiter: str, col_map: Dict[str, str], chunk_rows: int) -> "Dataset":
+    columns: Dict[str, List[pa.Array]] = {}
+    norm_chunks, postings = [], []
+    n = 0
+    # 리더 생성(헤더 디코딩) 중 예외가 나도 인코딩 재시도마다 파일 디스크립터가 새지 않도록 with 안에서 연다
+    with path.open("rb", buffering=0) as raw:
+        hashing = _HashingReader(raw)
+        with pd.read_csv(io.BufferedReader(hashing, 1 << 20), delimiter=delimiter, encoding=enc, dtype=str,
+                         chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                chunk = chunk.fillna("")
+                chunk = chunk.rename(columns=_rename_map(list(chunk.columns), col_map))
+                if "filename" not in chunk.columns:
+                    raise ValueError("CSV에서 'filename' 열을 찾지 못했습니다.\n"
+                                     f"→ 실제 헤더: {list(chunk.columns)}")
+                for col in chunk.columns:
+                    columns.setdefault(col, []).append(_to_arrow(chunk[col]))
+                norm = [normalize(s) for s in chunk["filename"].tolist()]
+                norm_chunks.append(pa.array(norm, type=pa.string()))
+                # UTF-32 행렬은 행 수 × 청크 안 최장 파일명 크기이므로 TrigramIndex.build 와 같은 상한으로 나눠 편다
+                postings.extend(
+                    chunk_postings(norm[start:start + BUILD_CHUNK], n + start)
+                    for start in range(0, len(norm), BUILD_CHUNK)
+                )
+                n += len(chunk)
+            sha256 = hashing.hexdigest()
+
+    if not columns:
+        # 헤더만 있는 파일: 청크가 하나도 나오지 않는다
+        header = pd.read_csv(path, delimiter=delimiter, encoding=enc, dtype=str, nrows=0)
+        header = header.rename(columns=_rename_map(list(header.columns), col_map))
+        if "filename" not in header.columns:
+            raise ValueError("CSV에서 'filename' 열을 찾지 못했습니다.\n"
+                             f"→ 실제 헤더: {list(header.columns)}")
+        columns = {col: [] for col in header.columns}
+
+    df = pd.DataFrame({col: _from_arrow(parts) for col, parts in columns.items()})
+    if "label" not in df.columns:
+        df["label"] = ""
+    # T/F 처럼 값 종류가 적은 label 은 범주형으로 (행당 1바이트 코드)
+    df["label"] = df["label"].astype("category")
+    index = TrigramIndex.from_parts(postings, n)
+    return Dataset(df, _from_arrow(norm_chunks), index, encoding=enc, sha256=sha256)
+
+
+def ingest_csv(
+    path: Path,
+    encodings: List[str],
+    delimiter: str = ",",
+    col_map: Dict[str, str] = None,
+    *,
+    chunk_rows: int = CHUNK_ROWS
+) -> "Dataset":
+    """
+    CSV 를 청크 단위로 스트리밍하면서 정규화 컬럼과 트라이그램 색인을 함께 구축.
+    인코딩은 앞부분만 보고 정하므로 보통 파일을 한 번만 읽는다
+    (뒤쪽에서 디코딩 오류가 나면 다음 후보로 다시 읽음). 원본 sha256(ds.sha256) 도 같은 읽기에서 계산한다.
+    문자열 컬럼은 Arrow 버퍼(string[pyarrow]), label 은 범주형으로 보관.
+    - 모든 후보 실패: 마지막 UnicodeDecodeError 를 그대로 raise
+    - filename 열 없음: ValueError
+    """
+    last_err = None
+    for enc in sniff_encoding(path, encodings):
+        try:
+            return _ingest(Path(path), enc, delimiter, col_map, chunk_rows)
+        except UnicodeDecodeError as e:
+            last_err = e
+            continue
+    raise last_err
+
+
+def union_rows(parts: List[np.ndarray], n_rows: int) -> np.ndarray:
+    """오름차순 행 번호 배열들의 합집합. 합이 크면 정렬 대신 n_rows 크기 비트맵으로."""
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return np.empty(0, dtype=np.int32)
+    if len(parts) == 1:
+        return parts[0]
+    total = sum(len(p) for p in parts)
+    if total * 16 < n_rows:
+        return np.unique(np.concatenate(parts))
+    bitmap = np.zeros(n_rows, dtype=bool)
+    for p in parts:
+        bitmap[p] = True
+    return np.flatnonzero(bitmap).astype(np.int32)
+
+
+def _member(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a 의 각 원소가 b 에 있는지 (둘 다 오름차순·중복 없음). 이진 탐색이라 O(len(a) log len(b))."""
+    if not len(b):
+        return np.zeros(len(a), dtype=bool)
+    idx = np.minimum(np.searchsorted(b, a), len(b) - 1)
+    return b[idx] == a
+
+
+def intersect_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """오름차순 행 번호 배열의 교집합 (짧은 쪽을 긴 쪽에서 이진 탐색)."""
+    if len(a) > len(b):
+        a, b = b, a
+    return a[_member(a, b)]
+
+
+def subtract_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """오름차순 행 번호 배열의 차집합 a - b."""
+    return a[~_member(a, b)]
+
+
+class _ArrowColumn:
+    """
+    문자열 컬럼의 Arrow 청크별 커널 적용. ChunkedArray 전체에 take 하면 컬럼 전체가 결합(복사)되어
+    메모리 맵으로 공유하던 버퍼가 프로세스마다 사본으로 늘어나므로 청크 단위로 나눠 처리한다.
+    """
+
+    def __init__(self, values: pd.Series):
+        arr = values.array
+        if hasattr(arr, "__arrow_array__"):
+            arr = arr.__arrow_array__()
+        else:
+            arr = pa.array(values, type=pa.large_string(), from_pandas=True)
+        self.chunks = arr.chunks if isinstance(arr, pa.ChunkedArray) else [arr]
+        self.starts = np.cumsum([0] + [len(c) for c in self.chunks])
+
+    def apply(self, rows: np.ndarray, kernel: Callable[[pa.Array], pa.Array]) -> np.ndarray:
+        """rows(오름차순) 행들에 kernel 을 적용한 값 (rows 와 같은 순서)."""
+        bounds = np.searchsorted(rows, self.starts)
+        parts = [
+            kernel(chunk.take(pa.array(rows[lo:hi] - base))).to_numpy(zero_copy_only=False)
+            for chunk, base, lo, hi in zip(self.chunks, self.starts, bounds[:-1], bounds[1:])
+            if lo < hi
+        ]
+        return np.concatenate(parts) if parts else np.empty(0)
+
+    def apply_all(self, kernel: Callable[[pa.Array], pa.Array]) -> np.ndarray:
+        return np.concatenate([kernel(chunk).to_numpy(zero_copy_only=False) for chunk in self.chunks])
+
+
+class Dataset:
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        norm: pd.Series,
+        index: TrigramIndex,
+        *,
+        encoding: str = "",
+        sha256: str = "",
+        doc_len: Optional[np.ndarray] = None
+    ):
+        self.df = df
+        self.norm = norm
+        self.index = index
+        self.encoding = encoding      # 원본 CSV 를 읽는 데 성공한 인코딩
+        self.sha256 = sha256          # 원본 CSV 내용 해시 (알 수 없으면 "")
+        self._term_cache = LRUCache(TERM_CACHE_BYTES, sizeof=lambda rows: rows.nbytes)
+        self._norm_col = _ArrowColumn(norm)
+        self._name_col = _ArrowColumn(df["filename"])
+        self._doc_len = doc_len       # 파일명 토큰 수 (BM25 문서 길이), 없으면 처음 순위 검색 때 계산
+        self._avg_tokens = None
+        self._fuzzy: Optional[FuzzyIndex] = None
+        self._basenames: Optional[List[pa.Array]] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **meta) -> "Dataset":
+        """DataFrame 에서 정규화 컬럼과 트라이그램 색인을 새로 구축."""
+        df = df.reset_index(drop=True)
+        norm = normalize_names(df["filename"])
+        return cls(df, norm, TrigramIndex.build(norm.tolist()), **meta)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        데이터셋 식별자 (결과 캐시 키·로그 참조용). 원본 CSV 해시가 있으면 그것을, 없으면
+        내용 해시를 한 번만 계산해 둔다. 검색마다 DataFrame 전체를 해싱하지 않기 위한 것.
+        """
+        if not self.sha256:
+            row_hash = pd.util.hash_pandas_object(self.df, index=False).to_numpy()
+            self.sha256 = hashlib.sha256(row_hash.tobytes()).hexdigest()
+        return self.sha256
+
+    @property
+    def fuzzy(self) -> FuzzyIndex:
+        """근사 일치 색인 (처음 접근 때 한 번 구축, load_data() 에서 미리 만들어 둘 수 있다)."""
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyIndex.build(self._name_col.chunks, len(self))
+        return self._fuzzy
+
+    def term_rows(self, norm_kw: str, fuzzy: bool = False, content: Optional["ContentIndex"] = None) -> np.ndarray:
+        """
+        정규화 키워드 하나를 부분 문자열로 포함하는 행 번호 (오름차순, 읽기 전용).
+        fuzzy 면 근사 일치 토큰(오탈자·자모·로마자, kwtool.fuzzy)을 가진 행도 포함.
+        content(kwtool.content 색인) 를 주면 본문에 키워드가 있는 문서의 행도 포함 (본문은 근사 일치 없음).
+        키워드별 결과는 데이터셋 단위로 캐시되므로, 키워드를 하나 추가한 재검색은 새 키워드만 계산한다.
+        """
+        if content is not None:
+            key = ("content", content.generation, fuzzy, norm_kw)
+        else:
+            key = ("fuzzy", norm_kw) if fuzzy else norm_kw
+        rows = self._term_cache.get(key)
+        if rows is None:
+            if content is not None:
+                rows = union_rows([self.term_rows(norm_kw, fuzzy), self.content_rows(norm_kw, content)], len(self))
+                rows = np.array(rows, copy=True)
+            elif fuzzy:
+                rows = union_rows([self.term_rows(norm_kw)] + self.fuzzy.rows(norm_kw), len(self))
+                rows = np.array(rows, copy=True)
+            else:
+                rows = self._match_term(norm_kw)
+            rows.setflags(write=False)
+            self._term_cache.put(key, rows)
+        return rows
+
+    def _match_term(self, norm_kw: str) -> np.ndarray:
+        if len(norm_kw) < NGRAM:
+            # 트라이그램을 쓸 수 없는 짧은 키워드: 전체 컬럼 스캔
+            hit = self.norm.str.contains(norm_kw, regex=False)
+            return np.flatnonzero(hit.to_numpy(dtype=bool, na_value=False)).astype(np.int32)
+        cand = self.index.candidates(norm_kw)
+        if len(cand) == 0:
+            return np.empty(0, dtype=np.int32)
+        return self._verify(cand, norm_kw)
+
+    def _verify(self, cand: np.ndarray, norm_kw: str) -> np.ndarray:
+        """후보 행(오름차순) 중 실제로 norm_kw 를 포함하는 행."""
+        ok = self._norm_col.apply(cand, lambda a: pc.fill_null(pc.match_substring(a, norm_kw), False))
+        return cand[ok.astype(bool)]
+
+    def content_rows(self, norm_kw: str, content: "ContentIndex") -> np.ndarray:
+        """
+        본문에 norm_kw 가 있는 문서와 basename 이 같은 행 (오름차순, 읽기 전용).
+        색인 세대(content.generation)별로 캐시하므로 색인 작업이 커밋하면 새로 계산한다.
+        """
+        key = ("content", content.generation, norm_kw)
+        rows = self._term_cache.get(key)
+        if rows is None:
+            names = content.match(norm_kw)
+            rows = np.empty(0, dtype=np.int32)
+            if len(names) and len(self):
+                names = pc.unique(names).cast(pa.string())
+                hit = np.concatenate([
+                    pc.fill_null(pc.is_in(chunk, value_set=names), False).to_numpy(zero_copy_only=False)
+                    for chunk in self.basenames
+                ])
+                rows = np.flatnonzero(hit).astype(np.int32)
+            rows.setflags(write=False)
+            self._term_cache.put(key, rows)
+        return rows
+
+    @property
+    def basenames(self) -> List[pa.Array]:
+        """정규화 파일명에서 경로를 뗀 이름 (Arrow 청크별, 본문 색인 문서와 맞춰 볼 때 처음 한 번 계산)."""
+        if self._basenames is None:
+            self._basenames = [
+                pc.replace_substring_regex(chunk, r"^.*[/\\]", "").cast(pa.string())
+                for chunk in self._norm_col.chunks
+            ]
+        return self._basenames
+
+    def ext_rows(self, ext: str) -> np.ndarray:
+        """확장자가 ext 인 행 번호 (오름차순, 읽기 전용). 확장자별로 한 번만 훑고 term_rows 와 같은 캐시에 둔다."""
+        key = ("ext", ext)
+        rows = self._term_cache.get(key)
+        if rows is None:
+            suffix = "." + normalize(ext)
+            hit = self._norm_col.apply_all(lambda a: pc.fill_null(pc.ends_with(a, suffix), False)) if len(self) \
+                else np.empty(0, dtype=bool)
+            rows = np.flatnonzero(hit.astype(bool)).astype(np.int32)
+            rows.setflags(write=False)
+            self._term_cache.put(key, rows)
+        return rows
+
+    def query_rows(self, query: Query, fuzzy: bool = False, content: Optional["ContentIndex"] = None) -> np.ndarray:
+        """검색어(kwtool.query) 에 맞는 행 번호 (오름차순). 키워드별 적중 배열의 교집합·합집합·차집합."""
+        return self._eval(query.node, fuzzy, content)
+
+    def _eval(self, node: Node, fuzzy: bool, content: Optional["ContentIndex"] = None) -> np.ndarray:
+        op = node[0]
+        if op == "term":
+            return self.term_rows(node[1], fuzzy, content)
+        if op == "ext":
+            return self.ext_rows(node[1])
+        if op == "or":
+            return union_rows([self._eval(c, fuzzy, content) for c in node[1]], len(self))
+        if op == "not":
+            return subtract_rows(np.arange(len(self), dtype=np.int32), self._eval(node[1], fuzzy, content))
+        # AND: 긍정 조건은 짧은 배열부터 교집합, 제외 조건(NOT)은 여집합을 만들지 않고 차집합으로
+        include = sorted((self._eval(c, fuzzy, content) for c in node[1] if c[0] != "not"), key=len)
+        rows = include[0] if include else np.arange(len(self), dtype=np.int32)
+        for other in include[1:]:
+            rows = intersect_rows(rows, other)
+        for c in node[1]:
+            if c[0] == "not" and len(rows):
+                rows = subtract_rows(rows, self._eval(c[1], fuzzy, content))
+        return rows
+
+    def hit_rows(self, keywords: List[str], fuzzy: bool = False, content: Optional["ContentIndex"] = None) -> np.ndarray:
+        """필터링된 키워드 중 하나라도 일치하는 행 번호 (OR = 키워드별 적중 집합의 합집합, 오름차순)."""
+        norm_kws = dict.fromkeys(normalize(kw) for kw in keywords)
+        return union_rows([self.term_rows(kw, fuzzy, content) for kw in norm_kws], len(self))
+
+    def search(
+        self,
+        keywords: Union[List[str], Query],
+        threshold: float,
+        *,
+        min_len: int = 2,
+        ignore_single_digit: bool = True,
+        fuzzy: bool = False,
+        content: Optional["ContentIndex"] = None
+    ) -> ResultSet:
+        """
+        engine.search_frame 과 같은 결과를 색인으로 계산. 결과는 행 번호 핸들 (result.to_frame() 으로 DataFrame).
+        fuzzy 면 근사 일치 행도, content 를 주면 본문에 키워드가 있는 행도 일치(1.0)로 본다.
+        keywords 대신 Query(kwtool.query) 를 주면 AND/NOT/ext: 까지 적용한 행 (키워드 필터 규칙은 같다).
+        """
+        if isinstance(keywords, Query):
+            query = keywords.filtered(min_len, ignore_single_digit)
+            if query.empty:
+                return ResultSet(self.df, np.empty(0, dtype=np.int32))
+            return ResultSet.from_hits(self.df, self.query_rows(query, fuzzy, content), threshold)
+        filtered_kw = filter_keywords(keywords, min_len, ignore_single_digit)
+        if not filtered_kw:
+            return ResultSet(self.df, np.empty(0, dtype=np.int32))
+        return ResultSet.from_hits(self.df, self.hit_rows(filtered_kw, fuzzy, content), threshold)
+
+    @property
+    def doc_len(self) -> np.ndarray:
+        """행별 파일명 토큰 수 (디스크 캐시에 저장되므로 워커마다 다시 세지 않는다)."""
+        if self._doc_len is None:
+            counts = self._name_col.apply_all(bm25.token_counts) if len(self) else np.empty(0)
+            self._doc_len = np.minimum(counts, np.iinfo(np.uint16).max).astype(np.uint16)
+        return self._doc_len
+
+    @property
+    def avg_tokens(self) -> float:
+        if self._avg_tokens is None:
+            self._avg_tokens = float(self.doc_len.mean()) if len(self) else 0.0
+        return self._avg_tokens
+
+    def rank(
+        self,
+        keywords: Union[List[str], Query],
+        base_keywords: List[str] = (),
+        *,
+        min_len: int = 2,
+        ignore_single_digit: bool = True,
+        base_boost: float = bm25.BASE_BOOST,
+        fuzzy: bool = False,
+        content: Optional["ContentIndex"] = None
+    ) -> ResultSet:
+        """
+        관련도 순위 검색: search() 와 같은 일치 행을 BM25 점수 내림차순으로 (kwtool.bm25).
+        base_keywords 에 든 키워드는 base_boost 배 가중. 정렬은 보여줄 페이지까지만 부분 정렬한다.
+        근사 일치나 본문(content)으로만 걸린 행은 tf 를 bm25.FUZZY_TF 로 계산해 파일명 일치보다 낮게 둔다.
+        Query 를 주면 그 일치 행을 제외(NOT) 아래가 아닌 키워드로 점수 매긴다.
+        """
+        query = None
+        if isinstance(keywords, Query):
+            query = keywords.filtered(min_len, ignore_single_digit)
+            norm_kws = query.terms()
+            rows = self.query_rows(query, fuzzy, content) if not query.empty else np.empty(0, dtype=np.int32)
+        else:
+            filtered_kw = filter_keywords(keywords, min_len, ignore_single_digit)
+            norm_kws = list(dict.fromkeys(normalize(kw) for kw in filtered_kw))
+            rows = union_rows([self.term_rows(kw, fuzzy, content) for kw in norm_kws], len(self))
+        if not len(rows):
+            return ResultSet(self.df, np.empty(0, dtype=np.int32))
+
+        base = {normalize(kw) for kw in base_keywords}
+        norm_len = bm25.length_norm(self.doc_len[rows], self.avg_tokens)
+        scores = np.zeros(len(rows))
+        for kw in norm_kws:
+            term = self.term_rows(kw, fuzzy, content)
+            df = len(term)
+            if query is not None:
+                term = intersect_rows(term, rows)   # AND/NOT 으로 빠진 행 제외 (idf 는 전체 기준)
+            if not len(term):
+                continue
+            pos = np.searchsorted(rows, term)
+            tf = self._norm_col.apply(term, lambda a: pc.fill_null(pc.count_substring(a, kw), 0))
+            tf = np.where(tf > 0, tf, bm25.FUZZY_TF)
+            weight = bm25.idf(df, len(self)) * (base_boost if kw in base else 1.0)
+            scores[pos] += weight * bm25.saturate(tf, norm_len[pos])
+        return ResultSet.ranked(self.df, np.array(rows, dtype=np.int32), scores)
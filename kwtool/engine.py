@@ -0,0 +1,81 @@
+"""
+파일명 키워드 매칭 엔진.
+
+기존 search() 의 행 단위 score() 클로저(행 × 키워드 만큼 normalize 반복)를 대체한다.
+파일명 컬럼은 한 번만 정규화하고, 모든 키워드를 하나의 정규식 alternation 으로 묶어
+pandas 벡터화 .str 연산 한 번으로 매칭한다.
+"""
+import re
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from kwtool.text import filter_keywords, normalize  # noqa: F401  (기존 import 경로 유지)
+
+STRING_DTYPE = "string[pyarrow]"   # Arrow 문자열이라 .str.contains 가 RE2 커널로 돈다
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """
+    파일명 컬럼 전체를 한 번만 정규화.
+    str.lower() 결과가 Arrow 커널과 미묘하게 다를 수 있어 정규화 자체는 파이썬 규칙을 그대로 쓰고,
+    결과만 Arrow 문자열로 보관한다.
+    """
+    norm = [normalize(s) for s in names.tolist()]
+    return pd.Series(norm, index=names.index, dtype=STRING_DTYPE)
+
+
+def compile_pattern(keywords: List[str]) -> str:
+    """정규화한 키워드들을 하나의 alternation 패턴으로 (중복 제거, 긴 키워드 우선)."""
+    norm_kw = sorted({normalize(kw) for kw in keywords}, key=len, reverse=True)
+    return "|".join(re.escape(kw) for kw in norm_kw)
+
+
+def match_mask(norm: pd.Series, keywords: List[str]) -> np.ndarray:
+    """정규화된 파일명 중 키워드 하나라도 부분 문자열로 포함하는 행의 bool 마스크."""
+    if not keywords:
+        return np.zeros(len(norm), dtype=bool)
+    hit = norm.str.contains(compile_pattern(keywords), regex=True)
+    return hit.to_numpy(dtype=bool, na_value=False)
+
+
+def search_frame(
+    df: pd.DataFrame,
+    keywords: List[str],
+    threshold: float,
+    *,
+    norm: Optional[pd.Series] = None,
+    min_len: int = 2,
+    ignore_single_digit: bool = True
+) -> pd.DataFrame:
+    """
+    기존 search() 와 같은 행·점수·정렬을 돌려준다 (일치 1.0 / 불일치 0.0).
+    norm 을 넘기면 미리 정규화해 둔 컬럼을 재사용한다.
+    """
+    filtered_kw = filter_keywords(keywords, min_len, ignore_single_digit)
+    if not filtered_kw:
+        return df.iloc[0:0]
+
+    if norm is None:
+        norm = normalize_names(df["filename"])
+    hits = np.flatnonzero(match_mask(norm, filtered_kw))
+    return frame_from_hits(df, hits, threshold)
+
+
+def frame_from_hits(df: pd.DataFrame, hits: np.ndarray, threshold: float) -> pd.DataFrame:
+    """
+    일치 행 번호(오름차순)로 결과 프레임 구성: 일치 1.0 / 불일치 0.0 점수 후 threshold 필터·정렬.
+    threshold > 0 이면 일치 행만 복사하므로 비용이 적중 수에 비례한다.
+    """
+    if threshold > 1.0:
+        return df.iloc[0:0].assign(score=pd.Series(dtype=float))
+    if threshold > 0:
+        out = df.iloc[hits].copy()
+        out["score"] = 1.0
+    else:
+        out = df.copy()
+        scores = np.zeros(len(df))
+        scores[hits] = 1.0
+        out["score"] = scores
+    return out.sort_values("score", ascending=False)
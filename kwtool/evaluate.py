@@ -0,0 +1,222 @@
+"""
+로그 재생 오프라인 평가 (Streamlit 불필요).
+
+logs/phase_b/*.csv 를 프로세스 풀로 나눠 읽고, 참가자가 실행한 검색(search 이벤트의 키워드 집합)을
+앱과 같은 규칙으로 다시 검색해 label 컬럼(T = 정답) 기준 정밀도·재현율·F1 을 계산한다.
+증거로 저장한 파일(evidence_mark / evidence_mark_on_timeout)도 같은 지표로 평가한다.
+
+    python -m kwtool.evaluate logs/phase_b --dataset dataset.csv --out evaluation/
+    python -m kwtool.evaluate logs/phase_b --dataset dataset.csv --content-dir evidence_docs
+
+본문 검색(payload "content")은 --content-dir 를 주면 그 본문 색인의 현재 상태로 재현한다 (없으면 파일명만).
+
+출력:
+- searches.csv     : 검색 1회당 한 행 (키워드 수, 적중 수, 정답 적중, P/R/F1, 로그에 남은 적중 수).
+                     재현할 수 없는 검색(검색어 문법 오류, 키워드 목록 형식 오류)은 status=error 와 사유만 남기고 지표는 비운다.
+- participants.csv : 참가자별 검색 횟수, 마지막·최고 F1 검색, 증거 P/R/F1
+                     (증거는 정규화한 파일명 단위: 저장한 이름 수 대비 정답 이름 수, 정답 이름 전체 대비)
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from kwtool.query import Query, QuerySyntaxError
+from kwtool.text import filter_keywords
+from kwtool.evidence import EVIDENCE_EVENTS, norm_id
+from kwtool.resultref import is_ref
+
+SEARCH_FIELDS = [
+    "participant", "search_no", "timestamp", "n_keywords", "fuzzy", "content",
+    "hits", "true_hits", "precision", "recall", "f1", "logged_hits", "status", "error",
+]
+PARTICIPANT_FIELDS = [
+    "participant", "searches", "search_errors", "last_f1", "best_f1", "best_search_no",
+    "evidence", "evidence_true", "evidence_precision", "evidence_recall", "evidence_f1",
+]
+
+_dataset = None
+_truth: Optional[np.ndarray] = None
+_true_names: Optional[set] = None
+_content = None
+
+
+def prf(selected: int, true_selected: int, total_true: int) -> Tuple[float, float, float]:
+    precision = true_selected / selected if selected else 0.0
+    recall = true_selected / total_true if total_true else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def truth_mask(dataset) -> np.ndarray:
+    labels = dataset.df["label"].astype(str).str.strip().str.upper()
+    return labels.eq("T").to_numpy(dtype=bool, na_value=False)
+
+
+def true_names(dataset, truth: np.ndarray) -> set:
+    """정답 행의 파일명을 증거 저장과 같은 규칙(norm_id)으로 정규화한 집합."""
+    return {norm_id(name) for name in dataset.df["filename"].to_numpy()[truth] if isinstance(name, str)}
+
+
+def _init_worker(dataset_path: str, content_dir: Optional[str] = None) -> None:
+    """워커마다 데이터셋(과 본문 색인)을 한 번 연다 (디스크 캐시 메모리 맵 공유, kwtool.store)."""
+    global _dataset, _truth, _true_names, _content
+    from kwtool.dataset import ENCODING_CANDIDATES
+    from kwtool.store import open_dataset
+
+    _dataset = open_dataset(Path(dataset_path), ENCODING_CANDIDATES)
+    _truth = truth_mask(_dataset)
+    _true_names = true_names(_dataset, _truth)
+    if content_dir:
+        from kwtool.content import ContentIndex, index_dir_for
+        _content = ContentIndex.open(index_dir_for(Path(content_dir)))
+
+
+def search_payload_error(payload: dict) -> Optional[str]:
+    """재현할 수 없는 search payload 의 사유 (키워드 목록이 문자열 목록이 아니거나 query 가 문자열이 아님)."""
+    for field in ("base_keywords", "llm_keywords"):
+        value = payload.get(field, [])
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            return f"{field} must be a list of strings, got {type(value).__name__}"
+    if "query" in payload and payload["query"] is not None and not isinstance(payload["query"], str):
+        return f"query must be a string, got {type(payload['query']).__name__}"
+    return None
+
+
+def _read_events(log_path: Path):
+    with log_path.open("r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            raw = row.get("payload") or ""
+            try:
+                payload = json.loads(raw) if raw[:1] in ("{", "[") else raw
+            except json.JSONDecodeError:
+                payload = raw
+            yield row.get("timestamp", ""), row.get("event", ""), payload
+
+
+def evaluate_log(log_path: Path, dataset=None, truth: Optional[np.ndarray] = None,
+                 content_index=None) -> Tuple[List[dict], dict]:
+    """참가자 로그 하나 → (검색별 행 목록, 참가자 요약 행)."""
+    dataset = dataset if dataset is not None else _dataset
+    truth = truth if truth is not None else _truth
+    if dataset is _dataset and truth is _truth and _true_names is not None:
+        true_name_keys = _true_names
+    else:
+        true_name_keys = true_names(dataset, truth)
+    content_index = content_index if content_index is not None else _content
+    pid = log_path.stem
+    total_true = int(truth.sum())
+
+    searches: List[dict] = []
+    saved: Dict[str, str] = {}
+    for ts, event, payload in _read_events(log_path):
+        if event == "search" and isinstance(payload, dict):
+            fuzzy = bool(payload.get("fuzzy", False))
+            content = content_index if payload.get("content") else None
+            row = {
+                "participant": pid, "search_no": len(searches) + 1, "timestamp": ts,
+                "n_keywords": "", "fuzzy": int(fuzzy), "content": int(bool(payload.get("content"))),
+                "hits": "", "true_hits": "", "precision": "", "recall": "", "f1": "", "logged_hits": "",
+                "status": "ok", "error": "",
+            }
+            searches.append(row)
+            # 손상·구버전 로그 한 줄이 참가자 전체 평가를 막지 않도록 재현할 수 없는 검색은 사유만 남긴다
+            error = search_payload_error(payload)
+            if error:
+                row.update(status="error", error=f"TypeError: {error}")
+                continue
+            keywords = list(dict.fromkeys(payload.get("base_keywords", []) + payload.get("llm_keywords", [])))
+            row["n_keywords"] = len(keywords)
+            # 앱 search() 와 같은 키워드 필터(min_len=2, 한 자리 숫자 제외)와 threshold 1.0
+            if payload.get("query"):
+                # 검색어 문법을 쓴 검색: 기록된 정식 표기 + 고른 LLM 키워드 (앱과 같은 조합)
+                try:
+                    query = Query.parse(payload["query"]).or_terms(payload.get("llm_keywords", [])).filtered()
+                except QuerySyntaxError as e:
+                    row.update(status="error", error=f"QuerySyntaxError: {e}")
+                    continue
+                rows = dataset.query_rows(query, fuzzy, content) if not query.empty else np.empty(0, dtype=np.int32)
+            else:
+                filtered_kw = filter_keywords(keywords)
+                rows = dataset.hit_rows(filtered_kw, fuzzy, content) if filtered_kw else np.empty(0, dtype=np.int32)
+            true_hits = int(truth[rows].sum())
+            p, r, f = prf(len(rows), true_hits, total_true)
+            row.update(hits=len(rows), true_hits=true_hits, precision=round(p, 4), recall=round(r, 4), f1=round(f, 4))
+        elif event == "search_results" and searches and searches[-1]["logged_hits"] == "":
+            # 참조 payload 든 기존 파일명 목록이든 적중 수만 비교용으로 남긴다
+            if is_ref(payload):
+                searches[-1]["logged_hits"] = payload.get("count", "")
+            elif isinstance(payload, list):
+                searches[-1]["logged_hits"] = len(payload)
+        elif event in EVIDENCE_EVENTS and isinstance(payload, list):
+            for name in payload:
+                saved.setdefault(norm_id(name), name)
+
+    # 증거는 정규화한 파일명 단위로 센다 (같은 이름의 행이 여럿이어도 한 번, 분자·분모 모두)
+    evidence_true = sum(1 for key in saved if key in true_name_keys)
+    ep, er, ef = prf(len(saved), evidence_true, len(true_name_keys))
+    scored = [s for s in searches if s["status"] == "ok"]
+    best = max(scored, key=lambda s: s["f1"], default=None)
+    summary = {
+        "participant": pid, "searches": len(searches), "search_errors": len(searches) - len(scored),
+        "last_f1": scored[-1]["f1"] if scored else "",
+        "best_f1": best["f1"] if best else "",
+        "best_search_no": best["search_no"] if best else "",
+        "evidence": len(saved), "evidence_true": evidence_true,
+        "evidence_precision": round(ep, 4), "evidence_recall": round(er, 4), "evidence_f1": round(ef, 4),
+    }
+    return searches, summary
+
+
+def evaluate_dir(log_dir: Path, dataset_path: Path, workers: Optional[int] = None,
+                 content_dir: Optional[Path] = None) -> Tuple[List[dict], List[dict]]:
+    logs = sorted(Path(log_dir).glob("*.csv"))
+    searches, participants = [], []
+    initargs = (str(dataset_path), str(content_dir) if content_dir else None)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        for rows, summary in pool.map(evaluate_log, logs, chunksize=8):
+            searches.extend(rows)
+            participants.append(summary)
+    return searches, participants
+
+
+def write_csv(path: Path, fields: List[str], rows: List[dict]) -> None:
+    with path.open("w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fields)
+        w.writeheader()
+        w.writerows(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kwtool.evaluate", description="로그 재생 정밀도·재현율 평가")
+    ap.add_argument("log_dir", type=Path, help="참가자 로그 디렉토리 (예: logs/phase_b)")
+    ap.add_argument("--dataset", type=Path, required=True)
+    ap.add_argument("--out", type=Path, help="출력 디렉토리 (기본: <log_dir>/evaluation)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--content-dir", type=Path, help="본문 검색 재현에 쓸 문서 디렉토리 (kwtool.content 색인)")
+    args = ap.parse_args(argv)
+
+    # 캐시를 미리 만들어 두면 워커들은 메모리 맵으로 바로 연다
+    _init_worker(str(args.dataset))
+    t0 = time.perf_counter()
+    searches, participants = evaluate_dir(args.log_dir, args.dataset, args.workers, args.content_dir)
+    out = args.out or args.log_dir / "evaluation"
+    out.mkdir(parents=True, exist_ok=True)
+    write_csv(out / "searches.csv", SEARCH_FIELDS, searches)
+    write_csv(out / "participants.csv", PARTICIPANT_FIELDS, participants)
+    print(
+        f"{len(participants)} participants, {len(searches)} searches "
+        f"in {time.perf_counter() - t0:.1f}s → {out}", file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+버퍼링·배치 이벤트 로거.
+
+log() 는 큐에 넣기만 하고 바로 돌아오며, 백그라운드 writer 스레드가
+참가자별로 열어 둔 파일 핸들에 모아서 쓴다 (payload JSON 인코딩도 writer 스레드에서).
+디스크 형식은 기존과 같다: logs/phase_b/{pid}.csv, utf-8-sig, 헤더 timestamp,event,payload.
+
+내구성 정책 (fsync):
+- "never": 배치마다 OS 버퍼로 flush 만
+- "batch": 배치마다 flush + os.fsync (기본)
+- "always": 이벤트마다 flush + os.fsync
+"""
+import atexit
+import csv
+import datetime
+import json
+import os
+import queue
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from kwtool.metrics import METRICS
+
+FSYNC_POLICIES = ("never", "batch", "always")
+HEADER = ["timestamp", "event", "payload"]
+
+
+def encode_payload(payload: Any) -> str:
+    """기존 log_event 규칙 + to_payload() 를 가진 지연 payload 는 writer 스레드에서 변환."""
+    if hasattr(payload, "to_payload"):
+        payload = payload.to_payload()
+    if isinstance(payload, (dict, list)):
+        return json.dumps(payload, ensure_ascii=False)
+    return str(payload)
+
+
+class _Barrier:
+    """flush() 요청: writer 가 앞선 이벤트를 모두 쓰고 나면 set."""
+
+    def __init__(self, pid: Optional[str], close: bool):
+        self.pid = pid
+        self.close = close
+        self.done = threading.Event()
+
+
+class EventLogger:
+    def __init__(
+        self,
+        log_dir: Path,
+        *,
+        flush_interval: float = 1.0,
+        fsync: str = "batch",
+        max_open: int = 64,
+        batch_size: int = 1000
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}: {fsync!r}")
+        self.log_dir = Path(log_dir)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_open = max_open
+        self.batch_size = batch_size
+        self._queue: "queue.Queue" = queue.Queue()
+        self._files: "OrderedDict[str, Any]" = OrderedDict()   # pid → 열린 파일 (LRU)
+        self._dirty: set = set()
+        self.errors = 0
+        self.last_error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="event-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def path_for(self, pid: str) -> Path:
+        return self.log_dir / f"{pid}.csv"
+
+    def log(self, pid: str, event: str, payload: Any) -> None:
+        ts = datetime.datetime.now().isoformat(timespec="seconds")
+        self._queue.put((pid, ts, event, payload))
+
+    def flush(self, pid: Optional[str] = None, *, close: bool = False, timeout: Optional[float] = 10) -> bool:
+        """지금까지 log() 된 이벤트가 디스크에 쓰일 때까지 대기. close=True 면 pid 파일 핸들도 닫는다."""
+        if not self._thread.is_alive():
+            return False
+        barrier = _Barrier(pid, close)
+        self._queue.put(barrier)
+        with METRICS.span("eventlog.flush"):
+            return barrier.done.wait(timeout)
+
+    def shutdown(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=10)
+
+    # ── writer 스레드 ──────────────────────────────────────────
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._sync()
+                continue
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                if item is None:
+                    self._sync()
+                    self._close_all()
+                    return
+                if isinstance(item, _Barrier):
+                    self._sync()
+                    if item.close and item.pid is not None:
+                        self._close(item.pid)
+                    item.done.set()
+                    continue
+                try:
+                    self._write(*item)
+                except Exception as e:
+                    # 비동기라 호출자에게 전파할 수 없으므로 기록만 남긴다
+                    self.errors += 1
+                    self.last_error = e
+            self._sync()
+
+    def _handle(self, pid: str):
+        f = self._files.get(pid)
+        if f is not None:
+            self._files.move_to_end(pid)
+            return f
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(pid)
+        is_new = not path.exists() or path.stat().st_size == 0
+        f = path.open("a", newline="", encoding="utf-8-sig")
+        if is_new:
+            csv.writer(f).writerow(HEADER)
+        self._files[pid] = f
+        while len(self._files) > self.max_open:
+            old_pid, _ = next(iter(self._files.items()))
+            self._close(old_pid)
+        return f
+
+    def _write(self, pid: str, ts: str, event: str, payload: Any) -> None:
+        f = self._handle(pid)
+        with METRICS.span("eventlog.write"):
+            csv.writer(f).writerow([ts, event, encode_payload(payload)])
+        self._dirty.add(pid)
+        if self.fsync == "always":
+            self._sync_one(pid)
+
+    def _sync_one(self, pid: str) -> None:
+        f = self._files.get(pid)
+        if f is None:
+            self._dirty.discard(pid)
+            return
+        with METRICS.span("eventlog.sync"):
+            f.flush()
+            if self.fsync != "never":
+                os.fsync(f.fileno())
+        self._dirty.discard(pid)
+
+    def _sync(self) -> None:
+        for pid in list(self._dirty):
+            try:
+                self._sync_one(pid)
+            except OSError:
+                self._dirty.discard(pid)
+
+    def _close(self, pid: str) -> None:
+        if pid not in self._files:
+            return
+        try:
+            if pid in self._dirty:
+                self._sync_one(pid)
+        finally:
+            self._files.pop(pid).close()
+
+    def _close_all(self) -> None:
+        for pid in list(self._files):
+            self._close(pid)
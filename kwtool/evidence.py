@@ -0,0 +1,217 @@
+"""
+참가자별 증거 저장 목록의 전용 저장소 (append-only 저널 + 체크포인트 스냅샷).
+
+세션 재개 시 로그 CSV 전체를 읽지 않고 스냅샷 + 스냅샷 이후 저널 꼬리만 읽으므로
+비용이 로그 크기가 아니라 저장된 증거 수에 비례한다.
+
+    evidence/{pid}.jsonl          {"ts", "event", "items": [...]} 한 줄씩 추가
+    evidence/{pid}.snapshot.json  {"items": [...], "offset": 스냅샷에 반영된 저널 바이트 위치}
+
+기존 로그에서 재구축:
+    python -m kwtool.evidence migrate logs/phase_b
+"""
+import argparse
+import contextlib
+import csv
+import datetime
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:          # Windows: 프로세스 간 잠금 없이 스레드 잠금만
+    fcntl = None
+
+EVIDENCE_EVENTS = ("evidence_mark", "evidence_mark_on_timeout")
+STORE_DIRNAME = "evidence"
+CHECKPOINT_EVERY = 20        # 저널이 이만큼 쌓이면 스냅샷 갱신
+
+
+def norm_id(name: str) -> str:
+    """중복 판단용 키(대소문자/앞뒤 공백 차이 무시). 필요시 경로 정규화 규칙을 여기서 확장."""
+    return (name or "").strip().lower()
+
+
+def _merge(saved: List[str], keys: set, items: Iterable[str]) -> None:
+    for name in items:
+        k = norm_id(name)
+        if k not in keys:
+            keys.add(k)
+            saved.append(name)
+
+
+def scan_log(log_path: Path) -> List[str]:
+    """
+    로그 CSV 를 스캔해 '증거로 저장'된 파일 목록 복원 (저장 순서, 중복 제거).
+    evidence_mark / evidence_mark_on_timeout 이벤트의 payload 를 합집합으로 반영.
+    """
+    saved, keys = [], set()
+    if not log_path.exists():
+        return saved
+    with log_path.open("r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("event") not in EVIDENCE_EVENTS:
+                continue
+            try:
+                payload = json.loads(row.get("payload") or "[]")
+            except json.JSONDecodeError:
+                continue
+            if isinstance(payload, list):
+                _merge(saved, keys, payload)
+    return saved
+
+
+def _write_json_atomic(path: Path, data: dict) -> None:
+    tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def _fsync_dir(path: Path) -> None:
+    """이름 교체(os.replace)를 디스크에 확정. 디렉토리를 열 수 없는 플랫폼에서는 건너뜀."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class EvidenceStore:
+    def __init__(self, root: Path, *, checkpoint_every: int = CHECKPOINT_EVERY):
+        self.root = Path(root)
+        self.checkpoint_every = checkpoint_every
+        self._lock = threading.Lock()
+
+    def journal_path(self, pid: str) -> Path:
+        return self.root / f"{pid}.jsonl"
+
+    def snapshot_path(self, pid: str) -> Path:
+        return self.root / f"{pid}.snapshot.json"
+
+    @contextlib.contextmanager
+    def _locked(self, pid: str):
+        """
+        append / rebuild / 체크포인트가 함께 쓰는 잠금. 스레드 잠금에 더해 {pid}.lock 에 flock 을 걸어
+        앱 프로세스의 append 와 migrate 프로세스의 rebuild 가 서로 끼어들지 못하게 한다.
+        """
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            if fcntl is None:
+                yield
+                return
+            with (self.root / f"{pid}.lock").open("a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def exists(self, pid: str) -> bool:
+        return self.snapshot_path(pid).exists() or self.journal_path(pid).exists()
+
+    def _read(self, pid: str) -> Tuple[List[str], set, int, int]:
+        """(저장 목록, 키 집합, 저널 끝 오프셋, 스냅샷 이후 저널 줄 수)."""
+        saved, keys, offset = [], set(), 0
+        snap = self.snapshot_path(pid)
+        if snap.exists():
+            data = json.loads(snap.read_text(encoding="utf-8"))
+            _merge(saved, keys, data.get("items", []))
+            offset = data.get("offset", 0)
+
+        tail = 0
+        journal = self.journal_path(pid)
+        if journal.exists():
+            with journal.open("rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # 쓰다 만 마지막 줄 (비정상 종료) 은 무시
+                    offset += len(line)
+                    tail += 1
+                    try:
+                        _merge(saved, keys, json.loads(line).get("items", []))
+                    except (ValueError, AttributeError):
+                        continue
+        return saved, keys, offset, tail
+
+    def load(self, pid: str) -> Tuple[set, set]:
+        """기존 load_saved_from_logs 와 같은 (저장된 파일명 집합, 정규화 키 집합)."""
+        with self._lock:
+            saved, keys, offset, tail = self._read(pid)
+        if tail >= self.checkpoint_every:
+            with self._locked(pid):
+                saved, keys, offset, tail = self._read(pid)   # 잠금을 기다리는 사이 rebuild 됐을 수 있음
+                self._checkpoint(pid, saved, offset)
+        return set(saved), keys
+
+    def append(self, pid: str, event: str, items: List[str]) -> None:
+        """저널에 한 줄 추가 후 fsync. 스냅샷 갱신은 저널 꼬리가 길어졌을 때 load() 에서."""
+        line = json.dumps({
+            "ts": datetime.datetime.now().isoformat(timespec="seconds"),
+            "event": event,
+            "items": list(items),
+        }, ensure_ascii=False) + "\n"
+        with self._locked(pid):
+            with self.journal_path(pid).open("ab") as f:
+                f.write(line.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def rebuild(self, pid: str, items: List[str]) -> None:
+        """
+        items 로 스냅샷을 새로 쓰고 저널을 비운다 (마이그레이션용).
+        스냅샷 교체·fsync 가 끝난 뒤에만 저널을 자르므로, 중간에 죽어도 남는 것은 새 스냅샷 + 옛 저널
+        (다시 읽으면 합집합) 이고 저장 목록이 비는 일은 없다.
+        """
+        with self._locked(pid):
+            self._checkpoint(pid, items, 0)
+            journal = self.journal_path(pid)
+            if journal.exists():
+                with journal.open("r+b") as f:
+                    f.truncate(0)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def _checkpoint(self, pid: str, items: List[str], offset: int) -> None:
+        _write_json_atomic(self.snapshot_path(pid), {"items": list(items), "offset": offset})
+
+
+def migrate(log_dir: Path, store: Optional[EvidenceStore] = None) -> int:
+    """log_dir/*.csv 각 참가자 로그에서 증거 저장소를 재구축. 처리한 참가자 수 반환."""
+    store = store or EvidenceStore(log_dir / STORE_DIRNAME)
+    count = 0
+    for log_path in sorted(Path(log_dir).glob("*.csv")):
+        store.rebuild(log_path.stem, scan_log(log_path))
+        count += 1
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kwtool.evidence", description="증거 저장소 도구")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    mg = sub.add_parser("migrate", help="logs/phase_b/*.csv 로부터 증거 저장소 재구축")
+    mg.add_argument("log_dir", type=Path)
+    mg.add_argument("--store", type=Path, help=f"저장소 경로 (기본: <log_dir>/{STORE_DIRNAME})")
+    args = ap.parse_args(argv)
+
+    store = EvidenceStore(args.store) if args.store else None
+    n = migrate(args.log_dir, store)
+    print(f"migrated {n} participant logs", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""
+근사 일치 색인: 오탈자(편집 거리), 한글 자모 분해, 로마자 표기.
+
+파일명을 토큰(문자·숫자 연속, 숫자가 섞인 토큰 제외)으로 나눠 고유 토큰 어휘를 만들고,
+토큰마다 비교용 형태 두 가지를 둔다.
+- 자모형: 한글 음절을 호환 자모로 분해 ("보고서" → "ㅂㅗㄱㅗㅅㅓ"), 라틴 문자는 그대로
+- 로마자형: 국어의 로마자 표기법 자모 대응 (음운 변화 규칙 제외, "보고서" → "bogoseo")
+질의 키워드도 같은 두 형태로 바꿔 형태 길이에 따른 허용 거리(max_distance) 안의 토큰을 찾는다.
+SUBSTRING_MIN_LEN 이상인 형태는 합성어 토큰 안의 부분과도 비교한다 ("보고셔" → "주간보고서").
+토큰 앞뒤를 음절 경계까지 건너뛰는 데 비용이 없는 편집 거리(semi-global)로 재고, 허용 거리는
+SUBSTRING_MAX_DISTANCE 로 더 좁게 둔다 (음절 중간에서 시작·끝나는 정렬은 잘린 자모만큼 비용).
+후보는 형태 바이그램 역색인으로 추린 뒤(q-gram 하한: 편집 1회는 바이그램을 최대 2개 없앤다)
+남은 것만 편집 거리를 계산하므로 행 수가 아니라 어휘 크기·후보 수에 비례한다.
+인접 문자 뒤바뀜은 바이그램을 3개까지 없애 하한에 걸리지 않으므로 뒤바꾼 변형을 그대로 찾는다.
+토큰 → 행 번호는 트라이그램 색인과 같은 CSR 구조(TrigramIndex, 키 = 토큰 번호)로 보관한다.
+"""
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from kwtool.index import BUILD_CHUNK, TrigramIndex, _as_codepoints, _hash32
+
+TOKEN_SPLIT = r"[^\pL\pN]+"
+MIN_TOKEN_LEN = 2
+SUBSTRING_MIN_LEN = 6        # 이보다 짧은 형태는 토큰 전체와만 비교 ("보고" 가 "복사" 안에서 맞지 않도록)
+SUBSTRING_MAX_DISTANCE = 1
+
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ",
+         "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+_ROM_CHO = ["g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj",
+            "ch", "k", "t", "p", "h"]
+_ROM_JUNG = ["a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae", "oe", "yo",
+             "u", "wo", "we", "wi", "yu", "eu", "ui", "i"]
+_ROM_JONG = ["", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "l", "l", "l",
+             "p", "l", "m", "p", "p", "t", "t", "ng", "t", "t", "k", "t", "p", "t"]
+
+
+def _syllable(ch: str):
+    code = ord(ch)
+    if not _HANGUL_FIRST <= code <= _HANGUL_LAST:
+        return None
+    code -= _HANGUL_FIRST
+    return code // 588, (code % 588) // 28, code % 28
+
+
+def decompose(text: str) -> str:
+    """한글 음절 → 호환 자모열. 그 밖의 문자는 그대로."""
+    out = []
+    for ch in text:
+        s = _syllable(ch)
+        out.append(ch if s is None else _CHO[s[0]] + _JUNG[s[1]] + _JONG[s[2]])
+    return "".join(out)
+
+
+def romanize(text: str) -> str:
+    """한글 음절 → 로마자 (자모 단위 대응만). 그 밖의 문자는 그대로."""
+    out = []
+    for ch in text:
+        s = _syllable(ch)
+        out.append(ch if s is None else _ROM_CHO[s[0]] + _ROM_JUNG[s[1]] + _ROM_JONG[s[2]])
+    return "".join(out)
+
+
+def forms(token: str) -> Set[str]:
+    return {decompose(token), romanize(token)}
+
+
+def syllable_bounds(token: str, form: str) -> Set[int]:
+    """form(token 의 자모형 또는 로마자형) 안에서 원래 문자(음절) 경계 위치."""
+    for convert in (decompose, romanize):
+        if convert(token) == form:
+            bounds, pos = {0}, 0
+            for ch in token:
+                pos += len(convert(ch))
+                bounds.add(pos)
+            return bounds
+    return set(range(len(form) + 1))
+
+
+def max_distance(length: int) -> int:
+    """형태 길이별 허용 편집 거리: 짧은 형태는 정확히, 길수록 2 까지."""
+    if length <= 3:
+        return 0
+    return 1 if length <= 7 else 2
+
+
+def edit_distance(a: str, b: str, limit: int, bounds: Optional[Set[int]] = None) -> int:
+    """
+    인접 문자 뒤바뀜을 1회로 치는 편집 거리 (OSA). limit 을 넘으면 limit + 1 에서 중단.
+    bounds(b 안의 경계 위치)를 주면 a 와 b 의 부분 사이 최소 거리: b 의 앞뒤는 경계까지 비용 없이 건너뛴다.
+    """
+    if len(a) - len(b) > limit or (bounds is None and len(b) - len(a) > limit):
+        return limit + 1
+    if bounds is None:
+        prev, tail = list(range(len(b) + 1)), None
+    else:
+        prev, tail, start, end = [], [0] * (len(b) + 1), 0, len(b)
+        for j in range(len(b) + 1):
+            start = j if j in bounds else start
+            prev.append(j - start)                  # 앞 경계까지는 무료, 그 뒤 잘린 부분은 삽입
+        for j in range(len(b), -1, -1):
+            end = j if j in bounds else end
+            tail[j] = end - j                       # 뒤 경계까지 남은 부분은 삭제
+    prev2 = None
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                d = min(d, prev2[j - 2] + 1)
+            cur.append(d)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1] if tail is None else min(p + t for p, t in zip(prev, tail))
+
+
+def _bigram_keys(mat: np.ndarray) -> np.ndarray:
+    """(rows, width) 코드포인트 행렬 → (rows, width-1) 바이그램 코드, 빈칸이 섞이면 0."""
+    c = mat.astype(np.uint64)
+    codes = (c[:, :-1] << np.uint64(21)) | c[:, 1:]
+    codes[mat[:, 1:] == 0] = 0
+    return codes
+
+
+def _bigram_postings(strings: List[str], start: int) -> np.ndarray:
+    if not strings:
+        return np.empty(0, dtype=np.uint64)
+    codes = np.sort(_bigram_keys(_as_codepoints(strings)), axis=1)
+    keep = codes != 0
+    keep[:, 1:] &= codes[:, 1:] != codes[:, :-1]
+    ids = np.broadcast_to(np.arange(start, start + len(strings), dtype=np.uint64)[:, None], codes.shape)
+    return (_hash32(codes[keep]) << np.uint64(32)) | ids[keep]
+
+
+def query_bigrams(text: str) -> np.ndarray:
+    if len(text) < 2:
+        return np.empty(0, dtype=np.uint32)
+    return np.unique(_hash32(_bigram_keys(_as_codepoints([text]))[0])).astype(np.uint32)
+
+
+def tokenize(chunk: pa.Array, start: int):
+    """문자열 청크 → (토큰 배열, 행 번호). 소문자화, 숫자가 섞였거나 짧은 토큰은 제외."""
+    lists = pc.split_pattern_regex(pc.utf8_lower(chunk), TOKEN_SPLIT)
+    tokens = pc.list_flatten(lists)
+    rows = pc.list_parent_indices(lists).to_numpy() + start
+    keep = pc.and_(
+        pc.greater_equal(pc.utf8_length(tokens), MIN_TOKEN_LEN),
+        pc.invert(pc.match_substring_regex(tokens, r"\pN"))
+    )
+    keep = pc.fill_null(keep, False)
+    return tokens.filter(keep), rows[keep.to_numpy(zero_copy_only=False)]
+
+
+class FuzzyIndex:
+    def __init__(self, vocab: List[str], postings: TrigramIndex, form_strs: List[str],
+                 form_token: np.ndarray, grams: TrigramIndex):
+        self.vocab = vocab            # 고유 토큰 (토큰 번호 = 위치)
+        self.postings = postings      # 토큰 번호 → 행 번호
+        self.form_strs = form_strs    # 비교용 형태 (자모형/로마자형)
+        self.form_token = form_token  # 형태 → 토큰 번호
+        self.form_len = np.array([len(f) for f in form_strs], dtype=np.int32)
+        self.grams = grams            # 형태 바이그램 해시 → 형태 번호
+        self._exact: Dict[str, List[int]] = {}
+        for i, f in enumerate(form_strs):
+            self._exact.setdefault(f, []).append(i)
+
+    @classmethod
+    def build(cls, chunks: List[pa.Array], n_rows: int) -> "FuzzyIndex":
+        """파일명 컬럼의 Arrow 청크들로 구축 (Dataset._name_col.chunks)."""
+        tok_parts, row_parts, start = [], [], 0
+        for chunk in chunks:
+            tokens, rows = tokenize(chunk, start)
+            tok_parts.append(tokens)
+            row_parts.append(rows)
+            start += len(chunk)
+        tokens = pa.concat_arrays(tok_parts) if tok_parts else pa.array([], type=pa.large_string())
+        encoded = pc.dictionary_encode(tokens)
+        vocab = encoded.dictionary.to_pylist()
+        token_ids = encoded.indices.to_numpy().astype(np.uint64)
+        rows = np.concatenate(row_parts).astype(np.uint64) if row_parts else np.empty(0, dtype=np.uint64)
+        postings = TrigramIndex.from_parts([(token_ids << np.uint64(32)) | rows], n_rows)
+
+        form_strs, form_token = [], []
+        for tid, token in enumerate(vocab):
+            for f in forms(token):
+                form_strs.append(f)
+                form_token.append(tid)
+        parts = [
+            _bigram_postings(form_strs[i:i + BUILD_CHUNK], i)
+            for i in range(0, len(form_strs), BUILD_CHUNK)
+        ]
+        grams = TrigramIndex.from_parts(parts, len(form_strs))
+        return cls(vocab, postings, form_strs, np.array(form_token, dtype=np.int32), grams)
+
+    def match_forms(self, form: str) -> np.ndarray:
+        """form 에서 허용 거리 안의 형태 번호."""
+        d = max_distance(len(form))
+        if d == 0:
+            return np.array(self._exact.get(form, []), dtype=np.int64)
+        lists = [self.grams.postings(g) for g in query_bigrams(form)]
+        if not lists:
+            return np.empty(0, dtype=np.int64)
+        ids, counts = np.unique(np.concatenate(lists), return_counts=True)
+        whole = ids[(counts >= len(lists) - 2 * d) & (np.abs(self.form_len[ids] - len(form)) <= d)]
+        found = [i for i in whole if edit_distance(form, self.form_strs[i], d) <= d]
+        substring = len(form) >= SUBSTRING_MIN_LEN
+        if substring:
+            # 합성어 토큰 안의 부분 일치 (토큰 전체 비교에서 이미 찾은 것은 제외)
+            sd = SUBSTRING_MAX_DISTANCE
+            part = ids[(counts >= len(lists) - 2 * sd) & (self.form_len[ids] > len(form))]
+            found.extend(i for i in np.setdiff1d(part, found) if self._substring_distance(form, i, sd) <= sd)
+        # 인접 문자 뒤바뀜은 바이그램을 3개까지 없애 위 하한에 걸리지 않으므로 변형을 직접 조회
+        for k in range(len(form) - 1):
+            swapped = form[:k] + form[k + 1] + form[k] + form[k + 2:]
+            found.extend(self._exact.get(swapped, ()))
+            if substring:
+                found.extend(i for i in self._containing(swapped)
+                             if self.form_len[i] > len(form) and self._substring_distance(swapped, i, 0) == 0)
+        return np.unique(np.array(found, dtype=np.int64))
+
+    def _containing(self, text: str) -> np.ndarray:
+        """text 의 바이그램을 모두 가진 형태 번호 (드문 바이그램부터 교집합)."""
+        lists = sorted((self.grams.postings(g) for g in query_bigrams(text)), key=len)
+        ids = lists[0] if lists else np.empty(0, dtype=np.uint32)
+        for postings in lists[1:]:
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, postings, assume_unique=True)
+        return ids
+
+    def _substring_distance(self, form: str, i: int, limit: int) -> int:
+        bounds = syllable_bounds(self.vocab[self.form_token[i]], self.form_strs[i])
+        return edit_distance(form, self.form_strs[i], limit, bounds)
+
+    def tokens(self, norm_kw: str) -> np.ndarray:
+        """키워드와 근사 일치하는 토큰 번호 (숫자가 섞인 키워드는 근사 일치 대상이 아님)."""
+        if any(ch.isdigit() for ch in norm_kw):
+            return np.empty(0, dtype=np.int32)
+        found = [self.match_forms(f) for f in forms(norm_kw)]
+        form_ids = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        return np.unique(self.form_token[form_ids])
+
+    def rows(self, norm_kw: str) -> List[np.ndarray]:
+        """근사 일치 토큰별 행 번호 목록 (각각 오름차순)."""
+        return [self.postings.postings(np.uint32(t)) for t in self.tokens(norm_kw)]
@@ -0,0 +1,108 @@
+"""
+정규화 파일명 위의 문자 트라이그램 역색인.
+
+트라이그램 = 연속한 코드포인트 3개를 (c0<<42 | c1<<21 | c2) 의 uint64 하나로 인코딩한 뒤
+32비트로 해시한 값을 키로 쓴다. 해시 충돌은 후보를 조금 늘릴 뿐이고 후보는 항상 실제 문자열로
+검증하므로 결과는 정확하다. 32비트 키 덕분에 (키<<32 | 행) 을 uint64 하나로 묶어 비안정 정렬
+한 번으로 색인을 만들 수 있다.
+색인은 CSR 형태로 보관한다: 정렬된 키 배열, 키별 오프셋, 오름차순 행 번호 배열.
+"""
+from typing import List
+
+import numpy as np
+
+NGRAM = 3
+BUILD_CHUNK = 16384          # 한 번에 UTF-32 행렬로 펼칠 행 수 (메모리 상한)
+
+
+def _codes(mat: np.ndarray) -> np.ndarray:
+    """(rows, width) 코드포인트 행렬 → (rows, width-2) 트라이그램 코드. 빈칸(0)이 섞이면 0."""
+    c = mat.astype(np.uint64)
+    codes = (c[:, :-2] << np.uint64(42)) | (c[:, 1:-1] << np.uint64(21)) | c[:, 2:]
+    codes[mat[:, 2:] == 0] = 0
+    return codes
+
+
+def _hash32(codes: np.ndarray) -> np.ndarray:
+    """트라이그램 코드 → 32비트 키 (곱셈 해시 상위 32비트, uint64 로 반환)."""
+    return (codes * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(32)
+
+
+def _as_codepoints(strings: List[str]) -> np.ndarray:
+    """문자열 목록을 (rows, maxlen) uint32 코드포인트 행렬로 (짧은 행은 0 으로 채움)."""
+    arr = np.array(strings, dtype=str)
+    width = max(arr.dtype.itemsize // 4, NGRAM)
+    return np.ascontiguousarray(arr, dtype=f"<U{width}").view(np.uint32).reshape(len(strings), width)
+
+
+def query_trigrams(text: str) -> np.ndarray:
+    """질의 문자열의 고유 트라이그램 키 (길이 3 미만이면 빈 배열)."""
+    if len(text) < NGRAM:
+        return np.empty(0, dtype=np.uint32)
+    return np.unique(_hash32(_codes(_as_codepoints([text]))[0])).astype(np.uint32)
+
+
+def chunk_postings(norm_names: List[str], start: int) -> np.ndarray:
+    """
+    start 행부터 이어지는 정규화 파일명들의 포스팅을 (키<<32 | 행) uint64 로 묶어 반환.
+    같은 행의 중복 트라이그램은 여기서 대부분 걸러지고, 남는 해시 중복은 from_parts 에서 제거.
+    """
+    if not norm_names:
+        return np.empty(0, dtype=np.uint64)
+    codes = np.sort(_codes(_as_codepoints(norm_names)), axis=1)
+    keep = codes != 0
+    keep[:, 1:] &= codes[:, 1:] != codes[:, :-1]
+    rows = np.broadcast_to(
+        np.arange(start, start + len(norm_names), dtype=np.uint64)[:, None], codes.shape
+    )
+    return (_hash32(codes[keep]) << np.uint64(32)) | rows[keep]
+
+
+class TrigramIndex:
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, rows: np.ndarray, n_rows: int):
+        self.keys = keys          # uint32 트라이그램 해시, 정렬·고유
+        self.offsets = offsets    # int64, len(keys) + 1
+        self.rows = rows          # int32, 키별 구간 안에서 오름차순
+        self.n_rows = n_rows
+
+    @classmethod
+    def build(cls, norm_names: List[str]) -> "TrigramIndex":
+        parts = [
+            chunk_postings(norm_names[start:start + BUILD_CHUNK], start)
+            for start in range(0, len(norm_names), BUILD_CHUNK)
+        ]
+        return cls.from_parts(parts, len(norm_names))
+
+    @classmethod
+    def from_parts(cls, parts: List[np.ndarray], n_rows: int) -> "TrigramIndex":
+        """chunk_postings() 결과들을 CSR 색인으로 합친다 (키, 행 순 정렬 = uint64 정렬 한 번)."""
+        packed = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.uint64)
+        if len(packed):
+            packed = packed[np.diff(packed, prepend=~packed[0]) != 0]
+        hashed = (packed >> np.uint64(32)).astype(np.uint32)
+        rows = (packed & np.uint64(0xFFFFFFFF)).astype(np.int32)
+        if len(hashed):
+            starts = np.flatnonzero(np.diff(hashed, prepend=~hashed[0]) != 0)
+        else:
+            starts = np.empty(0, dtype=np.int64)
+        keys = hashed[starts]
+        offsets = np.append(starts, len(hashed)).astype(np.int64)
+        return cls(keys, offsets, rows, n_rows)
+
+    def postings(self, code: np.uint32) -> np.ndarray:
+        i = np.searchsorted(self.keys, code)
+        if i >= len(self.keys) or self.keys[i] != code:
+            return np.empty(0, dtype=np.int32)
+        return self.rows[self.offsets[i]:self.offsets[i + 1]]
+
+    def candidates(self, text: str) -> np.ndarray:
+        """text 의 모든 트라이그램을 가진 행 번호 (오름차순). 길이 3 이상만 의미가 있다."""
+        lists = sorted((self.postings(c) for c in query_trigrams(text)), key=len)
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+        cand = lists[0]
+        for other in lists[1:]:
+            if len(cand) == 0:
+                break
+            cand = np.intersect1d(cand, other, assume_unique=True)
+        return cand
@@ -0,0 +1,276 @@
+"""
+LLM 키워드 증강 클라이언트.
+
+- 프로세스당 하나의 AsyncOpenAI 클라이언트(커넥션 풀 공유)를 백그라운드 이벤트 루프 스레드에서 구동
+- 같은 (기본 키워드 집합, N) 요청이 여러 세션에서 동시에 들어오면 업스트림 호출 1회로 합침
+  (합치기 키는 캐시 키와 같은 정규화: 순서·대소문자·공백 차이 무시)
+- 재시도는 지수 백오프 + full jitter
+- 스트리밍 응답에서 완성된 키워드를 부분 결과로 노출 (UI 가 도착하는 대로 표시)
+- cache(LLMCache) 가 있으면 유효 캐시는 업스트림 없이 바로 반환, 업스트림 실패 시 만료 캐시로 대체,
+  offline 이면 업스트림을 아예 부르지 않고 캐시만 재생
+
+OPENAI_BASE_URL 환경변수로 로컬 스텁 서버를 가리키게 할 수 있다.
+"""
+import asyncio
+import concurrent.futures
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from kwtool.llm_cache import LLMCache, normalize_base
+from kwtool.metrics import METRICS
+
+MODEL = "gpt-5-chat-latest"
+REQUEST_TIMEOUT = 45          # 요청 1회 타임아웃 (초)
+BACKOFF_BASE = 1.0            # 재시도 대기: uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+BACKOFF_CAP = 8.0
+POLL_INTERVAL = 0.2           # fetch() 가 부분 결과를 확인하는 주기 (초)
+
+SYSTEM_PROMPT = """
+# Objective
+You are an investigator with many years of practical experience in the field of digital forensics. Analyze the keywords entered by the user, derive semantically, thematically, and contextually related single-word keywords, and output exactly N according to the specified JSON schema. If you need a more formal or detailed version, here is a slightly longer and clarified option:
+
+## Input
+- Format: keyword1, keyword2, keyword3, number_of_keywords_to_output
+- Example 1: police agency, sexual harassment, statistics, 30
+- Example 2: drugs, smuggling, BTC, 30
+- Example 3: military, blueprint, operation, 30
+
+# Output
+```json
+{
+  "keywords": [
+    "keyword1",
+    "keyword2",
+    ...
+  ]
+}
+
+# Instructions
+1. Each keyword must be a single word and cannot contain spaces, hyphens, or underscores.
+2. Every keyword should appear only once, with no duplicates (including homonyms and alternate spellings).
+3. Ensure semantic diversity: include a balanced mix of synonyms, hypernyms (broader terms), hyponyms (narrower terms), and related words.
+4. Arrange keywords in a logical order considering relevance and usefulness; do not randomize the sequence.
+5. Hierarchy ratio (for N=30):
+   - Hypernyms: at least 12
+   - Mid-level terms: 10-12
+   - Hyponyms: no more than 8
+6. Include at least 5 specialized/professional terms, slang, or abbreviations (from any domain).
+7. Self-check before output:
+   - Remove banned words, duplicates, and typos to ensure exactly N keywords
+   - If ratio or rules are violated, regenerate automatically
+
+# Output-only
+Do not include any additional explanations, comments, or line breaks other than the JSON object.
+Output the result only once.
+"""
+
+_JSON_STRING = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+
+def clean_keywords(raw: List[str], n: int) -> List[str]:
+    """공백 제거·빈 값 제외·중복 제거 후 최대 n 개."""
+    kw = [k.strip() for k in raw if isinstance(k, str) and k.strip()]
+    return list(dict.fromkeys(kw))[:n]
+
+
+def partial_keywords(text: str, n: int) -> List[str]:
+    """스트리밍 중인 JSON 조각에서 "keywords" 배열의 완성된 문자열만 추출."""
+    start = text.find("[")
+    if start < 0:
+        return []
+    raw = []
+    for m in _JSON_STRING.finditer(text, start + 1):
+        try:
+            raw.append(json.loads(f'"{m.group(1)}"'))
+        except ValueError:
+            continue
+    return clean_keywords(raw, n)
+
+
+def backoff_delay(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class KeywordCall:
+    """진행 중인 업스트림 호출 1건 (같은 요청을 기다리는 모든 세션이 공유)."""
+
+    def __init__(self, key: Tuple[Tuple[str, ...], int], base_keywords: List[str] = ()):
+        self.key = key                # (정규화·정렬한 기본 키워드, N)
+        self.base_keywords = list(base_keywords)  # 프롬프트에 넣을 원래 입력 (처음 요청한 세션 것)
+        self.partial: List[str] = []
+        self.attempts = 0
+        self.cached = False           # 캐시에서 바로 응답했는지
+        self.usage: Dict[str, int] = {}  # 업스트림이 보고한 토큰 수 (prompt/completion)
+        self.future: Optional[concurrent.futures.Future] = None
+
+    @classmethod
+    def resolved(cls, key: Tuple[Tuple[str, ...], int], keywords: List[str]) -> "KeywordCall":
+        call = cls(key)
+        call.cached = True
+        call.partial = list(keywords)
+        call.future = concurrent.futures.Future()
+        call.future.set_result(keywords)
+        return call
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+
+class KeywordClient:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        *,
+        model: str = MODEL,
+        base_url: Optional[str] = None,
+        cache: Optional[LLMCache] = None,
+        offline: bool = False
+    ):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.model = model
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self.cache = cache
+        self.offline = offline
+        self._client = None
+        self._inflight: Dict[Tuple[Tuple[str, ...], int], KeywordCall] = {}
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+
+    # ── 동기 API (Streamlit 스크립트 스레드용) ─────────────────
+    def submit(self, base_keywords: List[str], n: int = 30, retry: int = 3) -> KeywordCall:
+        """캐시 적중이면 완료된 호출을, 아니면 업스트림 호출을 시작하거나 진행 중인 같은 요청에 합류."""
+        key = (tuple(normalize_base(base_keywords)), n)
+        if self.cache is not None:
+            cached = self.cache.get(self._cache_key(key), allow_stale=self.offline)
+            if cached is not None:
+                return KeywordCall.resolved(key, cached)
+        if self.offline:
+            return KeywordCall.resolved(key, [])
+        if not self.api_key:
+            raise RuntimeError("OPENAI_API_KEY 환경변수가 없습니다.")
+        with self._lock:
+            call = self._inflight.get(key)
+            if call is None:
+                call = KeywordCall(key, base_keywords)
+                self._inflight[key] = call
+                call.future = asyncio.run_coroutine_threadsafe(self._run(call, retry), self._loop)
+                call.future.add_done_callback(lambda _f, c=call: self._forget(c))
+        return call
+
+    def fetch(
+        self,
+        base_keywords: List[str],
+        n: int = 30,
+        retry: int = 3,
+        on_partial: Optional[Callable[[List[str]], None]] = None
+    ) -> List[str]:
+        """
+        결과 키워드 목록 반환 (재시도 모두 실패 시 빈 목록).
+        on_partial 은 호출 스레드에서 새 키워드가 도착할 때마다 불린다.
+        """
+        call = self.submit(base_keywords, n, retry)
+        shown = 0
+        while True:
+            try:
+                keywords = call.future.result(timeout=POLL_INTERVAL)
+            except concurrent.futures.TimeoutError:
+                pass
+            else:
+                # 토큰 합계 카운터는 업스트림 호출당 한 번(_run), 여기서는 호출한 실행(rerun) 기록에만
+                METRICS.tag(llm_cached=call.cached, llm_attempts=call.attempts,
+                            **{f"llm_{k}_tokens": v for k, v in call.usage.items()})
+                return keywords
+            partial = call.partial
+            if on_partial and len(partial) != shown:
+                shown = len(partial)
+                on_partial(list(partial))
+
+    def close(self) -> None:
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.close(), self._loop).result()
+        asyncio.run_coroutine_threadsafe(self._loop.shutdown_asyncgens(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # ── 이벤트 루프 내부 ──────────────────────────────────────
+    def _forget(self, call: KeywordCall) -> None:
+        with self._lock:
+            if self._inflight.get(call.key) is call:
+                del self._inflight[call.key]
+
+    def _cache_key(self, key: Tuple[Tuple[str, ...], int]) -> str:
+        return self.cache.make_key(list(key[0]), key[1], self.model, SYSTEM_PROMPT)
+
+    def _get_client(self):
+        if self._client is None:
+            from openai import AsyncOpenAI
+            # 재시도는 여기서 직접 (백오프 + jitter) 처리하므로 SDK 재시도는 끈다
+            self._client = AsyncOpenAI(
+                api_key=self.api_key, base_url=self.base_url,
+                timeout=REQUEST_TIMEOUT, max_retries=0
+            )
+        return self._client
+
+    async def _run(self, call: KeywordCall, retry: int) -> List[str]:
+        base_keywords, n = call.base_keywords, call.key[1]
+        user_input = ", ".join(list(base_keywords) + [f"{n}개"])
+        for attempt in range(retry):
+            call.attempts = attempt + 1
+            if attempt:
+                METRICS.count("llm_retries_total")
+            t0 = time.perf_counter()
+            try:
+                keywords = await self._complete(user_input, n, call)
+            except Exception:
+                METRICS.observe("llm_request_seconds", time.perf_counter() - t0, outcome="error")
+                call.partial = []
+                if attempt < retry - 1:
+                    await asyncio.sleep(backoff_delay(attempt))
+                continue
+            METRICS.observe("llm_request_seconds", time.perf_counter() - t0, outcome="ok")
+            for kind, tokens in call.usage.items():
+                METRICS.count("llm_tokens_total", tokens, kind=kind)
+            if self.cache is not None and keywords:
+                self.cache.put(
+                    self._cache_key(call.key), keywords,
+                    base_keywords=list(base_keywords), n=n, model=self.model, prompt=SYSTEM_PROMPT
+                )
+            return keywords
+        if self.cache is not None:
+            # 업스트림이 모두 실패하면 TTL 이 지난 캐시라도 재생
+            return self.cache.get(self._cache_key(call.key), allow_stale=True) or []
+        return []
+
+    async def _complete(self, user_input: str, n: int, call: KeywordCall) -> List[str]:
+        stream = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_input}
+            ],
+            temperature=0.3,
+            presence_penalty=0.8,
+            max_tokens=800,
+            response_format={"type": "json_object"},
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        text = ""
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None)
+            if usage is not None:   # include_usage: 마지막 청크(choices 비어 있음)에 토큰 수
+                call.usage = {"prompt": usage.prompt_tokens, "completion": usage.completion_tokens}
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                text += delta
+                call.partial = partial_keywords(text, n)
+        data = json.loads(text)
+        return clean_keywords(data.get("keywords", []), n)
@@ -0,0 +1,138 @@
+"""
+LLM 키워드 응답의 SQLite 디스크 캐시.
+
+키 = 정규화한 기본 키워드 집합 + N + 모델명 + SYSTEM_PROMPT 해시.
+- TTL 이 지난 항목은 일반 조회에서 제외 (오프라인/업스트림 실패 시에는 재생용으로 사용 가능)
+- 항목 수 상한을 넘으면 마지막 사용 시각이 오래된 것부터 삭제 (LRU)
+- 적중/미스 카운터는 DB 에 누적되어 재시작 후에도 유지
+여러 Streamlit 프로세스가 같은 파일을 쓰도록 WAL 모드로 연다.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from kwtool.text import normalize
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    base_keywords TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used);
+CREATE TABLE IF NOT EXISTS metrics (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_base(base_keywords: List[str]) -> List[str]:
+    """순서·대소문자·공백 차이를 무시한 기본 키워드 집합 (정렬)."""
+    return sorted({normalize(kw) for kw in base_keywords if kw.strip()})
+
+
+class LLMCache:
+    def __init__(
+        self,
+        path: Path,
+        *,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def make_key(self, base_keywords: List[str], n: int, model: str, prompt: str) -> str:
+        raw = json.dumps([normalize_base(base_keywords), n, model, prompt_hash(prompt)], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, *, allow_stale: bool = False) -> Optional[List[str]]:
+        """유효한 캐시 키워드 목록 또는 None. allow_stale 이면 TTL 이 지난 항목도 반환."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT keywords, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            fresh = row is not None and now - row[1] <= self.ttl
+            if row is None or not (fresh or allow_stale):
+                self._bump("misses")
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._bump("hits" if fresh else "stale_hits")
+            return json.loads(row[0])
+
+    def put(
+        self,
+        key: str,
+        keywords: List[str],
+        *,
+        base_keywords: List[str],
+        n: int,
+        model: str,
+        prompt: str
+    ) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(normalize_base(base_keywords), ensure_ascii=False), n, model,
+                 prompt_hash(prompt), json.dumps(keywords, ensure_ascii=False), now, now)
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            self._bump("evictions", excess)
+
+    def _bump(self, name: str, by: int = 1) -> None:
+        self._conn.execute(
+            "INSERT INTO metrics VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+            (name, by, by)
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            metrics = dict(self._conn.execute("SELECT name, value FROM metrics").fetchall())
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        hits, misses = metrics.get("hits", 0), metrics.get("misses", 0)
+        return {
+            "entries": entries,
+            "hits": hits,
+            "stale_hits": metrics.get("stale_hits", 0),
+            "misses": misses,
+            "evictions": metrics.get("evictions", 0),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,280 @@
+"""
+핫패스 계측: 구간(span) 시간, 실행(rerun)별 구간 기록, 카운터, Prometheus 텍스트 노출.
+
+    from kwtool.metrics import METRICS
+    with METRICS.span("search.compute"):
+        ...
+    METRICS.count("llm_tokens_total", 120, kind="completion")
+
+- 꺼져 있으면(기본) span() 은 공유 no-op 객체를, count()/observe() 는 바로 반환한다 (플래그 확인 한 번).
+- 켜면 구간 이름별 히스토그램(초)과 카운터를 프로세스 단위로 누적하고, begin_rerun() ~ end_rerun() 사이
+  같은 스레드에서 끝난 구간을 실행 기록 하나로 묶는다. 백그라운드 스레드(로그 writer, LLM 루프)의 구간은
+  히스토그램에만 들어간다. Streamlit 프래그먼트 본문은 fragment() 로 감싸면 전체 실행 안에서는 구간,
+  프래그먼트만 다시 실행될 때는 실행 기록 하나가 된다.
+- 실행 기록은 rolling JSONL 파일(reruns.jsonl)에, slow_rerun_ms 를 넘은 실행은 가장 오래 걸린
+  최상위 구간과 함께 slow.jsonl 에 남는다.
+- serve(port) 는 /metrics (Prometheus text format) 를 내보내는 백그라운드 HTTP 서버를 띄운다.
+"""
+import contextlib
+import json
+import logging
+import logging.handlers
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PREFIX = "kwtool"
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SLOW_RERUN_MS = 1000
+ROLL_BYTES = 10 * 1024 * 1024   # 기록 파일 하나의 최대 크기
+ROLL_BACKUPS = 5
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "t0")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.metrics._local.depth = getattr(self.metrics._local, "depth", 0) + 1
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.t0
+        local = self.metrics._local
+        local.depth -= 1
+        self.metrics._finish(self.name, elapsed, local.depth)
+        return False
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "n")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.n = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.n += 1
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels)
+    return "{" + body + "}"
+
+
+def _roll_file(path: Path) -> logging.handlers.RotatingFileHandler:
+    """크기 기준 rolling JSONL 파일. 로거 계층을 거치지 않아 logging 설정(disable 등)과 무관하게 남는다."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=ROLL_BYTES, backupCount=ROLL_BACKUPS, encoding="utf-8"
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def _write_line(handler: Optional[logging.Handler], record: dict) -> None:
+    if handler is not None:
+        handler.handle(logging.makeLogRecord({"msg": json.dumps(record, ensure_ascii=False)}))
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.slow_rerun_ms = SLOW_RERUN_MS
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._hist: Dict[Tuple[str, tuple], _Histogram] = {}
+        self._counters: Dict[Tuple[str, tuple], float] = {}
+        self._reruns: Optional[logging.Handler] = None
+        self._slow: Optional[logging.Handler] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def configure(self, *, enabled: bool = True, out_dir: Optional[Path] = None,
+                  slow_rerun_ms: float = SLOW_RERUN_MS) -> None:
+        """out_dir 를 주면 실행 기록(reruns.jsonl)과 느린 실행(slow.jsonl)을 그 아래 rolling 파일로 남긴다."""
+        self.slow_rerun_ms = slow_rerun_ms
+        if out_dir is not None and enabled:
+            for h in (self._reruns, self._slow):
+                if h is not None:
+                    h.close()
+            self._reruns = _roll_file(Path(out_dir) / "reruns.jsonl")
+            self._slow = _roll_file(Path(out_dir) / "slow.jsonl")
+        self.enabled = enabled
+
+    # ── 기록 ─────────────────────────────────────────────────
+    def span(self, name: str):
+        """with METRICS.span(name): 구간 시간 측정 (꺼져 있으면 공유 no-op)."""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name)
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """이름 있는 히스토그램에 값 하나 (span 밖에서 잰 지연, 예: LLM 요청 1회)."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._hist.get(key)
+            if hist is None:
+                hist = self._hist[key] = _Histogram()
+            hist.observe(seconds)
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        rerun = getattr(self._local, "rerun", None)
+        if rerun is not None:
+            rerun["counters"][name] = rerun["counters"].get(name, 0) + value
+
+    def _finish(self, name: str, elapsed: float, depth: int) -> None:
+        self.observe("span_seconds", elapsed, span=name)
+        rerun = getattr(self._local, "rerun", None)
+        if rerun is not None:
+            rerun["spans"].append((name, round(elapsed * 1000, 3), depth))
+
+    # ── 실행(rerun) 단위 ─────────────────────────────────────
+    def begin_rerun(self, **labels) -> None:
+        """스크립트 실행 시작. 끝나지 않은 이전 실행이 같은 스레드에 남아 있으면 먼저 닫는다."""
+        if not self.enabled:
+            return
+        if getattr(self._local, "rerun", None) is not None:
+            self.end_rerun("unfinished")
+        self._local.depth = 0
+        self._local.rerun = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "t0": time.perf_counter(),
+            "labels": dict(labels), "spans": [], "counters": {},
+        }
+
+    def tag(self, **labels) -> None:
+        """진행 중인 실행 기록에 라벨 추가 (예: 참가자 ID 를 안 뒤)."""
+        rerun = getattr(self._local, "rerun", None)
+        if rerun is not None:
+            rerun["labels"].update(labels)
+
+    @contextlib.contextmanager
+    def fragment(self, name: str, **labels):
+        """
+        with METRICS.fragment("results"): 프래그먼트 본문.
+        전체 실행 중이면 "fragment.<name>" 구간, 아니면(프래그먼트 단독 재실행) fragment=<name> 실행 기록.
+        """
+        if not self.enabled:
+            yield
+            return
+        if getattr(self._local, "rerun", None) is not None:
+            with self.span(f"fragment.{name}"):
+                yield
+            return
+        self.begin_rerun(fragment=name, **labels)
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "interrupted"   # st.rerun()/st.stop() 포함
+            raise
+        finally:
+            self.end_rerun(status)
+
+    def end_rerun(self, status: str = "ok") -> None:
+        """실행 종료: 전체 시간 기록, 기록 파일·느린 실행 로그에 한 줄."""
+        rerun = getattr(self._local, "rerun", None)
+        if rerun is None:
+            return
+        self._local.rerun = None
+        total = time.perf_counter() - rerun["t0"]
+        self.observe("rerun_seconds", total, status=status)
+        self.count("reruns_total", status=status)
+        record = {
+            "ts": rerun["ts"], "status": status, "total_ms": round(total * 1000, 3), **rerun["labels"],
+            "spans": [{"name": n, "ms": ms, "depth": d} for n, ms, d in rerun["spans"]],
+            "counters": rerun["counters"],
+        }
+        _write_line(self._reruns, record)
+        if total * 1000 >= self.slow_rerun_ms:
+            top = [s for s in rerun["spans"] if s[2] == 0] or rerun["spans"]
+            if top:
+                name, ms, _ = max(top, key=lambda s: s[1])
+                record["slowest"] = {"name": name, "ms": ms}
+            _write_line(self._slow, record)
+
+    # ── 노출 ─────────────────────────────────────────────────
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        with self._lock:
+            hists = sorted(self._hist.items())
+            counters = sorted(self._counters.items())
+        lines: List[str] = []
+        typed = set()
+        for (name, labels), hist in hists:
+            metric = f"{PREFIX}_{name}"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, c in zip(BUCKETS + (float("inf"),), hist.counts):
+                cumulative += c
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {hist.sum}")
+            lines.append(f"{metric}_count{_labels(labels)} {hist.n}")
+        for (name, labels), value in counters:
+            metric = f"{PREFIX}_{name}"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> None:
+        """/metrics 를 내보내는 데몬 스레드 HTTP 서버 (프로세스당 한 번)."""
+        if self._server is not None:
+            return
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+
+
+METRICS = Metrics()
@@ -0,0 +1,253 @@
+"""
+불리언 검색어: AND / OR / NOT, 따옴표 구문, ext: 확장자 필터 (표준 라이브러리만 사용).
+
+    from kwtool.query import Query
+    q = Query.parse('보고서 report ext:hwp -초안')    # (보고서 OR report) AND ext:hwp AND NOT 초안
+    q = Query.parse('"press release" AND (부동산 OR 주택)')
+    res = dataset.search(q, 1.0)                     # 키워드 목록 대신 Query 를 넘긴다
+
+문법 (연산자는 대문자만, 소문자 and/or/not 은 키워드):
+- 공백·쉼표로 나눈 항목은 기존 검색처럼 OR. 우선순위는 NOT > AND > OR > 나열.
+- "..." : 구문. 정규화(소문자·공백 제거) 후 부분 문자열 하나로 찾는다.
+- -키워드 / NOT 키워드 : 제외. ext:hwp : 확장자 필터 (.hwp 로 끝나는 파일명).
+- 나열된 항목 중 ext: 와 제외(-, NOT)는 OR 에 섞지 않고 나머지 전체에 AND 로 건다
+  ('보고서 ext:hwp' 는 hwp 인 보고서, ext: 가 여럿이면 그중 하나).
+
+평가는 kwtool.dataset.Dataset 이 키워드별 적중 행 배열(Dataset.term_rows, 캐시 공유)의
+교집합·합집합·차집합으로 한다. 파일명 컬럼을 질의마다 다시 훑지 않는다.
+"""
+import re
+from typing import List, Tuple
+
+from kwtool.text import normalize
+
+# 노드: ("term", 정규화 키워드) | ("ext", 확장자) | ("not", 노드) | ("and", 노드들) | ("or", 노드들)
+Node = Tuple
+
+OPERATORS = ("AND", "OR", "NOT")
+EXT_PREFIX = "ext:"
+_TOKEN = re.compile(r'"([^"]*)"?|([()])|([^\s,()"]+)')
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def is_boolean(text: str) -> bool:
+    """기존 OR 키워드 입력이 아니라 검색어 문법을 쓴 입력인지 (연산자·따옴표·괄호·제외·ext:)."""
+    for quoted, paren, word in (m.groups() for m in _TOKEN.finditer(text)):
+        if quoted is not None or paren:
+            return True
+        if word in OPERATORS or word.lower().startswith(EXT_PREFIX) or (word.startswith("-") and len(word) > 1):
+            return True
+    return False
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    for quoted, paren, word in (m.groups() for m in _TOKEN.finditer(text)):
+        if quoted is not None:
+            tokens.append(("phrase", quoted))
+        elif paren:
+            tokens.append((paren, paren))
+        elif word in OPERATORS:
+            tokens.append((word, word))
+        else:
+            tokens.append(("term", word))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> str:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else ""
+
+    def take(self) -> Tuple[str, str]:
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        return tok
+
+    def sequence(self) -> Node:
+        items = []
+        while self.peek() not in ("", ")"):
+            items.append(self.or_expr())
+        return _combine(items)
+
+    def or_expr(self) -> Node:
+        nodes = [self.and_expr()]
+        while self.peek() == "OR":
+            self.take()
+            nodes.append(self.and_expr())
+        return nodes[0] if len(nodes) == 1 else ("or", tuple(nodes))
+
+    def and_expr(self) -> Node:
+        nodes = [self.unary()]
+        while self.peek() == "AND":
+            self.take()
+            nodes.append(self.unary())
+        return nodes[0] if len(nodes) == 1 else ("and", tuple(nodes))
+
+    def unary(self) -> Node:
+        if self.peek() == "NOT":
+            self.take()
+            return ("not", self.unary())
+        return self.atom()
+
+    def atom(self) -> Node:
+        kind = self.peek()
+        if kind == "(":
+            self.take()
+            node = self.sequence()
+            if self.peek() != ")":
+                raise QuerySyntaxError("닫는 괄호가 없습니다")
+            self.take()
+            return node
+        if kind not in ("term", "phrase"):
+            raise QuerySyntaxError(f"'{kind or '끝'}' 앞에 검색어가 필요합니다")
+        _, text = self.take()
+        return _leaf(text, quoted=kind == "phrase")
+
+
+def _leaf(text: str, quoted: bool = False) -> Node:
+    if not quoted and text.startswith("-") and len(text) > 1:
+        return ("not", _leaf(text[1:]))
+    if not quoted and text.lower().startswith(EXT_PREFIX):
+        ext = text[len(EXT_PREFIX):].lower().lstrip(".")
+        if not ext:
+            raise QuerySyntaxError("ext: 뒤에 확장자가 필요합니다")
+        return ("ext", ext)
+    return ("term", normalize(text))
+
+
+def _is_ext(node: Node) -> bool:
+    return node[0] == "ext" or (node[0] == "or" and node[1] != () and all(c[0] == "ext" for c in node[1]))
+
+
+def _is_filter(node: Node) -> bool:
+    return node[0] == "not" or _is_ext(node)
+
+
+def _any(nodes: List[Node]) -> Node:
+    return nodes[0] if len(nodes) == 1 else ("or", tuple(nodes))
+
+
+def _combine(items: List[Node]) -> Node:
+    """나열된 항목: 일반 항목은 OR, ext: 는 그들끼리 OR 후 AND, 제외는 각각 AND."""
+    terms = [n for n in items if not _is_filter(n)]
+    exts = [e for n in items if _is_ext(n) for e in (n[1] if n[0] == "or" else (n,))]
+    nots = [n for n in items if n[0] == "not"]
+    return _all(([_any(terms)] if terms else []) + ([_any(exts)] if exts else []) + nots)
+
+
+def _all(parts: List[Node]) -> Node:
+    if not parts:
+        return ("or", ())
+    return parts[0] if len(parts) == 1 else ("and", tuple(parts))
+
+
+def _prune(node: Node, keep) -> Node:
+    """keep(키워드) 가 False 인 키워드를 없앤 트리 (빈 AND/OR 은 '조건 없음'으로 사라진다). 전부 빠지면 None."""
+    op = node[0]
+    if op == "term":
+        return node if keep(node[1]) else None
+    if op == "ext":
+        return node
+    if op == "not":
+        child = _prune(node[1], keep)
+        return None if child is None else ("not", child)
+    children = tuple(c for c in (_prune(c, keep) for c in node[1]) if c is not None)
+    if not children:
+        return None
+    return children[0] if len(children) == 1 else (op, children)
+
+
+def _format(node: Node, parent: str = "") -> str:
+    op = node[0]
+    if op == "term":
+        text = node[1]
+        if not text or text in {o.lower() for o in OPERATORS} or re.search(r'[\s,()"]', text) \
+                or text.startswith("-") or text.startswith(EXT_PREFIX):
+            return f'"{text}"'
+        return text
+    if op == "ext":
+        return EXT_PREFIX + node[1]
+    if op == "not":
+        return "NOT " + _format(node[1], "not")
+    text = f" {op.upper()} ".join(_format(c, op) for c in node[1])
+    return f"({text})" if parent else text
+
+
+class Query:
+    """파싱된 검색어. str(query) 는 정규화된 정식 표기 (결과 캐시 키·로그용, 다시 parse 해도 같은 트리)."""
+
+    def __init__(self, node: Node):
+        self.node = node
+
+    @classmethod
+    def parse(cls, text: str) -> "Query":
+        """문법 오류는 QuerySyntaxError (ValueError)."""
+        parser = _Parser(_tokenize(text))
+        node = parser.sequence()
+        if parser.pos < len(parser.tokens):
+            raise QuerySyntaxError("여는 괄호 없이 닫는 괄호가 있습니다")
+        return cls(node)
+
+    @classmethod
+    def any_of(cls, keywords: List[str]) -> "Query":
+        """기존 키워드 목록 검색과 같은 OR 질의."""
+        return cls(_any([("term", kw) for kw in dict.fromkeys(normalize(kw) for kw in keywords)]) if keywords else ("or", ()))
+
+    def or_terms(self, keywords: List[str]) -> "Query":
+        """키워드를 최상위 OR 항목에 추가 (LLM 추천 키워드 등). ext:·제외 조건은 추가한 키워드에도 걸린다."""
+        extra = [("term", normalize(kw)) for kw in keywords]
+        if not extra:
+            return self
+        parts = list(self.node[1]) if self.node[0] == "and" else [self.node]
+        filters = [n for n in parts if _is_filter(n)]
+        rest = [n for n in parts if not _is_filter(n)]
+        if not rest or rest == [("or", ())]:
+            positive = extra
+        elif len(rest) == 1 and rest[0][0] == "or":
+            positive = list(rest[0][1]) + extra
+        else:
+            positive = [_all(rest)] + extra
+        return Query(_all([_any(list(dict.fromkeys(positive)))] + filters))
+
+    def filtered(self, min_len: int = 2, ignore_single_digit: bool = True) -> "Query":
+        """filter_keywords 와 같은 규칙으로 짧은 키워드·한 자리 숫자를 뺀 질의."""
+        def keep(kw: str) -> bool:
+            return len(kw) >= min_len and not (ignore_single_digit and kw.isdigit() and len(kw) == 1)
+        return Query(_prune(self.node, keep) or ("or", ()))
+
+    def terms(self) -> List[str]:
+        """제외(NOT) 아래가 아닌 키워드 (순위 계산·로그용, 중복 제거·등장 순)."""
+        out = {}
+
+        def walk(node: Node) -> None:
+            if node[0] == "term":
+                out[node[1]] = None
+            elif node[0] in ("and", "or"):
+                for c in node[1]:
+                    walk(c)
+        walk(self.node)
+        return list(out)
+
+    @property
+    def empty(self) -> bool:
+        return self.node == ("or", ())
+
+    def __str__(self) -> str:
+        return "" if self.empty else _format(self.node)
+
+    def __repr__(self) -> str:
+        return f"Query({str(self)!r})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Query) and self.node == other.node
+
+    def __hash__(self) -> int:
+        return hash(self.node)
+
@@ -0,0 +1,139 @@
+"""
+검색 결과 집합의 참조 로깅.
+
+search_results 이벤트에 파일명 목록 전체 대신
+{"ref": <해시>, "dataset": <데이터셋 fingerprint>, "count": <적중 수>} 만 남기고,
+행 번호 목록은 로그 옆 중복 제거 저장소(resultsets/<해시>.bin)에 한 번만 쓴다.
+저장 형식: 결과 순서 그대로의 행 번호를 델타 인코딩(int64) 후 zlib 압축.
+해시는 (fingerprint, 행 번호열) 기준이라 같은 결과 집합은 참가자·검색이 달라도 파일 하나를 공유한다.
+앱에서는 LOG_RESULT_REFS = True 일 때만 쓴다 (기본은 기존처럼 파일명 목록, 로그 형식이 바뀌므로 선택 사항).
+
+분석 시 확장:
+    python -m kwtool.resultref expand logs/phase_b/P01.csv --dataset dataset.csv > P01_full.csv
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import zlib
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+from kwtool.results import ResultSet
+
+STORE_DIRNAME = "resultsets"
+
+
+def encode_rows(rows: np.ndarray) -> bytes:
+    deltas = np.diff(np.asarray(rows, dtype=np.int64), prepend=np.int64(0))
+    return zlib.compress(deltas.astype("<i8").tobytes(), 6)
+
+
+def decode_rows(blob: bytes) -> np.ndarray:
+    return np.cumsum(np.frombuffer(zlib.decompress(blob), dtype="<i8"))
+
+
+def is_ref(payload) -> bool:
+    return isinstance(payload, dict) and "ref" in payload and "dataset" in payload
+
+
+class ResultStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path_for(self, ref: str) -> Path:
+        return self.root / f"{ref}.bin"
+
+    def put(self, fingerprint: str, rows: np.ndarray) -> str:
+        """결과 집합을 저장하고 참조 해시 반환 (이미 있으면 쓰지 않음)."""
+        rows = np.ascontiguousarray(rows, dtype=np.int64)
+        ref = hashlib.sha256(fingerprint.encode("ascii") + rows.tobytes()).hexdigest()
+        path = self.path_for(ref)
+        if not path.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+            tmp.write_bytes(encode_rows(rows))
+            os.replace(tmp, path)
+        return ref
+
+    def rows(self, ref: str) -> np.ndarray:
+        return decode_rows(self.path_for(ref).read_bytes())
+
+    def expand(self, payload: dict, dataset) -> List[str]:
+        """참조 payload → 기존 형식의 파일명 목록 (데이터셋 fingerprint 가 다르면 ValueError)."""
+        if payload["dataset"] != dataset.fingerprint:
+            raise ValueError(
+                f"dataset mismatch: log refers to {payload['dataset'][:12]}…, "
+                f"given dataset is {dataset.fingerprint[:12]}…"
+            )
+        rows = self.rows(payload["ref"])
+        return dataset.df["filename"].iloc[rows].tolist()
+
+
+class ResultRef:
+    """
+    EventLogger payload 로 넘기는 지연 참조: 해시 계산과 저장소 쓰기는 writer 스레드에서
+    to_payload() 가 호출될 때 일어나므로 요청 경로 비용은 적중 수와 무관하다.
+    """
+
+    def __init__(self, store: ResultStore, fingerprint: str, rows: Union[np.ndarray, ResultSet]):
+        self.store = store
+        self.fingerprint = fingerprint
+        self.rows = rows              # ResultSet 이면 (순위 결과의) 전체 정렬도 writer 스레드에서
+
+    def to_payload(self) -> dict:
+        rows = self.rows.rows if isinstance(self.rows, ResultSet) else self.rows
+        ref = self.store.put(self.fingerprint, rows)
+        return {"ref": ref, "dataset": self.fingerprint, "count": int(len(rows))}
+
+
+def expand_log(log_path: Path, dataset, out, store: Optional[ResultStore] = None) -> int:
+    """참조 payload 를 파일명 목록으로 펼친 로그 CSV 를 out 에 쓴다. 펼친 이벤트 수 반환."""
+    store = store or ResultStore(Path(log_path).parent / STORE_DIRNAME)
+    expanded = 0
+    with Path(log_path).open("r", encoding="utf-8-sig", newline="") as f:
+        rdr = csv.DictReader(f)
+        w = csv.writer(out)
+        w.writerow(rdr.fieldnames)
+        for row in rdr:
+            payload = row.get("payload") or ""
+            if row.get("event") == "search_results" and payload.startswith("{"):
+                try:
+                    data = json.loads(payload)
+                except json.JSONDecodeError:
+                    data = None
+                if is_ref(data):
+                    row["payload"] = json.dumps(store.expand(data, dataset), ensure_ascii=False)
+                    expanded += 1
+            w.writerow([row[k] for k in rdr.fieldnames])
+    return expanded
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from kwtool.dataset import ENCODING_CANDIDATES
+    from kwtool.store import open_dataset
+
+    ap = argparse.ArgumentParser(prog="python -m kwtool.resultref", description="결과 집합 참조 로그 도구")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ex = sub.add_parser("expand", help="search_results 참조를 파일명 목록으로 펼쳐 출력")
+    ex.add_argument("log", type=Path)
+    ex.add_argument("--dataset", type=Path, required=True)
+    ex.add_argument("--out", type=Path, help="출력 CSV (기본: stdout)")
+    args = ap.parse_args(argv)
+
+    dataset = open_dataset(args.dataset, ENCODING_CANDIDATES)
+    if args.out:
+        with args.out.open("w", encoding="utf-8-sig", newline="") as out:
+            n = expand_log(args.log, dataset, out)
+    else:
+        n = expand_log(args.log, dataset, sys.stdout)
+    print(f"expanded {n} search_results events", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
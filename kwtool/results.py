@@ -0,0 +1,96 @@
+"""
+검색 결과 핸들.
+
+결과 DataFrame 을 통째로 복사해 세션에 두는 대신, 공유 데이터셋 위의 정렬된 행 번호(+점수)만 보관하고
+화면에 필요한 페이지만 그때그때 DataFrame 으로 구성한다.
+세션당 메모리는 O(적중 수 × 컬럼) → O(적중 수) 정수.
+
+순위 결과(ranked)는 전체 정렬 대신 page() 가 요구하는 앞부분까지만 부분 정렬(np.argpartition)한다.
+"""
+import threading
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class ResultSet:
+    def __init__(self, df: pd.DataFrame, rows: np.ndarray, scores: Optional[np.ndarray] = None):
+        self.df = df                  # 데이터셋 원본 (세션 간 공유, 수정 금지)
+        self._rows = rows             # 결과 순서(점수 내림차순, 같은 점수는 행 번호 순)의 행 번호
+        self._scores = scores         # rows 와 같은 길이의 점수, None 이면 모두 1.0
+        self._ordered = len(rows)     # 앞에서부터 순서가 확정된 개수
+        self._lock = threading.Lock()  # 결과 캐시로 여러 세션이 공유하므로 부분 정렬은 직렬화
+
+    @classmethod
+    def from_hits(cls, df: pd.DataFrame, hits: np.ndarray, threshold: float) -> "ResultSet":
+        """engine.frame_from_hits 와 같은 규칙: 일치 1.0 / 불일치 0.0 점수 후 threshold 필터·정렬."""
+        if threshold > 1.0:
+            return cls(df, np.empty(0, dtype=np.int32))
+        if threshold > 0:
+            return cls(df, np.array(hits, copy=True))
+        miss = np.ones(len(df), dtype=bool)
+        miss[hits] = False
+        rows = np.concatenate([hits, np.flatnonzero(miss)]).astype(np.int32)
+        scores = np.zeros(len(df))
+        scores[:len(hits)] = 1.0
+        return cls(df, rows, scores)
+
+    @classmethod
+    def ranked(cls, df: pd.DataFrame, rows: np.ndarray, scores: np.ndarray) -> "ResultSet":
+        """임의 순서의 (행 번호, 점수) → 점수 내림차순 결과. 정렬은 필요할 때 앞부분만."""
+        res = cls(df, rows, scores)
+        res._ordered = 0
+        return res
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def empty(self) -> bool:
+        return len(self._rows) == 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._rows.nbytes + (self._scores.nbytes if self._scores is not None else 0)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """결과 순서의 전체 행 번호 (읽기 전용)."""
+        self._order(len(self))
+        rows = self._rows.view()
+        rows.setflags(write=False)
+        return rows
+
+    def _order(self, stop: int) -> None:
+        """앞 stop 개의 순서를 확정: 남은 구간에서 상위 항목만 골라(argpartition) 그것만 정렬."""
+        with self._lock:
+            done = self._ordered
+            stop = min(stop, len(self))
+            if stop <= done:
+                return
+            rows, scores = self._rows[done:], self._scores[done:]
+            k = stop - done
+            if k < len(rows):
+                kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+                top = np.flatnonzero(scores >= kth)     # 경계 점수의 동점은 모두 포함 (행 번호 순 유지)
+                rest = np.flatnonzero(scores < kth)
+            else:
+                top, rest = np.arange(len(rows)), np.empty(0, dtype=np.intp)
+            top = top[np.lexsort((rows[top], -scores[top]))]
+            perm = np.concatenate([top, rest])
+            self._rows[done:], self._scores[done:] = rows[perm], scores[perm]
+            self._ordered = done + len(top)
+
+    def page(self, start: int, stop: int) -> pd.DataFrame:
+        """결과 [start, stop) 구간만 score 컬럼을 붙인 DataFrame 으로 구성 (원본 행 번호가 index)."""
+        self._order(stop)
+        rows = self._rows[start:stop]
+        scores = 1.0 if self._scores is None else self._scores[start:stop]
+        return self.df.iloc[rows].assign(score=scores)
+
+    def filenames(self) -> List[str]:
+        return self.df["filename"].iloc[self.rows].tolist()
+
+    def to_frame(self) -> pd.DataFrame:
+        return self.page(0, len(self))
@@ -0,0 +1,228 @@
+"""
+파싱·정규화된 데이터셋과 검색 색인의 디스크 캐시.
+
+DATA_PATH 옆 `<파일명>.cache/` 디렉토리에 구축할 때마다 새 버전 디렉토리를 만들고,
+`CURRENT` 파일(버전 디렉토리 이름)을 원자적으로 바꿔 가리킨다.
+- v-*/frame.arrow : 원본 컬럼 + 정규화 파일명 (Arrow IPC, 비압축 → 메모리 맵으로 바로 열림)
+- v-*/trigram_*.npy : 트라이그램 색인 CSR 배열 (np.load mmap_mode="r")
+- v-*/doc_len.npy : 행별 파일명 토큰 수 (순위 검색 BM25 길이 정규화)
+- v-*/meta.json : 원본 크기·mtime·sha256, 성공한 인코딩, 캐시 포맷 버전
+
+캐시 유효성: 크기+mtime 이 같으면 바로 사용, 크기만 같으면 sha256 을 다시 계산해 비교.
+
+여러 워커 프로세스: 모두 같은 캐시 파일을 읽기 전용 메모리 맵으로 열므로 데이터·색인 페이지는
+OS 페이지 캐시에서 공유된다. 콜드 스타트 구축은 `<파일명>.cache.lock` 잠금으로 한 프로세스만 수행.
+읽기는 잠금 없이 CURRENT 가 가리키는 버전을 연다. 교체 후에도 직전 버전은 남겨 두므로 교체 직전에
+CURRENT 를 읽은 프로세스도 온전한 파일을 열고, 그래도 열다 실패하면 잠금을 잡고 다시 열거나 재구축한다.
+"""
+import gc
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:          # Windows
+    fcntl = None
+
+from kwtool.dataset import Dataset, ingest_csv
+from kwtool.index import TrigramIndex
+
+CACHE_VERSION = 5
+NORM_COL = "__norm__"
+_INDEX_ARRAYS = ("keys", "offsets", "rows")
+CURRENT = "CURRENT"
+KEEP_VERSIONS = 2            # CURRENT + 직전 버전 (교체 중 열고 있던 읽기용)
+
+
+def cache_dir_for(path: Path) -> Path:
+    return path.with_name(path.name + ".cache")
+
+
+def file_sha256(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def current_version(cache_dir: Path) -> Optional[Path]:
+    """CURRENT 가 가리키는 버전 디렉토리 (없으면 None)."""
+    try:
+        name = (cache_dir / CURRENT).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return cache_dir / name if name.startswith("v-") else None
+
+
+def _read_meta(version_dir: Optional[Path]) -> Optional[dict]:
+    if version_dir is None:
+        return None
+    try:
+        meta = json.loads((version_dir / "meta.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == CACHE_VERSION else None
+
+
+def _write_text_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _prune(cache_dir: Path, keep: List[str]) -> None:
+    """keep 외의 버전 디렉토리·이전 포맷 파일 정리. 아직 맵으로 열려 있어도 POSIX 에서는 열린 쪽은 계속 유효."""
+    for entry in cache_dir.iterdir():
+        if entry.name == CURRENT or entry.name in keep:
+            continue
+        if entry.is_dir():
+            shutil.rmtree(entry, ignore_errors=True)
+        else:
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+
+
+def save(ds: Dataset, cache_dir: Path, source: dict) -> Path:
+    """
+    새 버전 디렉토리에 모두 쓰고(meta.json 은 마지막) CURRENT 를 원자적으로 바꾼다. 만든 버전 디렉토리 반환.
+    중간에 죽어도 CURRENT 는 이전 버전을 가리키므로 깨진 캐시가 읽히지 않는다. 구축 잠금 안에서 부른다.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    previous = current_version(cache_dir)
+    tmp = cache_dir / f"v-{time.time_ns():x}-{os.getpid()}"
+    tmp.mkdir()
+
+    table = pa.Table.from_pandas(ds.df, preserve_index=False)
+    table = table.append_column(NORM_COL, pa.chunked_array([pa.array(ds.norm, type=pa.string())]))
+    # pandas 의 Arrow 문자열은 large_string: 디스크에도 그 형식으로 두어야 열 때 변환(복사)이 없다
+    table = table.cast(pa.schema([
+        f.with_type(pa.large_string()) if f.type == pa.string() else f for f in table.schema
+    ]))
+    with pa.OSFile(str(tmp / "frame.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    for name in _INDEX_ARRAYS:
+        np.save(tmp / f"trigram_{name}.npy", getattr(ds.index, name))
+    np.save(tmp / "doc_len.npy", ds.doc_len)
+
+    meta = dict(source, version=CACHE_VERSION, encoding=ds.encoding, n_rows=len(ds))
+    _write_text_atomic(tmp / "meta.json", json.dumps(meta, ensure_ascii=False, indent=1))
+
+    _write_text_atomic(cache_dir / CURRENT, tmp.name)
+    _prune(cache_dir, [tmp.name] + ([previous.name] if previous is not None else [])[:KEEP_VERSIONS - 1])
+    return tmp
+
+
+def load(version_dir: Path, meta: dict) -> Dataset:
+    """메모리 맵으로 열기: 문자열 컬럼은 맵된 Arrow 버퍼를 복사 없이 쓰는 string[pyarrow] 로."""
+    table = pa.ipc.open_file(pa.memory_map(str(version_dir / "frame.arrow"))).read_all()
+    frame = table.to_pandas(types_mapper={pa.large_string(): pd.StringDtype("pyarrow")}.get)
+    norm = frame.pop(NORM_COL)
+    arrays = {
+        name: np.load(version_dir / f"trigram_{name}.npy", mmap_mode="r") for name in _INDEX_ARRAYS
+    }
+    index = TrigramIndex(arrays["keys"], arrays["offsets"], arrays["rows"], len(frame))
+    doc_len = np.load(version_dir / "doc_len.npy", mmap_mode="r")
+    return Dataset(frame, norm, index, encoding=meta["encoding"], sha256=meta["sha256"], doc_len=doc_len)
+
+
+@contextmanager
+def _build_lock(cache_dir: Path):
+    """
+    캐시 구축 프로세스 간 잠금: 여러 워커가 동시에 콜드 스타트해도 CSV 파싱·색인은 한 번만.
+    fcntl 이 없거나(Windows) 잠금 파일을 만들 수 없으면 잠금 없이 진행 (각자 구축, 마지막 교체가 남음).
+    """
+    if fcntl is None:
+        yield
+        return
+    try:
+        f = cache_dir.with_name(cache_dir.name + ".lock").open("a")
+    except OSError:
+        yield
+        return
+    with f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _open_cached(path: Path, cache_dir: Path, source: dict) -> Optional[Dataset]:
+    """
+    유효한 캐시가 있으면 연다. 내용 비교에 sha256 을 계산했다면 source["sha256"] 에 남긴다.
+    여는 중 실패(정리된 버전 디렉토리, 잘린 파일 등: OSError / ArrowInvalid·ValueError)는 캐시 없음으로 본다.
+    """
+    version_dir = current_version(cache_dir)
+    meta = _read_meta(version_dir)
+    try:
+        if not meta or meta["size"] != source["size"]:
+            return None
+        if meta["mtime_ns"] != source["mtime_ns"]:
+            source["sha256"] = source.get("sha256") or file_sha256(path)
+            if meta["sha256"] != source["sha256"]:
+                return None
+            # 내용은 같고 mtime 만 바뀜 (복사/touch): 메타만 갱신
+            meta["mtime_ns"] = source["mtime_ns"]
+            try:
+                _write_text_atomic(version_dir / "meta.json", json.dumps(meta, ensure_ascii=False, indent=1))
+            except OSError:
+                pass
+        return load(version_dir, meta)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def open_dataset(
+    path: Path,
+    encodings: List[str],
+    delimiter: str = ",",
+    col_map: Dict[str, str] = None,
+    *,
+    cache_dir: Optional[Path] = None
+) -> Dataset:
+    """
+    캐시가 유효하면 캐시에서, 아니면 CSV 를 스트리밍 파싱·색인하고 캐시를 새로 쓴다.
+    캐시에서 연 데이터셋은 파일을 메모리 맵으로 공유하므로, 같은 호스트의 여러 Streamlit 프로세스가
+    열어도 상주 메모리는 호스트당 한 번만 든다 (구축한 프로세스도 쓴 캐시를 다시 맵으로 연다).
+    캐시 쓰기 실패(읽기 전용 디렉토리 등)는 무시하고 메모리 데이터셋을 그대로 반환.
+    """
+    path = Path(path)
+    cache_dir = cache_dir or cache_dir_for(path)
+    stat = path.stat()
+    source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    ds = _open_cached(path, cache_dir, source)
+    if ds is not None:
+        return ds
+    with _build_lock(cache_dir):
+        ds = _open_cached(path, cache_dir, source)   # 잠금을 기다리는 사이 다른 워커가 만들었을 수 있음
+        if ds is not None:
+            return ds
+        ds = ingest_csv(path, encodings, delimiter, col_map)   # 파싱하면서 sha256 도 계산 (파일을 한 번만 읽음)
+        source["sha256"] = ds.sha256
+        try:
+            version_dir = save(ds, cache_dir, source)
+        except OSError:
+            return ds
+    # 구축용 메모리 사본은 버리고 다른 워커와 같은 맵으로 연다
+    del ds
+    gc.collect()
+    pa.default_memory_pool().release_unused()
+    return load(version_dir, _read_meta(version_dir))
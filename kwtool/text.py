@@ -0,0 +1,32 @@
+"""
+키워드·파일명 문자열 규칙 (표준 라이브러리만 사용).
+
+LLM 캐시 키처럼 pandas 가 필요 없는 곳에서도 검색과 같은 정규화를 쓰도록 엔진에서 분리했다.
+kwtool.engine 에서도 그대로 import 할 수 있다.
+"""
+from typing import List
+
+
+def normalize(txt: str) -> str:
+    """검색용 정규화: 소문자 + 공백 제거 (기존 score() 와 동일 규칙)."""
+    return txt.lower().replace(" ", "")
+
+
+def filter_keywords(
+    keywords: List[str],
+    min_len: int = 2,
+    ignore_single_digit: bool = True
+) -> List[str]:
+    """
+    - min_len:  이 길이보다 짧은 키워드는 검색에서 제외
+    - ignore_single_digit: True 이면 0~9 단독 키워드는 무시
+    """
+    filtered_kw = []
+    for kw in keywords:
+        kw = kw.strip()
+        if len(kw) < min_len:
+            continue
+        if ignore_single_digit and kw.isdigit() and len(kw) == 1:
+            continue
+        filtered_kw.append(kw)
+    return filtered_kw
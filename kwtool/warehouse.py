@@ -0,0 +1,269 @@
+"""
+참가자 로그 CSV → 열 지향 Parquet 창고 (참가자 교차 분석용).
+
+CSV 셀 안의 JSON payload 를 이벤트 종류별 타입 컬럼으로 풀어 두므로, "어떤 LLM 키워드가 증거 저장으로
+이어졌나" 같은 질의가 로그 전체 재파싱 없이 Parquet 몇 개를 읽는 것으로 끝난다.
+
+    python -m kwtool.warehouse compact logs/phase_b              # 지난번 이후 추가된 줄만 (증분)
+    python -m kwtool.warehouse compact logs/phase_b --rebuild    # 처음부터 다시 (작은 파일 정리 겸)
+
+    <log_dir>/warehouse/
+        manifest.json                         커밋된 실행 목록 + 참가자 로그별 처리한 바이트 위치
+        events/part-<run>-<n>.parquet         모든 이벤트: pid, offset, ts, event, payload(원문)
+        searches/...                          search: base_keywords, llm_keywords (list<string>), fuzzy, content
+        llm_keywords/...                      llm_keywords: keywords (list<string>)
+        search_results/...                    search_results: ref, dataset, count, filenames(기존 목록 형식)
+        evidence/...                          evidence_mark / evidence_mark_on_timeout: items (list<string>)
+
+모든 테이블의 (pid, offset) 은 원본 CSV 줄의 시작 바이트 위치라 이벤트 순서·테이블 간 조인 키로 쓴다.
+로그 파일은 프로세스 풀에서 묶음 단위로 파싱하고 워커마다 자기 Parquet 파일을 쓴다.
+부분 실패 시 매니페스트에 없는 실행의 파일은 읽을 때 무시하고 다음 compact 때 지운다.
+"""
+import argparse
+import codecs
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as pads
+import pyarrow.parquet as pq
+
+from kwtool.evidence import EVIDENCE_EVENTS
+from kwtool.resultref import is_ref
+from kwtool.store import _build_lock
+
+STORE_DIRNAME = "warehouse"
+MANIFEST = "manifest.json"
+FILES_PER_TASK = 64           # 워커 작업 하나(= 테이블별 Parquet 파일 하나)가 맡는 로그 파일 수
+TS_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+_KEY = [("pid", pa.string()), ("offset", pa.int64()), ("ts", pa.timestamp("s"))]
+_STRINGS = pa.list_(pa.string())
+SCHEMAS = {
+    "events": pa.schema(_KEY + [("event", pa.string()), ("payload", pa.string())]),
+    "searches": pa.schema(_KEY + [("base_keywords", _STRINGS), ("llm_keywords", _STRINGS), ("fuzzy", pa.bool_()),
+                                 ("content", pa.bool_())]),
+    "llm_keywords": pa.schema(_KEY + [("keywords", _STRINGS)]),
+    "search_results": pa.schema(_KEY + [
+        ("ref", pa.string()), ("dataset", pa.string()), ("count", pa.int64()), ("filenames", _STRINGS),
+    ]),
+    "evidence": pa.schema(_KEY + [("event", pa.string()), ("items", _STRINGS)]),
+}
+
+
+def _lines(data: bytes) -> Iterator[Tuple[int, str]]:
+    """(줄 끝 바이트 위치, 줄 문자열). 줄바꿈을 포함해 돌려줘야 csv 가 따옴표 안 줄바꿈을 이어 붙인다."""
+    pos = 0
+    while pos < len(data):
+        end = data.find(b"\n", pos) + 1 or len(data)
+        yield end, data[pos:end].decode("utf-8")
+        pos = end
+
+
+def read_rows(path: Path, offset: int) -> Tuple[List[Tuple[int, List[str]]], int]:
+    """
+    offset 부터 완결된 CSV 행만 → ([(행 시작 바이트 위치, [ts, event, payload])], 새 offset).
+    쓰는 중인 마지막 줄(줄바꿈 없음)은 다음 실행으로 미룬다. offset 0 이면 BOM·헤더를 건너뛴다.
+    """
+    with path.open("rb") as f:
+        f.seek(offset)
+        data = f.read()
+    data = data[:data.rfind(b"\n") + 1]
+    skip = 0
+    if offset == 0:
+        skip = len(codecs.BOM_UTF8) if data.startswith(codecs.BOM_UTF8) else 0
+        skip = data.find(b"\n", skip) + 1      # 헤더 줄
+        if skip == 0:
+            return [], 0
+
+    rows, start, pos = [], skip, skip
+    body = data[skip:]
+
+    def lines():
+        nonlocal pos
+        for end, line in _lines(body):
+            pos = skip + end
+            yield line
+
+    for row in csv.reader(lines()):
+        if len(row) >= 3:
+            rows.append((offset + start, row))
+        start = pos
+    return rows, offset + len(data)
+
+
+def _json(raw: str):
+    if raw[:1] not in ("{", "["):
+        return raw
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return raw
+
+
+def _str_list(value) -> Optional[List[str]]:
+    return [str(v) for v in value] if isinstance(value, list) else None
+
+
+def parse_events(pid: str, rows: List[Tuple[int, List[str]]], out: Dict[str, Dict[str, list]]) -> None:
+    """CSV 행들을 테이블별 컬럼 리스트(out[table][column])에 추가."""
+    for offset, (ts, event, raw) in ((o, r[:3]) for o, r in rows):
+        key = {"pid": pid, "offset": offset, "ts": ts}
+        _append(out["events"], key, event=event, payload=raw)
+        if event == "search":
+            p = _json(raw)
+            p = p if isinstance(p, dict) else {}
+            _append(out["searches"], key, base_keywords=_str_list(p.get("base_keywords")),
+                    llm_keywords=_str_list(p.get("llm_keywords")), fuzzy=bool(p.get("fuzzy", False)),
+                    content=bool(p.get("content", False)))
+        elif event == "llm_keywords":
+            _append(out["llm_keywords"], key, keywords=[kw for kw in raw.split("|") if kw])
+        elif event == "search_results":
+            p = _json(raw)
+            if is_ref(p):
+                _append(out["search_results"], key, ref=p.get("ref"), dataset=p.get("dataset"),
+                        count=p.get("count"), filenames=None)
+            else:
+                names = _str_list(p) or []
+                _append(out["search_results"], key, ref=None, dataset=None, count=len(names), filenames=names)
+        elif event in EVIDENCE_EVENTS:
+            _append(out["evidence"], key, event=event, items=_str_list(_json(raw)) or [])
+
+
+def _append(cols: Dict[str, list], key: dict, **values) -> None:
+    for name, value in {**key, **values}.items():
+        cols.setdefault(name, []).append(value)
+
+
+def _to_table(name: str, cols: Dict[str, list]) -> pa.Table:
+    schema = SCHEMAS[name]
+    ts = pc.strptime(pa.array(cols["ts"], pa.string()), format=TS_FORMAT, unit="s", error_is_null=True)
+    arrays = [ts if f.name == "ts" else pa.array(cols[f.name], type=f.type) for f in schema]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _compact_task(root: str, run: str, part: int, tasks: List[Tuple[str, str, int]]) -> Dict[str, int]:
+    """로그 묶음 하나 → 테이블별 Parquet 파일 하나씩. {pid: 새 offset} 반환 (워커 프로세스에서 실행)."""
+    out = {name: {} for name in SCHEMAS}
+    offsets = {}
+    for pid, path, offset in tasks:
+        rows, offsets[pid] = read_rows(Path(path), offset)
+        parse_events(pid, rows, out)
+    for name, cols in out.items():
+        if cols:
+            target = Path(root) / name
+            target.mkdir(parents=True, exist_ok=True)
+            pq.write_table(_to_table(name, cols), target / f"part-{run}-{part:05d}.parquet", compression="zstd")
+    return offsets
+
+
+def read_manifest(root: Path) -> dict:
+    try:
+        return json.loads((root / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"runs": [], "files": {}}
+
+
+def _write_manifest(root: Path, manifest: dict) -> None:
+    tmp = root / f"{MANIFEST}.tmp{os.getpid()}"
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, root / MANIFEST)
+
+
+def _run_of(path: Path) -> str:
+    return path.stem.split("-", 1)[1].rsplit("-", 1)[0]
+
+
+def part_files(root: Path, name: str, runs: Optional[set] = None) -> List[Path]:
+    runs = set(read_manifest(root)["runs"]) if runs is None else runs
+    return sorted(p for p in (root / name).glob("part-*.parquet") if _run_of(p) in runs)
+
+
+def compact(log_dir: Path, root: Optional[Path] = None, *, workers: Optional[int] = None,
+            rebuild: bool = False) -> Tuple[int, int]:
+    """
+    log_dir/*.csv 의 새 줄을 창고에 추가. (처리한 로그 파일 수, 새로 추가한 이벤트 수) 반환.
+    로그가 처리한 위치보다 짧아졌거나(다시 쓰임) 다른 파일로 바뀌었으면 rebuild 가 필요하다는 ValueError.
+    """
+    log_dir = Path(log_dir)
+    root = Path(root) if root else log_dir / STORE_DIRNAME
+    root.mkdir(parents=True, exist_ok=True)
+    with _build_lock(root):
+        manifest = read_manifest(root)
+        if rebuild:
+            manifest = {"runs": [], "files": {}}
+            _write_manifest(root, manifest)
+        committed = set(manifest["runs"])
+        for name in SCHEMAS:                       # 커밋되지 않은(중단된) 실행과 rebuild 이전 파일 정리
+            for p in (root / name).glob("part-*.parquet"):
+                if _run_of(p) not in committed:
+                    p.unlink()
+
+        tasks = []
+        for path in sorted(log_dir.glob("*.csv")):
+            st = path.stat()
+            seen = manifest["files"].get(path.stem)
+            offset = 0
+            if seen:
+                if st.st_size < seen["offset"] or st.st_ino != seen["inode"]:
+                    raise ValueError(f"{path} 가 마지막 compact 이후 다시 쓰였습니다. --rebuild 로 다시 만드세요.")
+                offset = seen["offset"]
+            if st.st_size > offset:
+                tasks.append((path.stem, str(path), offset))
+        if not tasks:
+            return 0, 0
+
+        run = time.strftime("%Y%m%dT%H%M%S") + f"_{os.getpid()}"
+        groups = [tasks[i:i + FILES_PER_TASK] for i in range(0, len(tasks), FILES_PER_TASK)]
+        offsets = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_compact_task, str(root), run, i, g) for i, g in enumerate(groups)]
+            for f in futures:
+                offsets.update(f.result())
+
+        for pid, path, _ in tasks:
+            manifest["files"][pid] = {"offset": offsets[pid], "inode": os.stat(path).st_ino}
+        manifest["runs"].append(run)
+        _write_manifest(root, manifest)            # 여기까지 와야 이번 실행 파일이 보인다
+    added = sum(pq.ParquetFile(p).metadata.num_rows for p in (root / "events").glob(f"part-{run}-*.parquet"))
+    return len(tasks), added
+
+
+def table(root: Path, name: str, columns: Optional[List[str]] = None, filter=None) -> pa.Table:
+    """창고 테이블 하나 (커밋된 파일만). filter 는 pyarrow.dataset 식, 예: pc.field("pid") == "P01"."""
+    files = part_files(Path(root), name)
+    if not files:
+        return SCHEMAS[name].empty_table().select(columns or SCHEMAS[name].names)
+    ds = pads.dataset([str(p) for p in files], schema=SCHEMAS[name], format="parquet")
+    return ds.to_table(columns=columns, filter=filter)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kwtool.warehouse", description="로그 Parquet 창고")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    cp = sub.add_parser("compact", help="logs/phase_b/*.csv 의 새 이벤트를 창고에 추가")
+    cp.add_argument("log_dir", type=Path)
+    cp.add_argument("--out", type=Path, help=f"창고 경로 (기본: <log_dir>/{STORE_DIRNAME})")
+    cp.add_argument("--workers", type=int, default=os.cpu_count())
+    cp.add_argument("--rebuild", action="store_true", help="기존 창고를 버리고 처음부터")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    try:
+        files, events = compact(args.log_dir, args.out, workers=args.workers, rebuild=args.rebuild)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"compacted {events} events from {files} logs in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+kwtool.api 요청 검증: 잘못된 옵션 값은 500 이 아니라 400.
+
+    python -m pytest -q tests/test_api.py
+"""
+import pandas as pd
+import pytest
+from starlette.testclient import TestClient
+
+from kwtool.api import BadRequest, create_app, parse_query
+from kwtool.core import Core
+
+
+@pytest.fixture
+def client(tmp_path):
+    csv = tmp_path / "dataset.csv"
+    pd.DataFrame({
+        "filename": ["주간보고서_final.hwp", "budget_2023.xlsx", "report.pdf"],
+        "label": ["T", "F", "T"],
+    }).to_csv(csv, index=False)
+    with TestClient(create_app(Core(csv, tmp_path / "logs"))) as c:
+        yield c
+
+
+@pytest.mark.parametrize("field", ["fuzzy", "content", "ignore_single_digit"])
+@pytest.mark.parametrize("value", [[1], 1, "true", None, {}])
+def test_non_bool_options_are_rejected(field, value):
+    with pytest.raises(BadRequest, match=field):
+        parse_query({"keywords": ["보고서"], field: value})
+
+
+@pytest.mark.parametrize("field", ["fuzzy", "content", "ignore_single_digit"])
+def test_bool_options_pass_through(field):
+    assert parse_query({"keywords": ["보고서"], field: True})[field] is True
+
+
+def test_search_with_invalid_bool_returns_400(client):
+    res = client.post("/search", json={"keywords": ["보고서"], "fuzzy": [1]})
+    assert res.status_code == 400
+    assert "fuzzy" in res.json()["error"]
+
+    res = client.post("/search/batch", json={"queries": [{"keywords": ["report"], "ignore_single_digit": "no"}]})
+    assert res.status_code == 400
+
+
+def test_search_ok(client):
+    res = client.post("/search", json={"keywords": ["보고서", "report"], "fuzzy": False})
+    assert res.status_code == 200
+    assert res.json()["count"] == 2
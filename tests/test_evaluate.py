@@ -0,0 +1,79 @@
+"""
+kwtool.evaluate: 증거 지표 단위(정규화 파일명)와 검색어 문법 오류가 있는 로그 재생.
+
+    python -m pytest -q tests/test_evaluate.py
+"""
+import csv
+import json
+
+import pandas as pd
+import pytest
+
+from kwtool.dataset import Dataset
+from kwtool.eventlog import HEADER
+from kwtool.evaluate import evaluate_log, truth_mask
+
+
+@pytest.fixture
+def dataset():
+    return Dataset.from_frame(pd.DataFrame({
+        # 같은 이름의 정답 행이 셋 (다른 폴더에서 나온 사본)
+        "filename": ["보고서.hwp", "보고서.hwp", "보고서.hwp", "예산.xlsx", "메모.txt", "report.pdf"],
+        "label": ["T", "T", "T", "T", "F", "F"],
+    }))
+
+
+def write_log(path, events):
+    with path.open("w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(HEADER)
+        for event, payload in events:
+            w.writerow(["2026-01-01T00:00:00", event, json.dumps(payload, ensure_ascii=False)])
+    return path
+
+
+def test_evidence_metrics_count_distinct_names(tmp_path, dataset):
+    log = write_log(tmp_path / "p1.csv", [
+        ("evidence_mark", ["보고서.hwp", "메모.txt"]),
+        ("evidence_mark_on_timeout", [" 보고서.HWP "]),
+    ])
+    _, summary = evaluate_log(log, dataset, truth_mask(dataset))
+    assert summary["evidence"] == 2
+    assert summary["evidence_true"] == 1
+    assert summary["evidence_precision"] == 0.5          # 행 단위로 세면 3/2 가 되던 경우
+    assert summary["evidence_recall"] == 0.5             # 정답 이름 2개(보고서.hwp, 예산.xlsx) 중 1개
+
+
+def test_query_syntax_error_is_recorded_and_skipped(tmp_path, dataset):
+    log = write_log(tmp_path / "p2.csv", [
+        ("search", {"base_keywords": ["보고서"], "llm_keywords": [], "query": "보고서 AND ("}),
+        ("search", {"base_keywords": ["보고서", "예산"], "llm_keywords": []}),
+        ("evidence_mark", ["예산.xlsx"]),
+    ])
+    searches, summary = evaluate_log(log, dataset, truth_mask(dataset))
+    assert [s["status"] for s in searches] == ["error", "ok"]
+    assert searches[0]["error"].startswith("QuerySyntaxError")
+    assert searches[0]["f1"] == ""
+    assert searches[1]["search_no"] == 2 and searches[1]["hits"] == 4 and searches[1]["precision"] == 1.0
+    assert summary["searches"] == 2 and summary["search_errors"] == 1
+    assert summary["best_search_no"] == 2 and summary["last_f1"] == searches[1]["f1"]
+    assert summary["evidence_true"] == 1
+
+
+@pytest.mark.parametrize("payload", [
+    {"base_keywords": "보고서", "llm_keywords": []},
+    {"base_keywords": None, "llm_keywords": []},
+    {"base_keywords": ["보고서"], "llm_keywords": None},
+    {"base_keywords": ["보고서", 3], "llm_keywords": []},
+    {"base_keywords": ["보고서"], "llm_keywords": [], "query": ["보고서"]},
+])
+def test_malformed_keyword_payload_is_recorded_and_skipped(tmp_path, dataset, payload):
+    log = write_log(tmp_path / "p3.csv", [
+        ("search", payload),
+        ("search", {"base_keywords": ["예산"], "llm_keywords": ["보고서"]}),
+    ])
+    searches, summary = evaluate_log(log, dataset, truth_mask(dataset))
+    assert [s["status"] for s in searches] == ["error", "ok"]
+    assert searches[0]["error"].startswith("TypeError") and searches[0]["n_keywords"] == ""
+    assert searches[1]["n_keywords"] == 2 and searches[1]["hits"] == 4
+    assert summary["search_errors"] == 1 and summary["best_search_no"] == 2
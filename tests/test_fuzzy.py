@@ -0,0 +1,61 @@
+"""
+kwtool.fuzzy 근사 일치: 토큰 전체 비교 + 합성어 토큰 안의 부분 일치.
+
+    python -m pytest -q tests/test_fuzzy.py
+"""
+import pandas as pd
+import pytest
+
+from kwtool.dataset import Dataset
+from kwtool.fuzzy import decompose, edit_distance, syllable_bounds
+from kwtool.text import normalize
+
+NAMES = [
+    "주간보고서_final.hwp",      # 0
+    "보고서.hwp",                # 1
+    "복사본.hwp",                # 2
+    "호고연파_메모.txt",          # 3
+    "quarterlyreport.pdf",      # 4
+    "budget plan.xlsx",         # 5
+    "월간보고서초안.docx",        # 6
+]
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return Dataset.from_frame(pd.DataFrame({"filename": NAMES, "label": "F"}))
+
+
+def fuzzy_rows(ds, keyword):
+    return sorted(ds.term_rows(normalize(keyword), fuzzy=True).tolist())
+
+
+@pytest.mark.parametrize("keyword, expected", [
+    ("보고셔", [0, 1, 6]),           # 자모 한 글자 차이, 합성어 안에서도
+    ("주간보고셔", [0]),
+    ("bogoseo", [0, 1, 6]),          # 로마자 표기
+    ("quartelry", [4]),              # 합성어 안의 인접 문자 뒤바뀜
+    ("budjet", [5]),
+    ("보고서초안", [6]),
+])
+def test_fuzzy_matches_inside_compound_tokens(dataset, keyword, expected):
+    assert fuzzy_rows(dataset, keyword) == expected
+
+
+@pytest.mark.parametrize("keyword", ["보고", "복사"])
+def test_short_keywords_stay_whole_token(dataset, keyword):
+    rows = fuzzy_rows(dataset, keyword)
+    assert 3 not in rows
+    assert (2 in rows) == (keyword == "복사")
+
+
+def test_substring_alignment_respects_syllable_bounds():
+    token = "호고연파"
+    form = decompose(token)
+    bounds = syllable_bounds(token, form)
+    assert bounds == {0, 2, 4, 7, 9}
+    # 음절 경계에서 끊긴 부분("고연")은 무료로 건너뛰지만 음절 중간 정렬은 잘린 자모만큼 비용
+    assert edit_distance(decompose("고연"), form, 0, bounds) == 0
+    assert edit_distance(decompose("보고셔"), form, 1, bounds) > 1
+    assert edit_distance(decompose("보고셔"), decompose("주간보고서"), 1, syllable_bounds("주간보고서", decompose("주간보고서"))) == 1
+    assert edit_distance(decompose("보고셔"), decompose("주간보고서"), 1) > 1      # 토큰 전체 비교는 그대로
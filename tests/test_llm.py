@@ -0,0 +1,185 @@
+"""
+kwtool.llm.KeywordClient 를 로컬 스텁 HTTP 서버(OpenAI chat.completions 스트리밍 흉내)에 붙여 검증.
+
+    python -m pytest -q tests/test_llm.py
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from kwtool import llm
+from kwtool.llm import KeywordClient
+from kwtool.llm_cache import LLMCache
+
+KEYWORDS = [f"kw{i}" for i in range(6)]
+
+
+class Stub:
+    """요청마다 statuses 를 앞에서 하나씩 꺼내 응답 (다 쓰면 200). 200 이면 키워드 JSON 을 조각내 SSE 로 보낸다."""
+
+    def __init__(self):
+        self.statuses = []
+        self.chunk_delay = 0.0
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def next_status(self) -> int:
+        with self.lock:
+            return self.statuses.pop(0) if self.statuses else 200
+
+
+def _chunk(delta=None, usage=None) -> bytes:
+    body = {
+        "id": "stub", "object": "chat.completion.chunk", "created": 0, "model": "stub",
+        "choices": [] if delta is None else [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+    }
+    if usage:
+        body["usage"] = usage
+    return f"data: {json.dumps(body)}\n\n".encode("utf-8")
+
+
+@pytest.fixture
+def stub():
+    state = Stub()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with state.lock:
+                state.requests.append(body)
+            status = state.next_status()
+            if status != 200:
+                payload = json.dumps({"error": {"message": "stub", "type": "stub"}}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            text = json.dumps({"keywords": KEYWORDS})
+            for i in range(0, len(text), 8):
+                self.wfile.write(_chunk(text[i:i + 8]))
+                self.wfile.flush()
+                time.sleep(state.chunk_delay)
+            self.wfile.write(_chunk(usage={"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30}))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state.url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    """대기 없이 재시도하되 full jitter 인자(0, min(cap, base*2**attempt))는 기록."""
+    calls = []
+    monkeypatch.setattr(llm.random, "uniform", lambda lo, hi: calls.append((lo, hi)) or 0.0)
+    return calls
+
+
+def make_client(stub, cache=None) -> KeywordClient:
+    return KeywordClient("test-key", base_url=stub.url, cache=cache)
+
+
+def test_streaming_partial_keywords(stub):
+    stub.chunk_delay = 0.05
+    client = make_client(stub)
+    seen = []
+    try:
+        result = client.fetch(["보고서"], n=6, on_partial=seen.append)
+    finally:
+        client.close()
+    assert result == KEYWORDS
+    assert seen, "부분 결과가 한 번도 전달되지 않음"
+    assert all(part == KEYWORDS[:len(part)] for part in seen)
+    assert [len(p) for p in seen] == sorted(len(p) for p in seen)
+    assert len(seen[0]) < len(KEYWORDS)
+
+
+def test_concurrent_identical_requests_coalesce(stub):
+    stub.chunk_delay = 0.05
+    client = make_client(stub)
+    try:
+        calls = [client.submit(kws, 6) for kws in (["A", "b"], ["b", "a"], [" a ", "B"])]
+        results = [c.future.result(timeout=10) for c in calls]
+    finally:
+        client.close()
+    assert calls[0] is calls[1] is calls[2]
+    assert results == [KEYWORDS] * 3
+    assert len(stub.requests) == 1
+    # 프롬프트에는 처음 요청한 원래 입력이 들어간다
+    assert stub.requests[0]["messages"][1]["content"].startswith("A, b")
+
+
+def test_coalesced_key_matches_cache_key(stub, tmp_path):
+    cache = LLMCache(tmp_path / "llm.sqlite3")
+    client = make_client(stub, cache)
+    try:
+        assert client.fetch(["A", "b"], 6) == KEYWORDS
+        call = client.submit(["b", "a"], 6)
+    finally:
+        client.close()
+    assert call.cached and call.future.result() == KEYWORDS
+    assert len(stub.requests) == 1
+
+
+@pytest.mark.parametrize("failures", [[429], [500, 503], [429, 502]])
+def test_retry_on_429_and_5xx_with_full_jitter(stub, fast_backoff, failures):
+    stub.statuses = list(failures)
+    client = make_client(stub)
+    try:
+        call = client.submit(["보고서"], 6, retry=3)
+        result = call.future.result(timeout=10)
+    finally:
+        client.close()
+    assert result == KEYWORDS
+    assert call.attempts == len(failures) + 1
+    assert len(stub.requests) == len(failures) + 1
+    assert fast_backoff == [
+        (0, min(llm.BACKOFF_CAP, llm.BACKOFF_BASE * 2 ** attempt)) for attempt in range(len(failures))
+    ]
+
+
+def test_all_retries_fail_without_cache_returns_empty(stub, fast_backoff):
+    stub.statuses = [500, 500, 500]
+    client = make_client(stub)
+    try:
+        assert client.fetch(["보고서"], 6, retry=3) == []
+    finally:
+        client.close()
+    assert len(stub.requests) == 3
+
+
+def test_stale_cache_fallback_when_upstream_fails(stub, fast_backoff, tmp_path):
+    stub.statuses = [500, 429, 503]
+    cache = LLMCache(tmp_path / "llm.sqlite3", ttl=-1)   # 모든 항목이 만료 상태
+    stale = ["old1", "old2"]
+    cache.put(
+        cache.make_key(["보고서"], 6, llm.MODEL, llm.SYSTEM_PROMPT), stale,
+        base_keywords=["보고서"], n=6, model=llm.MODEL, prompt=llm.SYSTEM_PROMPT
+    )
+    client = make_client(stub, cache)
+    try:
+        result = client.fetch(["보고서"], 6, retry=3)
+    finally:
+        client.close()
+    assert result == stale
+    assert len(stub.requests) == 3
+    assert cache.stats()["stale_hits"] == 1
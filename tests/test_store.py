@@ -0,0 +1,60 @@
+"""
+kwtool.store 디스크 캐시: 버전 디렉토리 + CURRENT 교체, 열기 실패 시 재구축.
+
+    python -m pytest -q tests/test_store.py
+"""
+import pandas as pd
+import pytest
+
+from kwtool.dataset import ENCODING_CANDIDATES
+from kwtool.store import CURRENT, cache_dir_for, current_version, open_dataset
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "dataset.csv"
+    pd.DataFrame({"filename": [f"보고서_{i}.hwp" for i in range(50)], "label": "T"}).to_csv(path, index=False)
+    return path
+
+
+def test_rebuild_switches_current_and_keeps_previous(csv_path):
+    cache = cache_dir_for(csv_path)
+    first = open_dataset(csv_path, ENCODING_CANDIDATES)
+    v1 = current_version(cache)
+    assert len(first) == 50 and v1.is_dir()
+
+    for n in (60, 70):
+        pd.DataFrame({"filename": [f"report_{i}.pdf" for i in range(n)], "label": "F"}).to_csv(csv_path, index=False)
+        assert len(open_dataset(csv_path, ENCODING_CANDIDATES)) == n
+    versions = sorted(p.name for p in cache.iterdir() if p.name != CURRENT)
+    assert len(versions) == 2 and current_version(cache).name in versions
+    assert not v1.exists()
+    assert len(first.term_rows("보고서")) == 50       # 정리된 버전을 맵으로 연 쪽도 계속 읽힌다
+
+
+@pytest.mark.parametrize("damage", ["truncate_frame", "drop_index", "dangling_current", "bad_meta"])
+def test_damaged_cache_falls_back_to_rebuild(csv_path, damage):
+    cache = cache_dir_for(csv_path)
+    open_dataset(csv_path, ENCODING_CANDIDATES)
+    version = current_version(cache)
+    if damage == "truncate_frame":
+        (version / "frame.arrow").write_bytes((version / "frame.arrow").read_bytes()[:100])
+    elif damage == "drop_index":
+        (version / "trigram_rows.npy").unlink()
+    elif damage == "dangling_current":
+        (cache / CURRENT).write_text("v-gone", encoding="utf-8")
+    else:
+        (version / "meta.json").write_text("{", encoding="utf-8")
+
+    ds = open_dataset(csv_path, ENCODING_CANDIDATES)
+    assert len(ds.term_rows("보고서")) == 50
+    assert current_version(cache) != version
+
+
+def test_legacy_flat_cache_is_replaced(csv_path):
+    cache = cache_dir_for(csv_path)
+    cache.mkdir()
+    (cache / "meta.json").write_text('{"version": 4}', encoding="utf-8")
+    (cache / "frame.arrow").write_bytes(b"old")
+    assert len(open_dataset(csv_path, ENCODING_CANDIDATES)) == 50
+    assert sorted(p.name for p in cache.iterdir()) == sorted([CURRENT, current_version(cache).name])